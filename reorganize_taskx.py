@@ -3,10 +3,22 @@
 Reorganize TaskX from flat src/ to proper src/taskx/ package structure.
 Part of TASK_PACKET_TASKX_A0.
 """
+import errno
 import os
 import shutil
+from operator import attrgetter
 from pathlib import Path
 
+
+def _fast_move(src_path, dest_path):
+    """Rename in place; only fall back to shutil.move across filesystems."""
+    try:
+        os.replace(src_path, dest_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(str(src_path), str(dest_path))
+
 def main():
     repo_root = Path("/Users/hue/code/taskX")
     src = repo_root / "src"
@@ -15,55 +27,68 @@ def main():
     # Create src/taskx if it doesn't exist
     taskx_pkg.mkdir(exist_ok=True)
     print(f"✓ Created {taskx_pkg}")
+
+    # Read both directories once instead of stat()ing each candidate
+    with os.scandir(src) as it:
+        src_names = {entry.name for entry in it}
+    with os.scandir(taskx_pkg) as it:
+        pkg_names = {entry.name for entry in it}
     
     # Move top-level Python files into src/taskx/
-    files_to_move = [
+    files_to_move = frozenset({
         "__init__.py",
         "__main__.py", 
         "cli.py",
         "doctor.py",
         "ci_gate.py",
-    ]
+    })
     
-    for fname in files_to_move:
-        src_file = src / fname
-        dest_file = taskx_pkg / fname
-        if src_file.exists() and not dest_file.exists():
-            shutil.move(str(src_file), str(dest_file))
-            print(f"✓ Moved {fname} → taskx/{fname}")
-        elif dest_file.exists():
-            print(f"  Skip {fname} (already exists in taskx/)")
-        else:
-            print(f"⚠ Skip {fname} (not found)")
+    for fname in sorted((files_to_move & src_names) - pkg_names):
+        _fast_move(src / fname, taskx_pkg / fname)
+        print(f"✓ Moved {fname} → taskx/{fname}")
+    for fname in sorted(files_to_move & pkg_names):
+        print(f"  Skip {fname} (already exists in taskx/)")
+    for fname in sorted(files_to_move - src_names - pkg_names):
+        print(f"⚠ Skip {fname} (not found)")
     
     # Move subdirectories into src/taskx/
-    dirs_to_move = ["utils", "schemas", "pipeline"]
+    dirs_to_move = frozenset({"utils", "schemas", "pipeline"})
     
-    for dirname in dirs_to_move:
-        src_dir = src / dirname
-        dest_dir = taskx_pkg / dirname
-        if src_dir.exists() and not dest_dir.exists():
-            shutil.move(str(src_dir), str(dest_dir))
-            print(f"✓ Moved {dirname}/ → taskx/{dirname}/")
-        elif dest_dir.exists():
-            print(f"  Skip {dirname}/ (already exists in taskx/)")
-        else:
-            print(f"⚠ Skip {dirname}/ (not found)")
+    for dirname in sorted((dirs_to_move & src_names) - pkg_names):
+        _fast_move(src / dirname, taskx_pkg / dirname)
+        print(f"✓ Moved {dirname}/ → taskx/{dirname}/")
+    for dirname in sorted(dirs_to_move & pkg_names):
+        print(f"  Skip {dirname}/ (already exists in taskx/)")
+    for dirname in sorted(dirs_to_move - src_names - pkg_names):
+        print(f"⚠ Skip {dirname}/ (not found)")
     
     # taskx_adapters stays as separate package (already correctly namespaced)
     print("\n✓ taskx_adapters remains at src/taskx_adapters/")
     
     print("\n✓ Package restructure complete")
     print(f"\nNew structure:")
-    for root, dirs, files in os.walk(taskx_pkg):
-        level = root.replace(str(taskx_pkg), '').count(os.sep)
+    stack = [(str(taskx_pkg), os.path.basename(str(taskx_pkg)), 0)]
+    while stack:
+        path, name, level = stack.pop()
         indent = ' ' * 2 * level
-        print(f'{indent}{os.path.basename(root)}/')
+        print(f'{indent}{name}/')
+        subdirs = []
+        files = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry)
+                else:
+                    files.append(entry.name)
         subindent = ' ' * 2 * (level + 1)
         for file in sorted(files)[:5]:  # Show first 5 files per dir
             print(f'{subindent}{file}')
         if len(files) > 5:
             print(f'{subindent}... and {len(files) - 5} more')
+        # Push in reverse so subdirectories print in name order
+        for entry in sorted(subdirs, key=attrgetter('name'), reverse=True):
+            stack.append((entry.path, entry.name, level + 1))
+
 
 if __name__ == "__main__":
     main()
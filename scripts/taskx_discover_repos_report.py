@@ -14,28 +14,66 @@ Usage:
 """
 
 import argparse
+import io
 import json
 import sys
 from pathlib import Path
 from datetime import datetime, timezone
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _dumps(obj):
+    """Serialize to indented UTF-8 JSON bytes with a trailing newline."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _loads(data):
+    """Parse JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional speedup
+    ijson = None
+
+_JSON_ERRORS = (json.JSONDecodeError,) if ijson is None else (json.JSONDecodeError, ijson.JSONError)
+
+
+_DETERMINISTIC_TS = "1970-01-01T00:00:00Z"
 
 
 def get_timestamp(mode="deterministic"):
     """Get timestamp based on mode."""
     if mode == "deterministic":
-        return "1970-01-01T00:00:00Z"
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return _DETERMINISTIC_TS
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
 
 def load_discovery_data(input_file):
-    """Load discovery_raw.json."""
+    """Load discovery_raw.json.
+
+    When ijson is available the document is stream-parsed one top-level key
+    at a time, so the raw text of large discovery sets is never held in memory.
+    """
     try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(input_file, "rb") as f:
+            if ijson is None:
+                return _loads(f.read())
+            return dict(ijson.kvitems(f, "", use_float=True))
     except FileNotFoundError:
         print(f"Error: Input file not found: {input_file}", file=sys.stderr)
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except _JSON_ERRORS as e:
         print(f"Error: Invalid JSON in {input_file}: {e}", file=sys.stderr)
         sys.exit(1)
 
@@ -44,7 +82,8 @@ def generate_discovery_report_json(discovery_data):
     """Generate DISCOVERY_REPORT.json from discovery_raw.json.
     
     This is essentially a passthrough with validation since the raw format
-    matches the final report format.
+    matches the final report format. ``repos`` is expected to be sorted by
+    path already (see ``main``).
     """
     return {
         "schema_version": discovery_data.get("schema_version", "1.0"),
@@ -56,141 +95,141 @@ def generate_discovery_report_json(discovery_data):
         "include_non_git": discovery_data.get("include_non_git"),
         "symlinks": discovery_data.get("symlinks"),
         "summary": discovery_data.get("summary", {}),
-        "repos": sorted(discovery_data.get("repos", []), key=lambda x: x["path"])
+        "repos": discovery_data.get("repos", [])
     }
 
 
+def _repo_table_rows(repos):
+    """Render repository table rows as one string."""
+    return "".join(
+        f"| `{repo['path']}` | {'✅' if repo.get('git_repo') else '❌'} |\n" for repo in repos
+    )
+
+
 def generate_discovery_report_md(discovery_data):
     """Generate DISCOVERY_REPORT.md (human-readable)."""
-    lines = []
+    buf = io.StringIO()
+    w = buf.write
     
     # Title
-    lines.append("# dopeTask Repository Discovery Report")
-    lines.append("")
+    w("# dopeTask Repository Discovery Report\n")
+    w("\n")
     
     # Metadata
-    lines.append(f"**Scan Root:** `{discovery_data['root']}`")
-    lines.append(f"**Max Depth:** {discovery_data['depth']}")
-    lines.append(f"**Max Repos:** {discovery_data['max_repos']}")
-    lines.append(f"**Include Non-Git:** {discovery_data['include_non_git']}")
-    lines.append(f"**Follow Symlinks:** {discovery_data['symlinks']}")
-    lines.append(f"**Generated:** {discovery_data['generated_at']}")
-    lines.append("")
+    w(f"**Scan Root:** `{discovery_data['root']}`\n")
+    w(f"**Max Depth:** {discovery_data['depth']}\n")
+    w(f"**Max Repos:** {discovery_data['max_repos']}\n")
+    w(f"**Include Non-Git:** {discovery_data['include_non_git']}\n")
+    w(f"**Follow Symlinks:** {discovery_data['symlinks']}\n")
+    w(f"**Generated:** {discovery_data['generated_at']}\n")
+    w("\n")
     
     # Summary
     summary = discovery_data["summary"]
-    lines.append("## Summary")
-    lines.append("")
-    lines.append(f"- **Total Repos Found:** {summary['repos_found']}")
-    lines.append(f"- **Repos Emitted:** {summary['repos_emitted']}")
-    lines.append(f"- **Truncated:** {'Yes ⚠️' if summary['truncated'] else 'No'}")
-    lines.append("")
+    w("## Summary\n")
+    w("\n")
+    w(f"- **Total Repos Found:** {summary['repos_found']}\n")
+    w(f"- **Repos Emitted:** {summary['repos_emitted']}\n")
+    w(f"- **Truncated:** {'Yes ⚠️' if summary['truncated'] else 'No'}\n")
+    w("\n")
     
     # Warnings
     if summary.get("truncated"):
-        lines.append("## ⚠️ Warnings")
-        lines.append("")
-        lines.append(f"**Truncation:** Discovery found {summary['repos_found']} repos, "
-                    f"but output was limited to {summary['repos_emitted']} repos. "
-                    f"Increase `--max-repos` to capture all repos.")
-        lines.append("")
+        w("## ⚠️ Warnings\n")
+        w("\n")
+        w(f"**Truncation:** Discovery found {summary['repos_found']} repos, "
+          f"but output was limited to {summary['repos_emitted']} repos. "
+          f"Increase `--max-repos` to capture all repos.\n")
+        w("\n")
     
     if discovery_data.get("symlinks"):
         if not summary.get("truncated"):
-            lines.append("## ⚠️ Warnings")
-            lines.append("")
-        lines.append("**Symlink Mode:** Symlinks were followed during discovery. "
-                    "This may lead to duplicate or unexpected results.")
-        lines.append("")
+            w("## ⚠️ Warnings\n")
+            w("\n")
+        w("**Symlink Mode:** Symlinks were followed during discovery. "
+          "This may lead to duplicate or unexpected results.\n")
+        w("\n")
     
     # Repositories
     repos = discovery_data.get("repos", [])
     
     if len(repos) == 0:
-        lines.append("## Discovered Repositories")
-        lines.append("")
-        lines.append("*No repositories found.*")
-        lines.append("")
+        w("## Discovered Repositories\n")
+        w("\n")
+        w("*No repositories found.*\n")
+        w("\n")
     elif len(repos) <= 50:
         # Show all repos if <= 50
-        lines.append("## Discovered Repositories")
-        lines.append("")
-        lines.append("| Repository | Git Repo |")
-        lines.append("|------------|----------|")
-        for repo in sorted(repos, key=lambda x: x["path"]):
-            git_icon = "✅" if repo.get("git_repo") else "❌"
-            lines.append(f"| `{repo['path']}` | {git_icon} |")
-        lines.append("")
+        w("## Discovered Repositories\n")
+        w("\n")
+        w("| Repository | Git Repo |\n")
+        w("|------------|----------|\n")
+        w(_repo_table_rows(repos))
+        w("\n")
     else:
         # Show first 20 and last 20 if > 50
-        lines.append("## Discovered Repositories")
-        lines.append("")
-        lines.append(f"*Showing first 20 and last 20 of {len(repos)} repos. "
-                    f"See `REPOS.txt` for complete list.*")
-        lines.append("")
-        lines.append("### First 20 Repositories")
-        lines.append("")
-        lines.append("| Repository | Git Repo |")
-        lines.append("|------------|----------|")
-        sorted_repos = sorted(repos, key=lambda x: x["path"])
-        for repo in sorted_repos[:20]:
-            git_icon = "✅" if repo.get("git_repo") else "❌"
-            lines.append(f"| `{repo['path']}` | {git_icon} |")
-        lines.append("")
+        w("## Discovered Repositories\n")
+        w("\n")
+        w(f"*Showing first 20 and last 20 of {len(repos)} repos. "
+          f"See `REPOS.txt` for complete list.*\n")
+        w("\n")
+        w("### First 20 Repositories\n")
+        w("\n")
+        w("| Repository | Git Repo |\n")
+        w("|------------|----------|\n")
+        w(_repo_table_rows(repos[:20]))
+        w("\n")
         
-        lines.append("### Last 20 Repositories")
-        lines.append("")
-        lines.append("| Repository | Git Repo |")
-        lines.append("|------------|----------|")
-        for repo in sorted_repos[-20:]:
-            git_icon = "✅" if repo.get("git_repo") else "❌"
-            lines.append(f"| `{repo['path']}` | {git_icon} |")
-        lines.append("")
+        w("### Last 20 Repositories\n")
+        w("\n")
+        w("| Repository | Git Repo |\n")
+        w("|------------|----------|\n")
+        w(_repo_table_rows(repos[-20:]))
+        w("\n")
     
     # Statistics
     git_count = sum(1 for r in repos if r.get("git_repo"))
     non_git_count = len(repos) - git_count
     
-    lines.append("## Repository Statistics")
-    lines.append("")
-    lines.append(f"- **Git Repos:** {git_count}")
-    lines.append(f"- **Non-Git Repos:** {non_git_count}")
-    lines.append("")
+    w("## Repository Statistics\n")
+    w("\n")
+    w(f"- **Git Repos:** {git_count}\n")
+    w(f"- **Non-Git Repos:** {non_git_count}\n")
+    w("\n")
     
     # Next Steps
-    lines.append("## Next Steps")
-    lines.append("")
-    lines.append("### 1. Review Discovered Repositories")
-    lines.append("")
-    lines.append("```bash")
-    lines.append("cat out/dopetask_repo_discovery/REPOS.txt")
-    lines.append("```")
-    lines.append("")
+    w("## Next Steps\n")
+    w("\n")
+    w("### 1. Review Discovered Repositories\n")
+    w("\n")
+    w("```bash\n")
+    w("cat out/dopetask_repo_discovery/REPOS.txt\n")
+    w("```\n")
+    w("\n")
     
-    lines.append("### 2. Audit Version Drift")
-    lines.append("")
-    lines.append("```bash")
-    lines.append("bash scripts/dopetask_pin_audit.sh \\")
-    lines.append("  --target-version X.Y.Z \\")
-    lines.append("  --repo-list out/dopetask_repo_discovery/REPOS.txt")
-    lines.append("")
-    lines.append("cat out/dopetask_pin_audit/PIN_AUDIT.md")
-    lines.append("```")
-    lines.append("")
+    w("### 2. Audit Version Drift\n")
+    w("\n")
+    w("```bash\n")
+    w("bash scripts/dopetask_pin_audit.sh \\\n")
+    w("  --target-version X.Y.Z \\\n")
+    w("  --repo-list out/dopetask_repo_discovery/REPOS.txt\n")
+    w("\n")
+    w("cat out/dopetask_pin_audit/PIN_AUDIT.md\n")
+    w("```\n")
+    w("\n")
     
-    lines.append("### 3. Upgrade Behind Repositories")
-    lines.append("")
-    lines.append("```bash")
-    lines.append("bash scripts/dopetask_upgrade_many.sh \\")
-    lines.append("  --version X.Y.Z \\")
-    lines.append("  --repo-list out/dopetask_repo_discovery/REPOS.txt \\")
-    lines.append("  --apply")
-    lines.append("")
-    lines.append("cat out/dopetask_upgrade_many/ROLLUP.md")
-    lines.append("```")
-    lines.append("")
+    w("### 3. Upgrade Behind Repositories\n")
+    w("\n")
+    w("```bash\n")
+    w("bash scripts/dopetask_upgrade_many.sh \\\n")
+    w("  --version X.Y.Z \\\n")
+    w("  --repo-list out/dopetask_repo_discovery/REPOS.txt \\\n")
+    w("  --apply\n")
+    w("\n")
+    w("cat out/dopetask_upgrade_many/ROLLUP.md\n")
+    w("```\n")
     
-    return "\n".join(lines)
+    return buf.getvalue()
 
 
 def main():
@@ -221,6 +260,10 @@ def main():
     
     # Load discovery data
     discovery_data = load_discovery_data(args.input_file)
+    # Sort once, in place; both report generators consume the sorted list
+    repos = discovery_data.setdefault("repos", [])
+    if len(repos) > 1:
+        repos.sort(key=itemgetter("path"))
     
     # Create output directory
     output_dir = Path(args.output_dir)
@@ -229,17 +272,14 @@ def main():
     # Generate JSON report
     report_json = generate_discovery_report_json(discovery_data)
     json_path = output_dir / "DISCOVERY_REPORT.json"
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(report_json, f, indent=2, ensure_ascii=False)
-        f.write("\n")
+    json_path.write_bytes(_dumps(report_json))
     
     print(f"Generated: {json_path}")
     
     # Generate MD report
     report_md = generate_discovery_report_md(discovery_data)
     md_path = output_dir / "DISCOVERY_REPORT.md"
-    with open(md_path, "w", encoding="utf-8") as f:
-        f.write(report_md)
+    md_path.write_bytes(report_md.encode("utf-8"))
     
     print(f"Generated: {md_path}")
     
@@ -4,84 +4,92 @@
 Reads and validates .dopetask-pin configuration files.
 """
 
+import os
 import sys
 from pathlib import Path
 
 
 def find_repo_root(start_dir: Path) -> Path | None:
     """Find repository root by walking up to find .git or pyproject.toml."""
-    current = start_dir.resolve()
-    while current != current.parent:
-        if (current / ".git").exists() or (current / "pyproject.toml").exists():
-            return current
-        current = current.parent
-    return None
-
-
-def parse_pin_file(pin_file: Path) -> dict[str, str]:
-    """Parse .dopetask-pin file into dictionary."""
+    current = os.path.realpath(start_dir)
+    while True:
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        if os.path.lexists(os.path.join(current, ".git")) or os.path.lexists(
+            os.path.join(current, "pyproject.toml")
+        ):
+            return Path(current)
+        current = parent
+
+
+def parse_pin_file(pin_file: Path, errs: list[str]) -> dict[str, str]:
+    """Parse .dopetask-pin file into dictionary.
+
+    Diagnostics are appended to ``errs`` rather than printed.
+    """
     config = {}
 
     if not pin_file.exists():
         return config
 
-    with open(pin_file, 'r') as f:
-        for line in f:
-            line = line.strip()
-
-            # Skip comments and empty lines
-            if not line or line.startswith('#'):
-                continue
+    text = pin_file.read_text(encoding='utf-8', errors='replace')
+    for line in text.splitlines():
+        line = line.strip()
 
-            # Parse key=value
-            if '=' not in line:
-                print(f"⚠️  Warning: Invalid line (no '='): {line}", file=sys.stderr)
-                continue
+        # Skip comments and empty lines
+        if not line or line[0] == '#':
+            continue
 
-            key, value = line.split('=', 1)
-            key = key.strip()
-            value = value.strip()
+        # Parse key=value
+        key, sep, value = line.partition('=')
+        if not sep:
+            errs.append(f"⚠️  Warning: Invalid line (no '='): {line}")
+            continue
 
-            config[key] = value
+        config[key.strip()] = value.strip()
 
     return config
 
 
-def validate_config(config: dict[str, str], repo_root: Path) -> bool:
-    """Validate pin configuration."""
+def validate_config(config: dict[str, str], repo_root: Path, errs: list[str]) -> bool:
+    """Validate pin configuration.
+
+    Diagnostics are appended to ``errs`` rather than printed.
+    """
     valid = True
 
     # Check install method
     if 'install' not in config:
-        print("❌ Missing required field: install", file=sys.stderr)
+        errs.append("❌ Missing required field: install")
         valid = False
     else:
         method = config['install']
         if method not in ('git', 'wheel'):
-            print(f"❌ Invalid install method: {method} (must be 'git' or 'wheel')", file=sys.stderr)
+            errs.append(f"❌ Invalid install method: {method} (must be 'git' or 'wheel')")
             valid = False
 
         # Validate method-specific fields
         if method == 'git':
             if 'repo' not in config:
-                print("❌ Missing required field for git install: repo", file=sys.stderr)
+                errs.append("❌ Missing required field for git install: repo")
                 valid = False
             if 'ref' not in config:
-                print("❌ Missing required field for git install: ref", file=sys.stderr)
+                errs.append("❌ Missing required field for git install: ref")
                 valid = False
 
         elif method == 'wheel':
             if 'path' not in config:
-                print("❌ Missing required field for wheel install: path", file=sys.stderr)
+                errs.append("❌ Missing required field for wheel install: path")
                 valid = False
             else:
                 # Check if wheel exists
-                wheel_path = Path(config['path'])
-                if not wheel_path.is_absolute():
-                    wheel_path = repo_root / wheel_path
+                wheel_path = config['path']
+                if not os.path.isabs(wheel_path):
+                    wheel_path = os.path.join(repo_root, wheel_path)
 
-                if not wheel_path.exists():
-                    print(f"⚠️  Warning: Wheel file not found: {wheel_path}", file=sys.stderr)
+                if not os.path.exists(wheel_path):
+                    errs.append(f"⚠️  Warning: Wheel file not found: {wheel_path}")
 
     return valid
 
@@ -109,11 +117,11 @@ def print_summary(config: dict[str, str], repo_root: Path) -> None:
 
     elif method == 'wheel':
         path = config.get('path', '<missing>')
-        wheel_path = Path(path)
-        if not wheel_path.is_absolute():
-            wheel_path = repo_root / wheel_path
+        wheel_path = path
+        if not os.path.isabs(wheel_path):
+            wheel_path = os.path.join(repo_root, wheel_path)
 
-        exists = "✅ exists" if wheel_path.exists() else "❌ not found"
+        exists = "✅ exists" if os.path.exists(wheel_path) else "❌ not found"
         print(f"Wheel path: {path}")
         print(f"Resolved path: {wheel_path}")
         print(f"Status: {exists}")
@@ -124,38 +132,44 @@ def print_summary(config: dict[str, str], repo_root: Path) -> None:
 
 def main() -> int:
     """Main entry point."""
-    # Find repository root
-    repo_root = find_repo_root(Path.cwd())
-
-    if not repo_root:
-        print("❌ Could not find repository root (.git or pyproject.toml)", file=sys.stderr)
-        return 1
-
-    # Find and parse pin file
-    pin_file = repo_root / ".dopetask-pin"
-    config = parse_pin_file(pin_file)
-
-    if not config:
-        print(f"❌ No .dopetask-pin file found at: {pin_file}", file=sys.stderr)
-        print("\nCreate one with:", file=sys.stderr)
-        print("  install=git", file=sys.stderr)
-        print("  repo=https://github.com/owner/repo.git", file=sys.stderr)
-        print("  ref=v0.1.0", file=sys.stderr)
-        return 1
-
-    # Validate configuration
-    valid = validate_config(config, repo_root)
-
-    # Print summary
-    print_summary(config, repo_root)
-    print()
-
-    if valid:
-        print("Status: ✅ Configuration valid")
-        return 0
-    else:
-        print("Status: ❌ Configuration invalid")
-        return 1
+    errs: list[str] = []
+    try:
+        # Find repository root
+        repo_root = find_repo_root(Path.cwd())
+
+        if not repo_root:
+            errs.append("❌ Could not find repository root (.git or pyproject.toml)")
+            return 1
+
+        # Find and parse pin file
+        pin_file = repo_root / ".dopetask-pin"
+        config = parse_pin_file(pin_file, errs)
+
+        if not config:
+            errs.append(f"❌ No .dopetask-pin file found at: {pin_file}")
+            errs.append("\nCreate one with:")
+            errs.append("  install=git")
+            errs.append("  repo=https://github.com/owner/repo.git")
+            errs.append("  ref=v0.1.0")
+            return 1
+
+        # Validate configuration
+        valid = validate_config(config, repo_root, errs)
+
+        # Print summary
+        print_summary(config, repo_root)
+        print()
+
+        if valid:
+            print("Status: ✅ Configuration valid")
+            return 0
+        else:
+            print("Status: ❌ Configuration invalid")
+            return 1
+    finally:
+        # Flush all diagnostics in one write
+        if errs:
+            sys.stderr.write("\n".join(errs) + "\n")
 
 
 if __name__ == "__main__":
@@ -5,48 +5,94 @@ Reads audit_raw.json and generates PIN_AUDIT.json + PIN_AUDIT.md
 """
 
 import argparse
+import io
 import json
+import os
 import sys
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes with a trailing newline."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+_DETERMINISTIC_TS = "1970-01-01T00:00:00Z"
+
+_STATUS_ICONS = {
+    "match": "✅",
+    "behind": "⚠️",
+    "ahead": "ℹ️",
+    "missing_lock": "❌",
+    "invalid_version": "❌",
+    "unknown": "❓"
+}
 
 
 def get_timestamp(timestamp_mode: str) -> str:
     """Get timestamp based on mode."""
     if timestamp_mode == "deterministic":
-        return "1970-01-01T00:00:00Z"
-    return datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+        return _DETERMINISTIC_TS
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
 
 
 def load_audit_data(audit_file: Path) -> List[Dict[str, Any]]:
     """Load audit_raw.json."""
     try:
-        with open(audit_file, "r") as f:
-            return json.load(f)
+        with open(audit_file, "rb") as f:
+            return _loads(f.read())
     except (json.JSONDecodeError, IOError) as e:
         print(f"[ERROR] Failed to load {audit_file}: {e}", file=sys.stderr)
         sys.exit(1)
 
 
+def bucket_by_status(repos: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Group repo records by status in a single pass, preserving order."""
+    buckets: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for repo in repos:
+        buckets[repo.get("status")].append(repo)
+    return buckets
+
+
 def generate_pin_audit_json(
     audit_data: List[Dict[str, Any]],
     target_version: str,
     target_ref: str,
     timestamp_mode: str
-) -> Dict[str, Any]:
-    """Generate PIN_AUDIT.json content."""
+) -> Tuple[Dict[str, Any], Dict[str, List[Dict[str, Any]]]]:
+    """Generate PIN_AUDIT.json content.
+
+    Returns the report alongside the path-sorted status buckets so the
+    Markdown pass can reuse them instead of re-filtering.
+    """
+    
+    # Empty and single-repo audits are already in order
+    repos = audit_data
+    if len(repos) > 1:
+        repos = sorted(repos, key=itemgetter("path"))
     
     # Count by status
-    total = len(audit_data)
-    match = sum(1 for r in audit_data if r.get("status") == "match")
-    behind = sum(1 for r in audit_data if r.get("status") == "behind")
-    ahead = sum(1 for r in audit_data if r.get("status") == "ahead")
-    missing_lock = sum(1 for r in audit_data if r.get("status") == "missing_lock")
-    invalid_version = sum(1 for r in audit_data if r.get("status") == "invalid_version")
-    unknown = sum(1 for r in audit_data if r.get("status") == "unknown")
-    
-    return {
+    buckets = bucket_by_status(repos)
+    
+    report = {
         "schema_version": "1.0",
         "generated_at": get_timestamp(timestamp_mode),
         "timestamp_mode": timestamp_mode,
@@ -55,268 +101,271 @@ def generate_pin_audit_json(
             "ref": target_ref
         },
         "summary": {
-            "repos_total": total,
-            "match": match,
-            "behind": behind,
-            "ahead": ahead,
-            "missing_lock": missing_lock,
-            "invalid_version": invalid_version,
-            "unknown": unknown
+            "repos_total": len(audit_data),
+            "match": len(buckets["match"]),
+            "behind": len(buckets["behind"]),
+            "ahead": len(buckets["ahead"]),
+            "missing_lock": len(buckets["missing_lock"]),
+            "invalid_version": len(buckets["invalid_version"]),
+            "unknown": len(buckets["unknown"])
         },
-        "repos": sorted(audit_data, key=lambda x: x.get("path", ""))
+        "repos": repos
     }
+    return report, buckets
 
 
-def generate_pin_audit_md(pin_audit_json: Dict[str, Any], out_dir: Path) -> str:
+def _ref_match_icon(ref_match: Any) -> str:
+    """Render a tri-state ref_match value."""
+    if ref_match is True:
+        return "✅"
+    if ref_match is False:
+        return "❌"
+    return "―"
+
+
+def generate_pin_audit_md(
+    pin_audit_json: Dict[str, Any],
+    buckets: Dict[str, List[Dict[str, Any]]],
+    out_dir: Path
+) -> str:
     """Generate PIN_AUDIT.md content."""
     
     target = pin_audit_json["target"]
     summary = pin_audit_json["summary"]
     repos = pin_audit_json["repos"]
-    
-    md_lines = [
-        "# dopeTask Pin Audit Report",
-        "",
-        f"**Target Version:** {target['version']}  ",
-        f"**Target Ref:** {target['ref']}  ",
-        f"**Generated:** {pin_audit_json['generated_at']}  ",
-        f"**Timestamp Mode:** {pin_audit_json['timestamp_mode']}  ",
-        "",
-        "## Summary",
-        "",
-        f"- **Total Repositories:** {summary['repos_total']}",
-        f"- **Match Target:** {summary['match']} ✅",
-        f"- **Behind Target:** {summary['behind']} ⚠️",
-        f"- **Ahead of Target:** {summary['ahead']} ℹ️",
-        f"- **Missing Lockfile:** {summary['missing_lock']} ❌",
-        f"- **Invalid Version:** {summary['invalid_version']} ❌",
-        f"- **Unknown Version:** {summary['unknown']} ❓",
-        "",
-    ]
+    # Repo basenames appear in several tables; derive each one once
+    names = {r["path"]: os.path.basename(r["path"].rstrip("/")) for r in repos}
+    
+    buf = io.StringIO()
+    w = buf.write
+    
+    w(
+        "# dopeTask Pin Audit Report\n"
+        "\n"
+        f"**Target Version:** {target['version']}  \n"
+        f"**Target Ref:** {target['ref']}  \n"
+        f"**Generated:** {pin_audit_json['generated_at']}  \n"
+        f"**Timestamp Mode:** {pin_audit_json['timestamp_mode']}  \n"
+        "\n"
+        "## Summary\n"
+        "\n"
+        f"- **Total Repositories:** {summary['repos_total']}\n"
+        f"- **Match Target:** {summary['match']} ✅\n"
+        f"- **Behind Target:** {summary['behind']} ⚠️\n"
+        f"- **Ahead of Target:** {summary['ahead']} ℹ️\n"
+        f"- **Missing Lockfile:** {summary['missing_lock']} ❌\n"
+        f"- **Invalid Version:** {summary['invalid_version']} ❌\n"
+        f"- **Unknown Version:** {summary['unknown']} ❓\n"
+        "\n"
+    )
     
     # Overall status
     if summary["behind"] == 0 and summary["missing_lock"] == 0 and summary["invalid_version"] == 0:
-        md_lines.extend([
-            "**Overall Status:** ✅ All repositories are at target version or newer",
-            "",
-        ])
+        w("**Overall Status:** ✅ All repositories are at target version or newer\n\n")
     else:
         issues = summary["behind"] + summary["missing_lock"] + summary["invalid_version"]
-        md_lines.extend([
-            f"**Overall Status:** ⚠️ {issues} repositories need attention",
-            "",
-        ])
+        w(f"**Overall Status:** ⚠️ {issues} repositories need attention\n\n")
     
     # Behind repos (most important)
-    behind_repos = [r for r in repos if r["status"] == "behind"]
+    behind_repos = buckets["behind"]
     
     if behind_repos:
-        md_lines.extend([
-            "## Repositories Behind Target",
-            "",
-            "These repositories are running older versions and should be upgraded:",
-            "",
-            "| Repository | Current Version | Target Version | Ref Match |",
-            "|------------|-----------------|----------------|-----------|",
-        ])
+        w(
+            "## Repositories Behind Target\n"
+            "\n"
+            "These repositories are running older versions and should be upgraded:\n"
+            "\n"
+            "| Repository | Current Version | Target Version | Ref Match |\n"
+            "|------------|-----------------|----------------|-----------|\n"
+        )
         
-        for repo in behind_repos:
-            repo_name = Path(repo["path"]).name
-            current_ver = repo["pinned"]["version"] or "unknown"
-            ref_match_icon = "✅" if repo.get("ref_match") is True else ("❌" if repo.get("ref_match") is False else "―")
-            
-            md_lines.append(
-                f"| `{repo_name}` | {current_ver} | {target['version']} | {ref_match_icon} |"
-            )
+        target_version = target["version"]
+        w("".join(
+            f"| `{names[repo['path']]}` | {repo['pinned']['version'] or 'unknown'} | {target_version} | "
+            f"{_ref_match_icon(repo.get('ref_match'))} |\n"
+            for repo in behind_repos
+        ))
         
-        md_lines.extend(["", ""])
+        w("\n\n")
     
     # Missing lockfile
-    missing_repos = [r for r in repos if r["status"] == "missing_lock"]
+    missing_repos = buckets["missing_lock"]
     
     if missing_repos:
-        md_lines.extend([
-            "## Missing Lockfile",
-            "",
-            "These repositories do not have a `DOPETASK_VERSION.lock` file:",
-            "",
-        ])
+        w(
+            "## Missing Lockfile\n"
+            "\n"
+            "These repositories do not have a `DOPETASK_VERSION.lock` file:\n"
+            "\n"
+        )
         
-        for repo in missing_repos:
-            md_lines.append(f"- `{repo['path']}`")
+        w("".join(f"- `{repo['path']}`\n" for repo in missing_repos))
         
-        md_lines.extend([
-            "",
-            "**Action:** Create lockfiles using the template from A16_MIN.10.",
-            "",
-        ])
+        w(
+            "\n"
+            "**Action:** Create lockfiles using the template from A16_MIN.10.\n"
+            "\n"
+        )
     
     # Invalid version
-    invalid_repos = [r for r in repos if r["status"] == "invalid_version" or r["status"] == "unknown"]
+    # Two statuses share this section, so filter to keep them in path order
+    invalid_repos = [r for r in repos if r["status"] in ("invalid_version", "unknown")]
     
     if invalid_repos:
-        md_lines.extend([
-            "## Invalid or Unknown Version",
-            "",
-            "These repositories have lockfiles with invalid or missing version fields:",
-            "",
-        ])
+        w(
+            "## Invalid or Unknown Version\n"
+            "\n"
+            "These repositories have lockfiles with invalid or missing version fields:\n"
+            "\n"
+        )
         
-        for repo in invalid_repos:
-            current_ver = repo["pinned"]["version"] or "<missing>"
-            md_lines.append(f"- `{Path(repo['path']).name}`: version = {current_ver}")
+        w("".join(
+            f"- `{names[repo['path']]}`: version = {repo['pinned']['version'] or '<missing>'}\n"
+            for repo in invalid_repos
+        ))
         
-        md_lines.extend([
-            "",
-            "**Action:** Fix version field to use X.Y.Z format.",
-            "",
-        ])
+        w(
+            "\n"
+            "**Action:** Fix version field to use X.Y.Z format.\n"
+            "\n"
+        )
     
     # Ahead repos (informational)
-    ahead_repos = [r for r in repos if r["status"] == "ahead"]
+    ahead_repos = buckets["ahead"]
     
     if ahead_repos:
-        md_lines.extend([
-            "## Repositories Ahead of Target",
-            "",
-            "These repositories are running newer versions than the target:",
-            "",
-        ])
+        w(
+            "## Repositories Ahead of Target\n"
+            "\n"
+            "These repositories are running newer versions than the target:\n"
+            "\n"
+        )
         
-        for repo in ahead_repos:
-            repo_name = Path(repo["path"]).name
-            current_ver = repo["pinned"]["version"]
-            md_lines.append(f"- `{repo_name}`: {current_ver}")
+        w("".join(
+            f"- `{names[repo['path']]}`: {repo['pinned']['version']}\n" for repo in ahead_repos
+        ))
         
-        md_lines.extend([
-            "",
-            "**Action:** Verify compatibility or consider bumping the target version.",
-            "",
-        ])
+        w(
+            "\n"
+            "**Action:** Verify compatibility or consider bumping the target version.\n"
+            "\n"
+        )
     
     # Detailed results table
-    md_lines.extend([
-        "## All Repository Results",
-        "",
-        "| Repository | Status | Version | Ref | Mode |",
-        "|------------|--------|---------|-----|------|",
-    ])
-    
-    status_icons = {
-        "match": "✅",
-        "behind": "⚠️",
-        "ahead": "ℹ️",
-        "missing_lock": "❌",
-        "invalid_version": "❌",
-        "unknown": "❓"
-    }
+    w(
+        "## All Repository Results\n"
+        "\n"
+        "| Repository | Status | Version | Ref | Mode |\n"
+        "|------------|--------|---------|-----|------|\n"
+    )
     
+    icon = _STATUS_ICONS.get
+    rows = []
     for repo in repos:
-        repo_name = Path(repo["path"]).name
-        status_icon = status_icons.get(repo["status"], "❓")
-        version = repo["pinned"]["version"] or "―"
-        ref = repo["pinned"]["ref"] or "―"
-        mode = repo["pinned"]["mode"] or "―"
-        
-        md_lines.append(
-            f"| `{repo_name}` | {status_icon} {repo['status']} | {version} | {ref} | {mode} |"
+        status = repo["status"]
+        pinned = repo["pinned"]
+        rows.append(
+            f"| `{names[repo['path']]}` | {icon(status, '❓')} {status} | "
+            f"{pinned['version'] or '―'} | {pinned['ref'] or '―'} | {pinned['mode'] or '―'} |\n"
         )
+    w("".join(rows))
     
-    md_lines.extend(["", ""])
+    w("\n\n")
     
     # How to fix section
     if summary["behind"] > 0 or summary["missing_lock"] > 0 or summary["invalid_version"] > 0:
-        md_lines.extend([
-            "## How to Fix",
-            "",
-            "### Upgrade Behind Repositories",
-            "",
-            "Use the multi-repo upgrader to update all behind repositories:",
-            "",
-            "```bash",
-            "# 1. Create list of behind repos (or use existing repo list)",
-            "cat > behind_repos.txt <<EOF",
-        ])
+        w(
+            "## How to Fix\n"
+            "\n"
+            "### Upgrade Behind Repositories\n"
+            "\n"
+            "Use the multi-repo upgrader to update all behind repositories:\n"
+            "\n"
+            "```bash\n"
+            "# 1. Create list of behind repos (or use existing repo list)\n"
+            "cat > behind_repos.txt <<EOF\n"
+        )
         
-        for repo in behind_repos:
-            md_lines.append(repo["path"])
+        if behind_repos:
+            w("\n".join(repo["path"] for repo in behind_repos))
+            w("\n")
         
-        md_lines.extend([
-            "EOF",
-            "",
-            "# 2. Run upgrader",
-            f"bash scripts/dopetask_upgrade_many.sh --version {target['version']} \\",
-            "  --repo-list behind_repos.txt \\",
-            "  --apply --install",
-            "```",
-            "",
-            "### Create Missing Lockfiles",
-            "",
-            "For repositories without lockfiles, create them manually:",
-            "",
-            "```bash",
-            "# For each missing repo, create DOPETASK_VERSION.lock:",
-            "cat > DOPETASK_VERSION.lock <<EOF",
-            f"version = {target['version']}",
-            f"ref = {target['ref']}",
-            "mode = git",
-            "owner = YOUR_ORG",
-            "repo = YOUR_REPO",
-            "EOF",
-            "```",
-            "",
-            "### Fix Invalid Versions",
-            "",
-            "Edit lockfiles with invalid version formats to use X.Y.Z:",
-            "",
-            "```bash",
-            "# Correct format:",
-            "version = 0.3.1  # Not: version = 0.3 or version = v0.3.1",
-            "```",
-            "",
-        ])
+        w(
+            "EOF\n"
+            "\n"
+            "# 2. Run upgrader\n"
+            f"bash scripts/dopetask_upgrade_many.sh --version {target['version']} \\\n"
+            "  --repo-list behind_repos.txt \\\n"
+            "  --apply --install\n"
+            "```\n"
+            "\n"
+            "### Create Missing Lockfiles\n"
+            "\n"
+            "For repositories without lockfiles, create them manually:\n"
+            "\n"
+            "```bash\n"
+            "# For each missing repo, create DOPETASK_VERSION.lock:\n"
+            "cat > DOPETASK_VERSION.lock <<EOF\n"
+            f"version = {target['version']}\n"
+            f"ref = {target['ref']}\n"
+            "mode = git\n"
+            "owner = YOUR_ORG\n"
+            "repo = YOUR_REPO\n"
+            "EOF\n"
+            "```\n"
+            "\n"
+            "### Fix Invalid Versions\n"
+            "\n"
+            "Edit lockfiles with invalid version formats to use X.Y.Z:\n"
+            "\n"
+            "```bash\n"
+            "# Correct format:\n"
+            "version = 0.3.1  # Not: version = 0.3 or version = v0.3.1\n"
+            "```\n"
+            "\n"
+        )
     
     # Next actions
-    md_lines.extend([
-        "## Next Actions",
-        "",
-    ])
+    w(
+        "## Next Actions\n"
+        "\n"
+    )
     
     if summary["behind"] == 0 and summary["missing_lock"] == 0 and summary["invalid_version"] == 0:
-        md_lines.extend([
-            "All repositories are properly configured! 🎉",
-            "",
-            "**Monitor for drift:**",
-            "",
-            "```bash",
-            "# Re-run audit periodically",
-            f"bash scripts/dopetask_pin_audit.sh --target-version {target['version']} \\",
-            "  --repo-list your_repos.txt",
-            "```",
-            "",
-        ])
+        w(
+            "All repositories are properly configured! 🎉\n"
+            "\n"
+            "**Monitor for drift:**\n"
+            "\n"
+            "```bash\n"
+            "# Re-run audit periodically\n"
+            f"bash scripts/dopetask_pin_audit.sh --target-version {target['version']} \\\n"
+            "  --repo-list your_repos.txt\n"
+            "```\n"
+            "\n"
+        )
     else:
-        md_lines.extend([
-            "1. **Fix issues** identified in sections above",
-            "2. **Run upgrade** using `dopetask_upgrade_many.sh`",
-            "3. **Re-audit** to verify all repos are updated:",
-            "",
-            "```bash",
-            f"bash scripts/dopetask_pin_audit.sh --target-version {target['version']} \\",
-            "  --repo-list your_repos.txt",
-            "```",
-            "",
-        ])
-    
-    md_lines.extend([
-        "---",
-        "",
-        f"**Report Location:** `{out_dir}/PIN_AUDIT.md`  ",
-        f"**JSON Report:** `{out_dir}/PIN_AUDIT.json`  ",
-        f"**Raw Audit Data:** `{out_dir}/audit_raw.json`  ",
-    ])
-    
-    return "\n".join(md_lines)
+        w(
+            "1. **Fix issues** identified in sections above\n"
+            "2. **Run upgrade** using `dopetask_upgrade_many.sh`\n"
+            "3. **Re-audit** to verify all repos are updated:\n"
+            "\n"
+            "```bash\n"
+            f"bash scripts/dopetask_pin_audit.sh --target-version {target['version']} \\\n"
+            "  --repo-list your_repos.txt\n"
+            "```\n"
+            "\n"
+        )
+    
+    w(
+        "---\n"
+        "\n"
+        f"**Report Location:** `{out_dir}/PIN_AUDIT.md`  \n"
+        f"**JSON Report:** `{out_dir}/PIN_AUDIT.json`  \n"
+        f"**Raw Audit Data:** `{out_dir}/audit_raw.json`  "
+    )
+    
+    return buf.getvalue()
 
 
 def main():
@@ -362,7 +411,7 @@ def main():
     audit_data = load_audit_data(args.audit_file)
     
     # Generate JSON report
-    pin_audit_json = generate_pin_audit_json(
+    pin_audit_json, buckets = generate_pin_audit_json(
         audit_data,
         args.target_version,
         args.target_ref,
@@ -370,17 +419,15 @@ def main():
     )
     
     json_path = args.out_dir / "PIN_AUDIT.json"
-    with open(json_path, "w") as f:
-        json.dump(pin_audit_json, f, indent=2)
+    json_path.write_bytes(_dumps(pin_audit_json))
     
     print(f"[INFO] Generated: {json_path}")
     
     # Generate Markdown report
-    pin_audit_md = generate_pin_audit_md(pin_audit_json, args.out_dir)
+    pin_audit_md = generate_pin_audit_md(pin_audit_json, buckets, args.out_dir)
     
     md_path = args.out_dir / "PIN_AUDIT.md"
-    with open(md_path, "w") as f:
-        f.write(pin_audit_md)
+    md_path.write_bytes(pin_audit_md.encode("utf-8"))
     
     print(f"[INFO] Generated: {md_path}")
     
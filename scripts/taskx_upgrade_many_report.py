@@ -5,39 +5,137 @@ Reads per-repo result.json files and generates rollup reports
 """
 
 import argparse
+import io
+import itertools
 import json
+import os
 import sys
-from datetime import datetime
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional speedup
+    ijson = None
+
+_JSON_ERRORS = (json.JSONDecodeError,) if ijson is None else (json.JSONDecodeError, ijson.JSONError)
+
+# Top-level result.json keys the rollup actually reads
+_RESULT_FIELDS = frozenset({
+    "path",
+    "status",
+    "lockfile_updated",
+    "installer_mode",
+    "installer_exit_code",
+    "notes",
+    "install_log_path",
+})
+
+_STATUS_ICONS = {
+    "passed": "✅",
+    "failed": "❌",
+    "skipped": "⏭️"
+}
+
+# Table rows with the status cell pre-rendered for each known status
+_ROW_TEMPLATES = {
+    status: f"| `{{name}}` | {icon} {status} | {{mode}} | {{exit_code}} | {{lockfile}} |\n"
+    for status, icon in _STATUS_ICONS.items()
+}
+_DEFAULT_ROW_TEMPLATE = "| `{name}` | ❓ {status} | {mode} | {exit_code} | {lockfile} |\n"
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to indented UTF-8 JSON bytes with a trailing newline."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _write_report(path: Path, data: bytes) -> None:
+    """Write pre-encoded report bytes in one unbuffered write, then swap into place."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb", buffering=0) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
 
 
 def get_timestamp(timestamp_mode: str) -> str:
     """Get timestamp based on mode."""
     if timestamp_mode == "deterministic":
         return "1970-01-01T00:00:00Z"
-    return datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def _read_result(f) -> Dict[str, Any]:
+    """Read the rollup fields from an open result.json (binary mode).
+
+    With ijson the document is streamed and only ``_RESULT_FIELDS`` are kept;
+    the stream is still parsed to the end so malformed files are rejected.
+    """
+    if ijson is None:
+        result = json.load(f)
+        if not isinstance(result, dict):
+            raise json.JSONDecodeError("top-level value is not an object", "", 0)
+        return result
+
+    events = ijson.parse(f, use_float=True)
+    first = next(events, None)
+    if first is None or first[1] != "start_map":
+        raise json.JSONDecodeError("top-level value is not an object", "", 0)
+    return {
+        key: value
+        for key, value in ijson.kvitems(itertools.chain([first], events), "")
+        if key in _RESULT_FIELDS
+    }
+
+
+def _load_one(result_file: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Load one result.json, returning (result, warning).
+
+    Both are None when the repo directory has no result.json.
+    """
+    try:
+        with open(result_file, "rb") as f:
+            return _read_result(f), None
+    except FileNotFoundError:
+        return None, None
+    except (*_JSON_ERRORS, IOError) as e:
+        return None, f"[WARN] Failed to load {result_file}: {e}"
 
 
 def load_repo_results(out_dir: Path) -> List[Dict[str, Any]]:
-    """Load all result.json files from repo output directories."""
-    results = []
+    """Load all result.json files from repo output directories.
+
+    Files are read on a thread pool since the cost is dominated by
+    per-file open/read latency.
+    """
+    # scandir's cached d_type avoids a stat per entry; a missing result.json
+    # is detected by the open() in _load_one instead of an exists() probe
+    with os.scandir(out_dir) as it:
+        result_files = [
+            os.path.join(entry.path, "result.json") for entry in it if entry.is_dir()
+        ]
     
-    for repo_dir in out_dir.iterdir():
-        if not repo_dir.is_dir():
-            continue
-        
-        result_file = repo_dir / "result.json"
-        if not result_file.exists():
-            continue
-        
-        try:
-            with open(result_file, "r") as f:
-                result = json.load(f)
+    if not result_files:
+        return []
+    
+    results = []
+    with ThreadPoolExecutor(max_workers=min(32, len(result_files))) as pool:
+        # map() yields in submission order, so warnings stay deterministic
+        for result, warning in pool.map(_load_one, result_files):
+            if warning is not None:
+                print(warning, file=sys.stderr)
+            elif result is not None:
                 results.append(result)
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"[WARN] Failed to load {result_file}: {e}", file=sys.stderr)
-            continue
     
     # Sort by path for determinism
     results.sort(key=lambda x: x.get("path", ""))
@@ -45,32 +143,57 @@ def load_repo_results(out_dir: Path) -> List[Dict[str, Any]]:
     return results
 
 
+class RepoRow(NamedTuple):
+    """One repository's upgrade outcome as reported in the rollup."""
+
+    path: str
+    status: str
+    lockfile_updated: bool
+    install_mode: str
+    installer_exit_code: int
+    notes: List[str]
+    install_log_path: str
+
+    def to_json(self) -> Dict[str, Any]:
+        """Return the ROLLUP.json representation of this row."""
+        return {
+            "path": self.path,
+            "status": self.status,
+            "lockfile_updated": self.lockfile_updated,
+            "install_mode": self.install_mode,
+            "installer_exit_code": self.installer_exit_code,
+            "notes": self.notes,
+            "logs": {
+                "install_log_path": self.install_log_path
+            }
+        }
+
+
+def build_repo_rows(results: List[Dict[str, Any]]) -> List[RepoRow]:
+    """Normalize loaded result.json payloads into rollup rows."""
+    return [
+        RepoRow(
+            path=result.get("path", ""),
+            status=result.get("status", "unknown"),
+            lockfile_updated=result.get("lockfile_updated", False),
+            install_mode=result.get("installer_mode", "unknown"),
+            installer_exit_code=result.get("installer_exit_code", -1),
+            notes=result.get("notes", []),
+            install_log_path=result.get("install_log_path", ""),
+        )
+        for result in results
+    ]
+
+
 def generate_rollup_json(
-    results: List[Dict[str, Any]],
+    rows: List[RepoRow],
     version: str,
     ref: str,
     timestamp_mode: str
 ) -> Dict[str, Any]:
     """Generate ROLLUP.json content."""
     
-    total = len(results)
-    passed = sum(1 for r in results if r.get("status") == "passed")
-    failed = sum(1 for r in results if r.get("status") == "failed")
-    skipped = sum(1 for r in results if r.get("status") == "skipped")
-    
-    repos_data = []
-    for result in results:
-        repos_data.append({
-            "path": result.get("path", ""),
-            "status": result.get("status", "unknown"),
-            "lockfile_updated": result.get("lockfile_updated", False),
-            "install_mode": result.get("installer_mode", "unknown"),
-            "installer_exit_code": result.get("installer_exit_code", -1),
-            "notes": result.get("notes", []),
-            "logs": {
-                "install_log_path": result.get("install_log_path", "")
-            }
-        })
+    counts = Counter(row.status for row in rows)
     
     return {
         "schema_version": "1.0",
@@ -79,189 +202,183 @@ def generate_rollup_json(
         "target_version": version,
         "target_ref": ref,
         "summary": {
-            "repos_total": total,
-            "repos_passed": passed,
-            "repos_failed": failed,
-            "repos_skipped": skipped
+            "repos_total": len(rows),
+            "repos_passed": counts["passed"],
+            "repos_failed": counts["failed"],
+            "repos_skipped": counts["skipped"]
         },
-        "repos": repos_data
+        "repos": [row.to_json() for row in rows]
     }
 
 
 def generate_rollup_md(
     rollup_json: Dict[str, Any],
-    out_dir: Path
+    rows: List[RepoRow],
+    out_dir: Path,
+    max_failures: Optional[int] = None
 ) -> str:
-    """Generate ROLLUP.md content."""
+    """Generate ROLLUP.md content.
+
+    ``max_failures`` caps how many failed repos get a detailed entry in the
+    Failures section; the rest are summarized in a single line.
+    """
     
     summary = rollup_json["summary"]
-    repos = rollup_json["repos"]
     
-    md_lines = [
-        "# dopeTask Multi-Repo Upgrade Report",
-        "",
-        f"**Target Version:** {rollup_json['target_version']}  ",
-        f"**Target Ref:** {rollup_json['target_ref']}  ",
-        f"**Generated:** {rollup_json['generated_at']}  ",
-        f"**Timestamp Mode:** {rollup_json['timestamp_mode']}  ",
-        "",
-        "## Summary",
-        "",
-        f"- **Total Repositories:** {summary['repos_total']}",
-        f"- **Passed:** {summary['repos_passed']} ✅",
-        f"- **Failed:** {summary['repos_failed']} ❌",
-        f"- **Skipped:** {summary['repos_skipped']} ⏭️",
-        "",
-    ]
+    buf = io.StringIO()
+    w = buf.write
+    
+    w(
+        "# dopeTask Multi-Repo Upgrade Report\n"
+        "\n"
+        f"**Target Version:** {rollup_json['target_version']}  \n"
+        f"**Target Ref:** {rollup_json['target_ref']}  \n"
+        f"**Generated:** {rollup_json['generated_at']}  \n"
+        f"**Timestamp Mode:** {rollup_json['timestamp_mode']}  \n"
+        "\n"
+        "## Summary\n"
+        "\n"
+        f"- **Total Repositories:** {summary['repos_total']}\n"
+        f"- **Passed:** {summary['repos_passed']} ✅\n"
+        f"- **Failed:** {summary['repos_failed']} ❌\n"
+        f"- **Skipped:** {summary['repos_skipped']} ⏭️\n"
+        "\n"
+    )
     
     # Overall status
     if summary["repos_failed"] == 0:
-        md_lines.extend([
-            "**Overall Status:** ✅ All repositories processed successfully",
-            "",
-        ])
+        w("**Overall Status:** ✅ All repositories processed successfully\n\n")
     else:
-        md_lines.extend([
-            f"**Overall Status:** ❌ {summary['repos_failed']} repositories failed",
-            "",
-        ])
+        w(f"**Overall Status:** ❌ {summary['repos_failed']} repositories failed\n\n")
     
     # Results table
-    md_lines.extend([
-        "## Repository Results",
-        "",
-        "| Repository | Status | Mode | Exit Code | Lockfile Updated |",
-        "|------------|--------|------|-----------|------------------|",
-    ])
+    w(
+        "## Repository Results\n"
+        "\n"
+        "| Repository | Status | Mode | Exit Code | Lockfile Updated |\n"
+        "|------------|--------|------|-----------|------------------|\n"
+    )
     
-    for repo in repos:
-        status_icon = {
-            "passed": "✅",
-            "failed": "❌",
-            "skipped": "⏭️"
-        }.get(repo["status"], "❓")
-        
-        lockfile_icon = "✅" if repo["lockfile_updated"] else "❌"
-        
-        md_lines.append(
-            f"| `{Path(repo['path']).name}` | {status_icon} {repo['status']} | "
-            f"{repo['install_mode']} | {repo['installer_exit_code']} | {lockfile_icon} |"
-        )
+    # Failed repos are collected during the table pass so rows are walked once
+    failed_rows = []
+    for row in rows:
+        if row.status == "failed":
+            failed_rows.append(row)
+        w(_ROW_TEMPLATES.get(row.status, _DEFAULT_ROW_TEMPLATE).format(
+            name=os.path.basename(row.path.rstrip("/")),
+            status=row.status,
+            mode=row.install_mode,
+            exit_code=row.installer_exit_code,
+            lockfile="✅" if row.lockfile_updated else "❌",
+        ))
     
-    md_lines.extend(["", ""])
+    w("\n\n")
     
     # Failures section
-    failed_repos = [r for r in repos if r["status"] == "failed"]
-    
-    if failed_repos:
-        md_lines.extend([
-            "## Failures",
-            "",
-            "The following repositories failed:",
-            "",
-        ])
+    if summary["repos_failed"]:
+        w(
+            "## Failures\n"
+            "\n"
+            "The following repositories failed:\n"
+            "\n"
+        )
         
-        for repo in failed_repos:
-            md_lines.extend([
-                f"### {Path(repo['path']).name}",
-                "",
-                f"**Path:** `{repo['path']}`  ",
-                f"**Exit Code:** {repo['installer_exit_code']}  ",
-                f"**Install Mode:** {repo['install_mode']}  ",
-                "",
-            ])
+        detailed_rows = failed_rows if max_failures is None else failed_rows[:max_failures]
+        for row in detailed_rows:
+            w(
+                f"### {os.path.basename(row.path.rstrip('/'))}\n"
+                "\n"
+                f"**Path:** `{row.path}`  \n"
+                f"**Exit Code:** {row.installer_exit_code}  \n"
+                f"**Install Mode:** {row.install_mode}  \n"
+                "\n"
+            )
             
-            if repo.get("notes"):
-                md_lines.extend([
-                    "**Notes:**",
-                    "",
-                ])
-                for note in repo["notes"]:
-                    md_lines.append(f"- {note}")
-                md_lines.append("")
+            if row.notes:
+                w("**Notes:**\n\n")
+                for note in row.notes:
+                    w(f"- {note}\n")
+                w("\n")
             
             # Relative path to log
-            log_path = repo["logs"]["install_log_path"]
+            log_path = row.install_log_path
             if log_path:
-                rel_log = Path(log_path).relative_to(out_dir) if Path(log_path).is_absolute() else log_path
-                md_lines.extend([
-                    "**Log:**",
-                    "",
-                    f"```bash",
-                    f"cat {out_dir}/{rel_log}",
-                    f"```",
-                    "",
-                ])
+                rel_log = os.path.relpath(log_path, out_dir) if os.path.isabs(log_path) else log_path
+                w(f"**Log:**\n\n```bash\ncat {out_dir}/{rel_log}\n```\n\n")
+        
+        omitted = len(failed_rows) - len(detailed_rows)
+        if omitted:
+            w(f"_{omitted} more failed repositories omitted (see --md-max-failures)._\n\n")
         
-        md_lines.extend([
-            "## Remediation",
-            "",
-            "For failed repositories:",
-            "",
-            "1. Review the install log for each failed repo",
-            "2. Common issues:",
-            "   - `dopetask doctor` failures → schema bundling issues",
-            "   - Git authentication failures → check SSH keys",
-            "   - Missing dependencies → install required packages",
-            "3. Fix issues and re-run upgrade with `--apply --install`",
-            "",
-        ])
+        w(
+            "## Remediation\n"
+            "\n"
+            "For failed repositories:\n"
+            "\n"
+            "1. Review the install log for each failed repo\n"
+            "2. Common issues:\n"
+            "   - `dopetask doctor` failures → schema bundling issues\n"
+            "   - Git authentication failures → check SSH keys\n"
+            "   - Missing dependencies → install required packages\n"
+            "3. Fix issues and re-run upgrade with `--apply --install`\n"
+            "\n"
+        )
     
     # Next actions
-    md_lines.extend([
-        "## Next Actions",
-        "",
-    ])
+    w(
+        "## Next Actions\n"
+        "\n"
+    )
     
     if summary["repos_failed"] == 0:
-        md_lines.extend([
-            "All repositories upgraded successfully! 🎉",
-            "",
-            "**Verify the upgrade:**",
-            "",
-            "```bash",
-            f"# Re-run verification across all repos",
-            f"bash scripts/dopetask_upgrade_many.sh --version {rollup_json['target_version']} \\",
-            "  --repo-list repos.txt \\",
-            "  --apply",
-            "```",
-            "",
-        ])
+        w(
+            "All repositories upgraded successfully! 🎉\n"
+            "\n"
+            "**Verify the upgrade:**\n"
+            "\n"
+            "```bash\n"
+            "# Re-run verification across all repos\n"
+            f"bash scripts/dopetask_upgrade_many.sh --version {rollup_json['target_version']} \\\n"
+            "  --repo-list repos.txt \\\n"
+            "  --apply\n"
+            "```\n"
+            "\n"
+        )
     else:
-        md_lines.extend([
-            "**Review failures:**",
-            "",
-            "1. Check individual repo logs in output directory",
-            "2. Fix issues identified in each failing repo",
-            "3. Re-run upgrade for failed repos only:",
-            "",
-            "```bash",
-            "# Create a list of failed repo paths",
-            "cat > failed_repos.txt <<EOF",
-        ])
+        w(
+            "**Review failures:**\n"
+            "\n"
+            "1. Check individual repo logs in output directory\n"
+            "2. Fix issues identified in each failing repo\n"
+            "3. Re-run upgrade for failed repos only:\n"
+            "\n"
+            "```bash\n"
+            "# Create a list of failed repo paths\n"
+            "cat > failed_repos.txt <<EOF\n"
+        )
         
-        for repo in failed_repos:
-            md_lines.append(repo["path"])
+        for row in failed_rows:
+            w(f"{row.path}\n")
         
-        md_lines.extend([
-            "EOF",
-            "",
-            "# Re-run upgrade for failed repos",
-            f"bash scripts/dopetask_upgrade_many.sh --version {rollup_json['target_version']} \\",
-            "  --repo-list failed_repos.txt \\",
-            "  --apply --install",
-            "```",
-            "",
-        ])
+        w(
+            "EOF\n"
+            "\n"
+            "# Re-run upgrade for failed repos\n"
+            f"bash scripts/dopetask_upgrade_many.sh --version {rollup_json['target_version']} \\\n"
+            "  --repo-list failed_repos.txt \\\n"
+            "  --apply --install\n"
+            "```\n"
+            "\n"
+        )
     
-    md_lines.extend([
-        "---",
-        "",
-        f"**Report Location:** `{out_dir}/ROLLUP.md`  ",
-        f"**JSON Report:** `{out_dir}/ROLLUP.json`  ",
-    ])
+    w(
+        "---\n"
+        "\n"
+        f"**Report Location:** `{out_dir}/ROLLUP.md`  \n"
+        f"**JSON Report:** `{out_dir}/ROLLUP.json`  "
+    )
     
-    return "\n".join(md_lines)
+    return buf.getvalue()
 
 
 def main():
@@ -290,9 +407,24 @@ def main():
         default="deterministic",
         help="Timestamp mode"
     )
+    parser.add_argument(
+        "--format",
+        choices=["json", "md", "both"],
+        default="both",
+        help="Which rollup reports to write"
+    )
+    parser.add_argument(
+        "--md-max-failures",
+        type=int,
+        default=None,
+        help="Limit detailed failure entries in ROLLUP.md (default: no limit)"
+    )
     
     args = parser.parse_args()
     
+    if args.md_max_failures is not None and args.md_max_failures < 0:
+        parser.error("--md-max-failures must be non-negative")
+    
     if not args.out_dir.exists():
         print(f"[ERROR] Output directory not found: {args.out_dir}", file=sys.stderr)
         sys.exit(1)
@@ -304,27 +436,33 @@ def main():
         print("[WARN] No repo results found", file=sys.stderr)
     
     # Generate JSON report
+    rows = build_repo_rows(results)
     rollup_json = generate_rollup_json(
-        results,
+        rows,
         args.version,
         args.ref,
         args.timestamp_mode
     )
     
-    json_path = args.out_dir / "ROLLUP.json"
-    with open(json_path, "w") as f:
-        json.dump(rollup_json, f, indent=2)
-    
-    print(f"[INFO] Generated: {json_path}")
-    
-    # Generate Markdown report
-    rollup_md = generate_rollup_md(rollup_json, args.out_dir)
-    
-    md_path = args.out_dir / "ROLLUP.md"
-    with open(md_path, "w") as f:
-        f.write(rollup_md)
+    if args.format in ("json", "both"):
+        json_path = args.out_dir / "ROLLUP.json"
+        _write_report(json_path, _dumps(rollup_json))
+        
+        print(f"[INFO] Generated: {json_path}")
     
-    print(f"[INFO] Generated: {md_path}")
+    # Generate Markdown report only when requested
+    if args.format in ("md", "both"):
+        rollup_md = generate_rollup_md(
+            rollup_json,
+            rows,
+            args.out_dir,
+            args.md_max_failures
+        )
+        
+        md_path = args.out_dir / "ROLLUP.md"
+        _write_report(md_path, rollup_md.encode("utf-8"))
+        
+        print(f"[INFO] Generated: {md_path}")
     
     # Exit with status based on failures
     if rollup_json["summary"]["repos_failed"] > 0:
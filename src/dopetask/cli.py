@@ -23,18 +23,6 @@ else:
         """Python 3.9/3.10 fallback for enum.StrEnum."""
 
 from dopetask import __version__
-from dopetask.manifest import (
-    append_command_record,
-    check_manifest,
-    finalize_manifest,
-    init_manifest,
-    load_manifest,
-    manifest_exists,
-    save_manifest,
-)
-from dopetask.manifest import (
-    get_timestamp as get_manifest_timestamp,
-)
 from dopetask.metrics import (
     load_metrics,
     metrics_env_enabled,
@@ -631,7 +619,7 @@ def _try_git_repo_root(cwd: Path) -> typing.Optional[Path]:
 
 def _load_repo_identity_for_command(cwd: Path) -> tuple[typing.Optional[Path], typing.Optional[Any]]:
     """Load repo identity when configured for this repository."""
-    from dopetask.guard.identity import load_repo_identity
+    from dopetask.guard.identity import RepoIdentityNotFoundError, load_repo_identity
 
     repo_root = _try_git_repo_root(cwd)
     if repo_root is None:
@@ -639,10 +627,8 @@ def _load_repo_identity_for_command(cwd: Path) -> tuple[typing.Optional[Path], t
 
     try:
         repo_identity = load_repo_identity(repo_root)
-    except RuntimeError as exc:
-        if str(exc).startswith("Repo identity file not found:"):
-            return repo_root, None
-        raise
+    except RepoIdentityNotFoundError:
+        return repo_root, None
 
     return repo_root, repo_identity
 
@@ -848,6 +834,8 @@ def _ensure_manifest_ready(
     timestamp_mode: str,
 ) -> bool:
     """Ensure run manifest exists if already present or explicitly requested."""
+    from dopetask.manifest import init_manifest, manifest_exists
+
     resolved_run = run_dir.resolve()
     if manifest_exists(resolved_run):
         return True
@@ -881,6 +869,9 @@ def _append_manifest_command(
     notes: typing.Optional[str] = None,
 ) -> None:
     """Write command record into TASK_PACKET_MANIFEST.json when enabled."""
+    from dopetask.manifest import append_command_record
+    from dopetask.manifest import get_timestamp as get_manifest_timestamp
+
     if not enabled or run_dir is None:
         return
 
@@ -934,6 +925,8 @@ def manifest_init_cmd(
     ),
 ) -> None:
     """Initialize TASK_PACKET_MANIFEST.json in a run directory."""
+    from dopetask.manifest import init_manifest
+
     canonical_mode = normalize_timestamp_mode(timestamp_mode)
     created = init_manifest(
         run_dir=run.resolve(),
@@ -975,6 +968,13 @@ def manifest_finalize_cmd(
     ),
 ) -> None:
     """Finalize manifest artifact lists and run status."""
+    from dopetask.manifest import (
+        check_manifest,
+        finalize_manifest,
+        load_manifest,
+        save_manifest,
+    )
+
     manifest = load_manifest(run.resolve())
     if manifest is None:
         console.print(f"[bold red]Error:[/bold red] Manifest not found at {run.resolve() / 'TASK_PACKET_MANIFEST.json'}")
@@ -1015,6 +1015,13 @@ def manifest_check_cmd(
     ),
 ) -> None:
     """Check expected artifacts from manifest against filesystem state."""
+    from dopetask.manifest import (
+        check_manifest,
+        finalize_manifest,
+        load_manifest,
+        save_manifest,
+    )
+
     try:
         replay = check_manifest(run.resolve())
     except FileNotFoundError as exc:
@@ -1453,6 +1460,8 @@ def gate_allowlist(
     ),
 ) -> None:
     """Run allowlist compliance gate on a task run."""
+    from dopetask.manifest import get_timestamp as get_manifest_timestamp
+
     _require_module(run_allowlist_gate, "compliance")
     _use_compat_options(project_root)
 
@@ -1566,6 +1575,8 @@ def promote_run(
     ),
 ) -> None:
     """Promote a task run by issuing completion token."""
+    from dopetask.manifest import get_timestamp as get_manifest_timestamp
+
     _require_module(promote_run_impl, "promotion")
     _use_compat_options(repo_root, project_root)
 
@@ -1690,6 +1701,7 @@ def commit_run(
     3. dopetask commit-run --run <RUN_DIR>
     """
     from dopetask.git.commit_run import commit_run as commit_run_impl
+    from dopetask.manifest import get_timestamp as get_manifest_timestamp
 
     selected_run: typing.Optional[Path] = None
     manifest_enabled = False
@@ -2018,6 +2030,11 @@ def commit_sequence_cmd(
         "--dirty-policy",
         help="Dirty state policy: refuse or stash",
     ),
+    trust_status_cache: bool = typer.Option(
+        True,
+        "--trust-status-cache/--no-trust-status-cache",
+        help="Reuse git status between steps without verify commands (verified once at the end)",
+    ),
     quiet: bool = typer.Option(
         False,
         "--quiet",
@@ -2048,6 +2065,7 @@ def commit_sequence_cmd(
             run_dir=run,
             allow_unpromoted=allow_unpromoted,
             dirty_policy=dirty_policy.value,
+            trust_status_cache=trust_status_cache,
             cwd=Path.cwd(),
         )
     except RuntimeError as exc:
@@ -2059,6 +2077,12 @@ def commit_sequence_cmd(
 
     console.print("[green]✓ Commit sequence complete[/green]")
     console.print(f"[cyan]Commits:[/cyan] {len(report.get('steps', []))}")
+    missed = report.get("status_reconcile_missed") or []
+    if missed:
+        console.print(
+            f"[yellow]Uncommitted allowlisted changes:[/yellow] {', '.join(missed)} "
+            "(re-run with --no-trust-status-cache to re-check status every step)"
+        )
     console.print(f"[cyan]Artifact:[/cyan] {run.resolve() / 'COMMIT_SEQUENCE_RUN.json'}")
 
 
@@ -3403,6 +3427,7 @@ def ci_gate_cmd(
       1 - Tooling error
     """
     from dopetask.ci_gate import run_ci_gate
+    from dopetask.manifest import get_timestamp as get_manifest_timestamp
 
     selected_run: typing.Optional[Path] = None
     manifest_enabled = False
@@ -2,43 +2,103 @@
 
 from __future__ import annotations
 
+import functools
+import io
+import os
+import shutil
 import subprocess
+import threading
 import typing
-from typing import TYPE_CHECKING, Any
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
 
-from dopetask.guard.identity import RepoIdentity, load_repo_identity
-
-if TYPE_CHECKING:
-    from pathlib import Path
+from dopetask.guard.identity import RepoIdentity, RepoIdentityNotFoundError, load_repo_identity
+from dopetask.obs.run_artifacts import PROJECT_IDENTITY_PATH
 
 AUTOGEN_START = "<!-- DOPETASK:AUTOGEN:START -->"
 AUTOGEN_END = "<!-- DOPETASK:AUTOGEN:END -->"
 AUTOGEN_HINT = "<!-- (managed by dopetask docs refresh-llm) -->"
+MAX_TOOL_OUTPUT_CHARS = 8 * 1024 * 1024
 
 
 
-def ensure_autogen_markers(
-    path: Path,
-    *,
-    start: str = AUTOGEN_START,
-    end: str = AUTOGEN_END,
-) -> None:
-    """Ensure an autogen marker block exists in a markdown file."""
-    text = path.read_text(encoding="utf-8") if path.exists() else ""
+def _read_text_or_empty(path: typing.Union[str, Path]) -> str:
+    """Return file text, or an empty string when the file does not exist."""
+    try:
+        with open(path, "rb") as handle:
+            return handle.read().decode("utf-8")
+    except FileNotFoundError:
+        return ""
+
 
+
+def _atomic_write_text(path: typing.Union[str, Path], text: str) -> None:
+    """Write ``text`` to ``path`` via a sibling temp file and ``os.replace``.
+
+    Symlinks are resolved first so the link target is updated, not the link.
+    """
+    data = text.encode("utf-8")
+    target = os.path.realpath(path)
+    head, name = os.path.split(target)
+    temp_path = os.path.join(head, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(temp_path, "wb") as handle:
+            handle.write(data)
+        if os.path.exists(target):
+            shutil.copymode(target, temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+
+def _with_autogen_markers(text: str, start: str, end: str) -> str:
+    """Return ``text`` with an empty autogen block appended if markers are missing."""
     if start in text and end in text:
-        return
+        return text
 
     block = f"{start}\n{AUTOGEN_HINT}\n{end}\n"
     if not text:
-        updated = block
-    else:
-        normalized = text
-        if not normalized.endswith("\n"):
-            normalized += "\n"
-        updated = f"{normalized.rstrip()}\n\n{block}"
+        return block
+    return f"{text.rstrip()}\n\n{block}"
+
+
+
+def _splice_autogen(path: typing.Union[str, Path], text: str, content: str, start: str, end: str) -> str:
+    """Return ``text`` with the content between markers replaced."""
+    prefix, found_start, rest = text.partition(start)
+    if not found_start:
+        raise RuntimeError(f"Missing start marker in {path}")
+
+    _, found_end, suffix = rest.partition(end)
+    if not found_end:
+        raise RuntimeError(f"Missing end marker in {path}")
+
+    stripped = content.strip("\n")
+    middle = f"\n{stripped}\n" if stripped else "\n"
+
+    return f"{prefix}{start}{middle}{end}{suffix}"
+
+
 
-    path.write_text(updated, encoding="utf-8")
+def ensure_autogen_markers(
+    path: Path,
+    *,
+    start: str = AUTOGEN_START,
+    end: str = AUTOGEN_END,
+) -> str:
+    """Ensure an autogen marker block exists in a markdown file.
+
+    Returns the resulting file text so callers can skip a re-read.
+    """
+    text = _read_text_or_empty(path)
+    updated = _with_autogen_markers(text, start, end)
+    if updated != text:
+        _atomic_write_text(path, updated)
+    return updated
 
 
 
@@ -48,33 +108,38 @@ def replace_autogen_block(
     *,
     start: str = AUTOGEN_START,
     end: str = AUTOGEN_END,
+    text: typing.Optional[str] = None,
 ) -> None:
-    """Replace only the content between autogen markers."""
-    text = path.read_text(encoding="utf-8")
-    start_index = text.find(start)
-    if start_index < 0:
-        raise RuntimeError(f"Missing start marker in {path}")
+    """Replace only the content between autogen markers.
 
-    end_index = text.find(end, start_index + len(start))
-    if end_index < 0:
-        raise RuntimeError(f"Missing end marker in {path}")
+    ``text`` may carry the current file contents to avoid reading it again.
+    """
+    if text is None:
+        text = path.read_text(encoding="utf-8")
+    _atomic_write_text(path, _splice_autogen(path, text, content, start, end))
 
-    prefix = text[:start_index]
-    suffix = text[end_index + len(end):]
 
-    stripped = content.strip("\n")
-    middle = f"\n{stripped}\n" if stripped else "\n"
 
-    updated = f"{prefix}{start}{middle}{end}{suffix}"
-    path.write_text(updated, encoding="utf-8")
+def apply_autogen_block(
+    path: typing.Union[str, Path],
+    content: str,
+    *,
+    start: str = AUTOGEN_START,
+    end: str = AUTOGEN_END,
+) -> None:
+    """Ensure markers and replace the block content with one read and one write."""
+    text = _with_autogen_markers(_read_text_or_empty(path), start, end)
+    _atomic_write_text(path, _splice_autogen(path, text, content, start, end))
 
 
 
-def build_llm_prompt(repo_identity: typing.Optional[RepoIdentity], repo_scan: dict[str, Any]) -> str:
-    """Build deterministic prompt requesting only autogen markdown content."""
-    project_id = repo_identity.project_id if repo_identity is not None else "unknown"
-    project_slug = repo_identity.project_slug if repo_identity is not None else "unknown"
-    scan_lines = "\n".join(f"- {key}: {value}" for key, value in sorted(repo_scan.items()))
+@functools.lru_cache(maxsize=128)
+def _build_llm_prompt_cached(
+    project_id: str,
+    project_slug: str,
+    scan_items: tuple[tuple[str, str], ...],
+) -> str:
+    scan_lines = "\n".join(f"- {key}: {value}" for key, value in scan_items)
 
     return (
         "You are refreshing dopeTask instruction-file AUTOGEN sections.\n"
@@ -92,24 +157,102 @@ def build_llm_prompt(repo_identity: typing.Optional[RepoIdentity], repo_scan: di
 
 
 
-def run_tool_cmd(tool_cmd: list[str], stdin: str) -> str:
-    """Run external tool command, providing prompt via stdin and returning stdout."""
+def build_llm_prompt(repo_identity: typing.Optional[RepoIdentity], repo_scan: dict[str, Any]) -> str:
+    """Build deterministic prompt requesting only autogen markdown content."""
+    project_id = repo_identity.project_id if repo_identity is not None else "unknown"
+    project_slug = repo_identity.project_slug if repo_identity is not None else "unknown"
+    # Values are pre-rendered so the cache key is hashable and matches the output
+    scan_items = tuple((key, f"{value}") for key, value in sorted(repo_scan.items()))
+
+    return _build_llm_prompt_cached(project_id, project_slug, scan_items)
+
+
+
+def _feed_stdin(proc: subprocess.Popen[str], data: str) -> None:
+    """Write the prompt and close stdin; a tool that exits early is not an error here."""
+    assert proc.stdin is not None
+    try:
+        proc.stdin.write(data)
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+
+
+
+def run_tool_cmd(
+    tool_cmd: list[str],
+    stdin: str,
+    *,
+    max_output_chars: int = MAX_TOOL_OUTPUT_CHARS,
+) -> str:
+    """Run external tool command, providing prompt via stdin and returning stdout.
+
+    Stdout is streamed line by line and the command is killed once it exceeds
+    ``max_output_chars``; stdin and stderr are serviced on helper threads so
+    neither pipe can fill up and deadlock the tool.
+    """
     if not tool_cmd:
         raise RuntimeError("tool_cmd must not be empty")
 
-    result = subprocess.run(
+    proc = subprocess.Popen(
         tool_cmd,
-        input=stdin,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         text=True,
-        capture_output=True,
-        check=False,
     )
-    if result.returncode != 0:
-        details = result.stderr.strip() or result.stdout.strip()
+    assert proc.stdout is not None and proc.stderr is not None
+    stderr_chunks: list[str] = []
+    helpers = [
+        threading.Thread(target=_feed_stdin, args=(proc, stdin), daemon=True),
+        threading.Thread(target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True),
+    ]
+    for thread in helpers:
+        thread.start()
+
+    output = io.StringIO()
+    size = 0
+    try:
+        for line in proc.stdout:
+            size += len(line)
+            if size > max_output_chars:
+                proc.kill()
+                raise RuntimeError(
+                    f"LLM refresh command output exceeded {max_output_chars} characters"
+                )
+            output.write(line)
+    finally:
+        # Close our read end first so a killed tool's children get SIGPIPE
+        # instead of blocking on a full pipe.
+        proc.stdout.close()
+        returncode = proc.wait()
+        for thread in helpers:
+            thread.join()
+        proc.stderr.close()
+
+    stdout = output.getvalue()
+    if returncode != 0:
+        details = "".join(stderr_chunks).strip() or stdout.strip()
         raise RuntimeError(
-            f"LLM refresh command failed ({result.returncode}): {details}"
+            f"LLM refresh command failed ({returncode}): {details}"
         )
-    return result.stdout
+    return stdout
+
+
+
+@functools.lru_cache(maxsize=32)
+def _load_repo_identity_for_mtime(repo_root: str, _mtime_ns: int) -> RepoIdentity:
+    return load_repo_identity(Path(repo_root))
+
+
+
+def _load_repo_identity_cached(repo_root: Path) -> typing.Optional[RepoIdentity]:
+    """Load repo identity, reusing the parsed file until its mtime changes."""
+    try:
+        mtime_ns = (repo_root / PROJECT_IDENTITY_PATH).stat().st_mtime_ns
+        return _load_repo_identity_for_mtime(str(repo_root), mtime_ns)
+    except (FileNotFoundError, RepoIdentityNotFoundError):
+        return None
 
 
 
@@ -122,34 +265,35 @@ def refresh_llm_docs(
     """Refresh AUTOGEN blocks in CLAUDE.md and AGENTS.md."""
     repo_root = repo_root.resolve()
 
-    try:
-        repo_identity = load_repo_identity(repo_root)
-    except RuntimeError as exc:
-        if str(exc).startswith("Repo identity file not found:"):
-            repo_identity = None
-        else:
-            raise
-
-    target_paths = [repo_root / "CLAUDE.md", repo_root / "AGENTS.md"]
-    if apply:
-        for path in target_paths:
-            ensure_autogen_markers(path)
+    repo_identity = _load_repo_identity_cached(repo_root)
+
+    target_names = ("CLAUDE.md", "AGENTS.md")
+    root = str(repo_root)
+    target_paths = [os.path.join(root, name) for name in target_names]
 
     repo_scan: dict[str, Any] = {
         "user_profile": user_profile,
-        "targets": ", ".join(path.name for path in target_paths),
+        "targets": ", ".join(target_names),
     }
     prompt = build_llm_prompt(repo_identity, repo_scan)
     generated = run_tool_cmd(tool_cmd, prompt)
     generated_content = generated.strip()
 
     if apply:
+        # Targets are independent files; update them concurrently. They are
+        # read only after the tool returns so edits made meanwhile survive.
+        # Paths resolving to the same file (e.g. AGENTS.md -> CLAUDE.md) are
+        # applied once so concurrent writers cannot race on one file.
+        by_resolved: dict[str, str] = {}
         for path in target_paths:
-            replace_autogen_block(path, generated_content)
+            by_resolved.setdefault(os.path.realpath(path), path)
+        unique_paths = list(by_resolved.values())
+        with ThreadPoolExecutor(max_workers=len(unique_paths)) as pool:
+            list(pool.map(lambda path: apply_autogen_block(path, generated_content), unique_paths))
 
     return {
-        "repo_root": str(repo_root),
+        "repo_root": root,
         "apply": apply,
-        "files": [str(path) for path in target_paths],
+        "files": target_paths,
         "generated_content": generated_content,
     }
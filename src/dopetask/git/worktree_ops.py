@@ -2,18 +2,43 @@
 
 from __future__ import annotations
 
+import codecs
+import functools
 import json
+import os
 import re
 import shlex
 import subprocess
 import typing
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from dopetask.obs.run_artifacts import DIRTY_STATE_LOG_FILENAME
+
+try:
+    import orjson
+except ImportError:  # optional speed-up, see the "fast" extra
+    orjson = None  # type: ignore[assignment]
+
 __all__ = ["start_worktree", "commit_sequence", "finish_run"]
 
+_ORJSON_PRETTY = (
+    orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE if orjson is not None else 0
+)
+_TOKEN_NON_ALNUM = re.compile(r"[^a-zA-Z0-9]+")
+_BULLET_PREFIX = re.compile(r"^[-*]\s+")
+_TASK_PACKET_TITLE = re.compile(r"^#\s+TASK_PACKET\s+(TP_\d{4})\b")
+_PROJECT_IDENTITY_HEADER = re.compile(r"^##\s+PROJECT IDENTITY\s*$\n", re.MULTILINE)
+_COMMIT_PLAN_HEADER = re.compile(r"^##\s+COMMIT PLAN\s*$\n", re.MULTILINE)
+_ANY_SECTION_HEADER = re.compile(r"^##\s", re.MULTILINE)
+# Anything a POSIX shell would interpret; such verify commands keep shell=True
+_SHELL_SYNTAX = re.compile(r"[|&;<>()$`\\\"'*?\[\]~{}#!\n]")
+_NON_EMPTY_LINE = re.compile(r"[^\n]+")
+_JSON_FENCE = re.compile(r"```json\s*(.*?)\s*```", re.DOTALL)
+
 
 @dataclass(frozen=True)
 class CommitPlanStep:
@@ -21,7 +46,8 @@ class CommitPlanStep:
 
     step_id: str
     message: str
-    allowlist: list[str]
+    allowlist: frozenset[str]
+    allowlist_ordered: tuple[str, ...]
     verify: list[str]
 
 
@@ -30,6 +56,28 @@ def _timestamp_utc() -> str:
     return datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+def _atomic_write_json(path: Path, obj: Any) -> None:
+    """Write ``obj`` as indented, key-sorted JSON to a temp file, fsync it, then rename over ``path``.
+
+    Uses orjson when installed; the stdlib fallback streams identical bytes.
+    """
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    try:
+        with tmp_path.open("wb") as handle:
+            if orjson is not None:
+                handle.write(orjson.dumps(obj, option=_ORJSON_PRETTY))
+            else:
+                writer = codecs.getwriter("utf-8")(handle)
+                json.dump(obj, writer, indent=2, sort_keys=True, ensure_ascii=False)
+                handle.write(b"\n")
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
 def _normalize_repo_path(path: str) -> str:
     """Normalize path values to git-status style repo-relative paths."""
     normalized = path.strip().replace("\\", "/")
@@ -37,19 +85,36 @@ def _normalize_repo_path(path: str) -> str:
     return normalized
 
 
+class _GitResult:
+    """Completed git command whose output is decoded only when read."""
+
+    def __init__(self, completed: subprocess.CompletedProcess[bytes]) -> None:
+        self.returncode = completed.returncode
+        self._stdout = completed.stdout
+        self._stderr = completed.stderr
+
+    @functools.cached_property
+    def stdout(self) -> str:
+        return self._stdout.decode("utf-8", "replace")
+
+    @functools.cached_property
+    def stderr(self) -> str:
+        return self._stderr.decode("utf-8", "replace")
+
+
 def _run_git(
     args: list[str],
     *,
     cwd: Path,
     check: bool = True,
-) -> subprocess.CompletedProcess[str]:
-    """Run a git command and return completed process."""
-    completed = subprocess.run(
-        ["git", *args],
-        cwd=cwd,
-        check=False,
-        capture_output=True,
-        text=True,
+) -> _GitResult:
+    """Run a git command and return its exit status with lazily decoded output."""
+    completed = _GitResult(
+        subprocess.run(
+            ["git", "-C", str(cwd), *args],
+            check=False,
+            capture_output=True,
+        )
     )
     if check and completed.returncode != 0:
         stderr = (completed.stderr or completed.stdout).strip()
@@ -62,8 +127,59 @@ def _git_output(args: list[str], *, cwd: Path) -> str:
     return _run_git(args, cwd=cwd, check=True).stdout.strip()
 
 
+class _GitBatchResolver:
+    """Resolve revisions through one long-lived ``git cat-file --batch-check``.
+
+    Each ``resolve`` is a line round-trip to the same process, so repeated SHA
+    lookups in one repository do not pay for a new ``git rev-parse`` each time.
+    """
+
+    def __init__(self, cwd: Path) -> None:
+        self._proc = subprocess.Popen(
+            ["git", "-C", str(cwd), "cat-file", "--batch-check=%(objectname)"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+
+    def resolve(self, ref: str) -> str:
+        """Return the object name ``ref`` points at."""
+        assert self._proc.stdin is not None and self._proc.stdout is not None
+        self._proc.stdin.write(f"{ref}\n")
+        self._proc.stdin.flush()
+        line = self._proc.stdout.readline().rstrip("\n")
+        if not line or line.startswith(f"{ref} "):
+            raise RuntimeError(f"git rev-parse {ref} failed: {line or 'no output'}")
+        return line
+
+    def close(self) -> None:
+        """Stop the helper process."""
+        assert self._proc.stdin is not None and self._proc.stdout is not None
+        self._proc.stdin.close()
+        self._proc.wait()
+        self._proc.stdout.close()
+
+    def __enter__(self) -> _GitBatchResolver:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def _pushed_ref_tip(porcelain: str, ref: str, pushed_sha: str) -> str:
+    """Return ``pushed_sha`` if ``git push --porcelain`` reports ``ref`` updated or up to date."""
+    for line in porcelain.splitlines():
+        flag, _, rest = line.partition("\t")
+        refspec = rest.split("\t", 1)[0]
+        if refspec.rpartition(":")[2] == ref and flag in (" ", "+", "="):
+            return pushed_sha
+    return ""
+
+
+@functools.lru_cache(maxsize=32)
 def _git_repo_root(cwd: Path) -> Path:
-    """Resolve git repository root."""
+    """Resolve git repository root (memoized per resolved ``cwd``; failures are not cached)."""
     return Path(_git_output(["rev-parse", "--show-toplevel"], cwd=cwd))
 
 
@@ -72,42 +188,61 @@ def _git_current_branch(repo_root: Path) -> str:
     return _git_output(["rev-parse", "--abbrev-ref", "HEAD"], cwd=repo_root)
 
 
-def _git_status_porcelain(repo_root: Path) -> list[str]:
-    """Return porcelain status lines."""
+class _StatusEntry(typing.NamedTuple):
+    """One ``git status --porcelain=v2`` record."""
+
+    xy: str
+    path: str
+    orig_path: typing.Optional[str] = None
+
+    def porcelain_line(self) -> str:
+        """Render as a classic ``--porcelain`` line (``XY path``)."""
+        xy = self.xy.replace(".", " ")
+        if self.orig_path is not None:
+            return f"{xy} {self.orig_path} -> {self.path}"
+        return f"{xy} {self.path}"
+
+
+def _git_status_porcelain(repo_root: Path) -> list[_StatusEntry]:
+    """Return parsed ``git status --porcelain=v2 -z`` entries."""
     completed = _run_git(
-        ["status", "--porcelain", "--untracked-files=all"],
+        ["status", "--porcelain=v2", "-z", "--untracked-files=all"],
         cwd=repo_root,
         check=True,
     )
-    output = completed.stdout
-    if not output.strip():
-        return []
-    return [line for line in output.splitlines() if line]
-
-
-def _status_paths(status_lines: list[str]) -> set[str]:
-    """Extract file paths from porcelain status lines."""
+    entries: list[_StatusEntry] = []
+    records = iter(completed.stdout.split("\0"))
+    for record in records:
+        kind = record[:1]
+        if kind == "1":
+            fields = record.split(" ", 8)
+            entries.append(_StatusEntry(fields[1], fields[8]))
+        elif kind == "2":
+            # Renames carry the original path as the next NUL-separated record
+            fields = record.split(" ", 9)
+            entries.append(_StatusEntry(fields[1], fields[9], next(records, "")))
+        elif kind == "u":
+            fields = record.split(" ", 10)
+            entries.append(_StatusEntry(fields[1], fields[10]))
+        elif kind == "?":
+            entries.append(_StatusEntry("??", record[2:]))
+    return entries
+
+
+def _status_paths(entries: list[_StatusEntry]) -> set[str]:
+    """Extract file paths from status entries (new path for renames)."""
+    return {_normalize_repo_path(entry.path) for entry in entries}
+
+
+def _parse_status(entries: list[_StatusEntry]) -> tuple[bool, set[str]]:
+    """Return whether anything is staged and the changed paths, in one pass."""
+    has_staged = False
     paths: set[str] = set()
-    for line in status_lines:
-        if len(line) < 4:
-            continue
-        path = line[3:]
-        # Rename format: old -> new
-        if " -> " in path:
-            path = path.split(" -> ", 1)[1]
-        paths.add(_normalize_repo_path(path))
-    return paths
-
-
-def _has_staged_changes(status_lines: list[str]) -> bool:
-    """True when status contains staged entries."""
-    for line in status_lines:
-        if len(line) < 2:
-            continue
-        x = line[0]
-        if x not in {" ", "?"}:
-            return True
-    return False
+    for entry in entries:
+        if entry.xy[0] not in ".?":
+            has_staged = True
+        paths.add(_normalize_repo_path(entry.path))
+    return has_staged, paths
 
 
 def _append_dirty_state(
@@ -117,36 +252,21 @@ def _append_dirty_state(
     policy: str,
     stash_ref: str,
     message: str,
-    status_porcelain: list[str],
+    status_porcelain: list[_StatusEntry],
 ) -> None:
-    """Append one stash event record to DIRTY_STATE.json."""
-    dirty_state_path = run_dir / "DIRTY_STATE.json"
-    entries: list[dict[str, Any]]
-    if dirty_state_path.exists():
-        try:
-            payload = json.loads(dirty_state_path.read_text(encoding="utf-8"))
-            entries = payload if isinstance(payload, list) else []
-        except json.JSONDecodeError:
-            entries = []
-    else:
-        entries = []
-
-    entries.append(
-        {
-            "schema_version": "1.0",
-            "location": location,
-            "policy": policy,
-            "stash_ref": stash_ref,
-            "message": message,
-            "status_porcelain": sorted(status_porcelain),
-            "timestamp_utc": _timestamp_utc(),
-        }
-    )
-    dirty_state_path.parent.mkdir(parents=True, exist_ok=True)
-    dirty_state_path.write_text(
-        json.dumps(entries, indent=2, sort_keys=True) + "\n",
-        encoding="utf-8",
-    )
+    """Append one stash event record to DIRTY_STATE.jsonl (one JSON object per line)."""
+    entry = {
+        "schema_version": "1.0",
+        "location": location,
+        "policy": policy,
+        "stash_ref": stash_ref,
+        "message": message,
+        "status_porcelain": [item.porcelain_line() for item in status_porcelain],
+        "timestamp_utc": _timestamp_utc(),
+    }
+    run_dir.mkdir(parents=True, exist_ok=True)
+    with (run_dir / DIRTY_STATE_LOG_FILENAME).open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(entry, sort_keys=True) + "\n")
 
 
 def _stash_changes(
@@ -177,9 +297,19 @@ def _stash_changes(
     return stash_ref
 
 
+def _markdown_section(content: str, header: re.Pattern[str]) -> typing.Optional[str]:
+    """Return the body under ``header`` up to the next ``##`` heading, if present."""
+    header_match = header.search(content)
+    if header_match is None:
+        return None
+    next_header = _ANY_SECTION_HEADER.search(content, header_match.end())
+    end = next_header.start() if next_header is not None else len(content)
+    return content[header_match.end():end]
+
+
 def _sanitize_token(value: str) -> str:
     """Make deterministic token from run/branch names."""
-    token = re.sub(r"[^a-zA-Z0-9]+", "-", value.strip()).strip("-").lower()
+    token = _TOKEN_NON_ALNUM.sub("-", value.strip()).strip("-").lower()
     return token or "run"
 
 
@@ -190,32 +320,25 @@ def _default_branch(run_dir: Path) -> str:
 
 def _load_packet_identity_tokens(run_dir: Path) -> tuple[typing.Optional[str], typing.Optional[str]]:
     """Best-effort extraction of packet_id and project_id from TASK_PACKET.md."""
-    task_packet_path = run_dir / "TASK_PACKET.md"
-    if not task_packet_path.exists():
-        return None, None
-
     try:
-        content = task_packet_path.read_text(encoding="utf-8")
+        content = (run_dir / "TASK_PACKET.md").read_text(encoding="utf-8")
     except OSError:
         return None, None
 
     packet_id: typing.Optional[str] = None
-    first_line = content.splitlines()[0] if content.splitlines() else ""
-    first_line_match = re.match(r"^#\s+TASK_PACKET\s+(TP_\d{4})\b", first_line)
+    first_line = content.partition("\n")[0]
+    first_line_match = _TASK_PACKET_TITLE.match(first_line)
     if first_line_match is not None:
         packet_id = first_line_match.group(1)
 
     project_id: typing.Optional[str] = None
-    section_match = re.search(
-        r"^##\s+PROJECT IDENTITY\s*$\n(.*?)(?=^##\s+|\Z)",
-        content,
-        flags=re.MULTILINE | re.DOTALL,
-    )
-    if section_match is not None:
-        for raw_line in section_match.group(1).splitlines():
-            line = raw_line.strip()
+    section = _markdown_section(content, _PROJECT_IDENTITY_HEADER)
+    if section is not None:
+        # Lines are scanned lazily; the loop stops at the first project_id
+        for line_match in _NON_EMPTY_LINE.finditer(section):
+            line = line_match.group().strip()
             if line.startswith("-") or line.startswith("*"):
-                line = re.sub(r"^[-*]\s+", "", line).strip()
+                line = _BULLET_PREFIX.sub("", line).strip()
             if ":" not in line:
                 continue
             key, value = line.split(":", 1)
@@ -254,20 +377,11 @@ def _load_commit_plan(task_packet_path: Path) -> list[CommitPlanStep]:
         raise RuntimeError(f"Task packet not found: {task_packet_path}")
 
     content = task_packet_path.read_text(encoding="utf-8")
-    section_match = re.search(
-        r"^##\s+COMMIT PLAN\s*$\n(.*?)(?=^##\s+|\Z)",
-        content,
-        flags=re.MULTILINE | re.DOTALL,
-    )
-    if not section_match:
+    section = _markdown_section(content, _COMMIT_PLAN_HEADER)
+    if section is None:
         raise RuntimeError("Task packet missing required COMMIT PLAN section")
 
-    section = section_match.group(1)
-    code_match = re.search(
-        r"```json\s*(.*?)\s*```",
-        section,
-        flags=re.DOTALL,
-    )
+    code_match = _JSON_FENCE.search(section)
     if not code_match:
         raise RuntimeError("COMMIT PLAN section must contain a fenced json block")
 
@@ -307,7 +421,8 @@ def _load_commit_plan(task_packet_path: Path) -> list[CommitPlanStep]:
             CommitPlanStep(
                 step_id=step_id,
                 message=message,
-                allowlist=allowlist,
+                allowlist=frozenset(allowlist),
+                allowlist_ordered=tuple(allowlist),
                 verify=verify,
             )
         )
@@ -315,18 +430,39 @@ def _load_commit_plan(task_packet_path: Path) -> list[CommitPlanStep]:
     return steps
 
 
+def _run_verify_command(repo_root: Path, command: str) -> subprocess.CompletedProcess[str]:
+    """Run one verify command, skipping the intermediate shell when it is not needed."""
+    argv = _direct_argv(command)
+    if argv is not None:
+        try:
+            return subprocess.run(argv, cwd=repo_root, check=False, text=True, capture_output=True)
+        except OSError:
+            pass  # let the shell handle builtins and report missing tools
+    return subprocess.run(
+        command,
+        cwd=repo_root,
+        shell=True,
+        check=False,
+        text=True,
+        capture_output=True,
+    )
+
+
+def _direct_argv(command: str) -> typing.Optional[list[str]]:
+    """Split ``command`` for direct execution, or return None if it needs a shell."""
+    if os.name != "posix" or _SHELL_SYNTAX.search(command):
+        return None
+    argv = shlex.split(command)
+    if not argv or "=" in argv[0]:
+        return None
+    return argv
+
+
 def _run_verify_commands(repo_root: Path, commands: list[str]) -> list[dict[str, Any]]:
     """Execute step verification commands in order."""
     results: list[dict[str, Any]] = []
     for command in commands:
-        proc = subprocess.run(
-            command,
-            cwd=repo_root,
-            shell=True,
-            check=False,
-            text=True,
-            capture_output=True,
-        )
+        proc = _run_verify_command(repo_root, command)
         entry = {
             "command": command,
             "exit_code": proc.returncode,
@@ -347,10 +483,15 @@ def _ensure_not_dirty_or_stash_all(
     dirty_policy: str,
     stash_message: str,
     location: str,
+    status_entries: typing.Optional[list[_StatusEntry]] = None,
 ) -> None:
-    """Enforce dirty policy for full-worktree operations."""
-    status_lines = _git_status_porcelain(repo_root)
-    if not status_lines:
+    """Enforce dirty policy for full-worktree operations.
+
+    ``status_entries`` may carry a status already collected by the caller.
+    """
+    if status_entries is None:
+        status_entries = _git_status_porcelain(repo_root)
+    if not status_entries:
         return
     if dirty_policy == "refuse":
         raise RuntimeError(
@@ -369,7 +510,7 @@ def _ensure_not_dirty_or_stash_all(
         policy="stash",
         stash_ref=stash_ref,
         message=stash_message,
-        status_porcelain=status_lines,
+        status_porcelain=status_entries,
     )
 
 
@@ -388,6 +529,20 @@ def start_worktree(
     repo_root = _git_repo_root(invoke_cwd)
     run_dir = run_dir.resolve()
     run_dir.mkdir(parents=True, exist_ok=True)
+    selected_branch = branch.strip() if branch else _identity_default_branch(run_dir)
+
+    # Both queries are read-only and independent; results are still checked
+    # in the original order (dirty policy first, then branch reuse).
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        status_future = pool.submit(_git_status_porcelain, repo_root)
+        branch_check_future = pool.submit(
+            _run_git,
+            ["show-ref", "--verify", "--quiet", f"refs/heads/{selected_branch}"],
+            cwd=repo_root,
+            check=False,
+        )
+        status_entries = status_future.result()
+        branch_check = branch_check_future.result()
 
     _ensure_not_dirty_or_stash_all(
         repo_root=repo_root,
@@ -395,14 +550,9 @@ def start_worktree(
         dirty_policy=dirty_policy,
         stash_message=f"dopetask:wt-start:{run_dir.name}",
         location="repo_root",
+        status_entries=status_entries,
     )
 
-    selected_branch = branch.strip() if branch else _identity_default_branch(run_dir)
-    branch_check = _run_git(
-        ["show-ref", "--verify", "--quiet", f"refs/heads/{selected_branch}"],
-        cwd=repo_root,
-        check=False,
-    )
     if branch_check.returncode == 0:
         raise RuntimeError(
             f"ERROR: branch '{selected_branch}' already exists.\n"
@@ -435,10 +585,7 @@ def start_worktree(
         "dirty_policy": dirty_policy,
         "timestamp_utc": _timestamp_utc(),
     }
-    (run_dir / "WORKTREE.json").write_text(
-        json.dumps(metadata, indent=2, sort_keys=True) + "\n",
-        encoding="utf-8",
-    )
+    _atomic_write_json(run_dir / "WORKTREE.json", metadata)
     return metadata
 
 
@@ -447,9 +594,18 @@ def commit_sequence(
     run_dir: Path,
     allow_unpromoted: bool,
     dirty_policy: str,
+    trust_status_cache: bool = True,
     cwd: typing.Optional[Path] = None,
 ) -> dict[str, Any]:
-    """Execute COMMIT PLAN step-by-step with allowlist-only staging."""
+    """Execute COMMIT PLAN step-by-step with allowlist-only staging.
+
+    With ``trust_status_cache`` the changed-path set is carried forward from
+    the previous step (minus what it committed) instead of re-running
+    ``git status``, unless the step ran verify commands or the cached set has
+    nothing for the step's allowlist. A single status call after the last
+    step records, under ``status_reconcile_missed``, changes that a step
+    relying on the cache could have committed but did not see.
+    """
     invoke_cwd = (cwd or Path.cwd()).resolve()
     repo_root = _git_repo_root(invoke_cwd)
     run_dir = run_dir.resolve()
@@ -463,7 +619,8 @@ def commit_sequence(
         )
 
     preflight_status = _git_status_porcelain(repo_root)
-    if _has_staged_changes(preflight_status):
+    has_staged, changed_paths = _parse_status(preflight_status)
+    if has_staged:
         raise RuntimeError(
             "ERROR: git index already contains staged files.\n"
             "Commit-sequence requires a clean index."
@@ -479,8 +636,7 @@ def commit_sequence(
 
     task_packet = run_dir / "TASK_PACKET.md"
     steps = _load_commit_plan(task_packet)
-    union_allowlist = {path for step in steps for path in step.allowlist}
-    changed_paths = _status_paths(preflight_status)
+    union_allowlist = frozenset().union(*(step.allowlist for step in steps))
     disallowed_changes = sorted(changed_paths - union_allowlist)
 
     if disallowed_changes:
@@ -517,36 +673,60 @@ def commit_sequence(
         "timestamp_utc": _timestamp_utc(),
     }
 
-    for step in steps:
-        verify_results = _run_verify_commands(repo_root, step.verify)
-        status_lines = _git_status_porcelain(repo_root)
-        status_paths = _status_paths(status_lines)
-        stage_paths = sorted(status_paths.intersection(set(step.allowlist)))
-        if not stage_paths:
-            raise RuntimeError(
-                f"ERROR: step {step.step_id} would create an empty commit.\n"
-                "No allowlisted changed files found."
+    # Paths known to be changed; None forces a fresh git status.
+    cached_paths: typing.Optional[set[str]] = (
+        changed_paths.difference(disallowed_changes) if trust_status_cache else None
+    )
+    # Allowlists of steps that used the cached set since the last fresh
+    # status. Only git ran in between, so a path missing from the cache can
+    # only have been skipped by one of these steps.
+    unchecked_paths: set[str] = set()
+    with _GitBatchResolver(repo_root) as resolver:
+        for step in steps:
+            verify_results = _run_verify_commands(repo_root, step.verify)
+            if cached_paths is None or verify_results:
+                status_paths = _status_paths(_git_status_porcelain(repo_root))
+                unchecked_paths.clear()
+            else:
+                status_paths = cached_paths
+                unchecked_paths |= step.allowlist
+            stage_paths = sorted(status_paths & step.allowlist)
+            if not stage_paths and status_paths is cached_paths:
+                # The cache cannot see files written outside commit-sequence
+                # (hooks, concurrent writers); confirm before refusing.
+                status_paths = _status_paths(_git_status_porcelain(repo_root))
+                unchecked_paths.clear()
+                stage_paths = sorted(status_paths & step.allowlist)
+            if not stage_paths:
+                raise RuntimeError(
+                    f"ERROR: step {step.step_id} would create an empty commit.\n"
+                    "No allowlisted changed files found."
+                )
+
+            _run_git(["add", "--", *stage_paths], cwd=repo_root, check=True)
+            _run_git(["commit", "-m", step.message], cwd=repo_root, check=True)
+            commit_sha = resolver.resolve("HEAD")
+            if trust_status_cache:
+                cached_paths = status_paths.difference(stage_paths)
+
+            report["steps"].append(
+                {
+                    "step_id": step.step_id,
+                    "message": step.message,
+                    "allowlist": list(step.allowlist_ordered),
+                    "staged_files": stage_paths,
+                    "verify": verify_results,
+                    "commit": commit_sha,
+                }
             )
 
-        _run_git(["add", "--", *stage_paths], cwd=repo_root, check=True)
-        _run_git(["commit", "-m", step.message], cwd=repo_root, check=True)
-        commit_sha = _git_output(["rev-parse", "HEAD"], cwd=repo_root)
-
-        report["steps"].append(
-            {
-                "step_id": step.step_id,
-                "message": step.message,
-                "allowlist": step.allowlist,
-                "staged_files": stage_paths,
-                "verify": verify_results,
-                "commit": commit_sha,
-            }
-        )
+    if cached_paths is not None:
+        missed: set[str] = set()
+        if unchecked_paths:
+            missed = (_status_paths(_git_status_porcelain(repo_root)) & unchecked_paths) - cached_paths
+        report["status_reconcile_missed"] = sorted(missed)
 
-    (run_dir / "COMMIT_SEQUENCE_RUN.json").write_text(
-        json.dumps(report, indent=2, sort_keys=True) + "\n",
-        encoding="utf-8",
-    )
+    _atomic_write_json(run_dir / "COMMIT_SEQUENCE_RUN.json", report)
     return report
 
 
@@ -562,22 +742,61 @@ def _load_worktree_metadata(run_dir: Path) -> dict[str, Any]:
     return payload if isinstance(payload, dict) else {}
 
 
+def _parse_worktree_list(output: str, *, nul_delimited: bool) -> dict[str, Path]:
+    """Map ``refs/heads/<branch>`` to worktree path from ``git worktree list --porcelain``."""
+    record_sep, field_sep = ("\0\0", "\0") if nul_delimited else ("\n\n", "\n")
+    mapping: dict[str, Path] = {}
+    for record in output.split(record_sep):
+        worktree_path: typing.Optional[Path] = None
+        branch_ref = ""
+        for field in record.split(field_sep):
+            if field.startswith("worktree "):
+                worktree_path = Path(field.removeprefix("worktree ").strip())
+            elif field.startswith("branch "):
+                branch_ref = field.removeprefix("branch ").strip()
+        if worktree_path is not None and branch_ref:
+            mapping.setdefault(branch_ref, worktree_path)
+    return mapping
+
+
+def _worktree_list_stamp(repo_root: Path) -> typing.Optional[tuple[tuple[str, int, int], ...]]:
+    """Identity of every HEAD git consults for ``worktree list``; None if unknown."""
+    dot_git = repo_root / ".git"
+    try:
+        if dot_git.is_dir():
+            common_dir = dot_git
+        else:
+            pointer = dot_git.read_text(encoding="utf-8").strip().removeprefix("gitdir:").strip()
+            git_dir = repo_root / pointer
+            common_dir = git_dir / (git_dir / "commondir").read_text(encoding="utf-8").strip()
+        watched = [common_dir / "HEAD", common_dir / "worktrees"]
+        if watched[1].is_dir():
+            watched.extend(entry / "HEAD" for entry in sorted(watched[1].iterdir()))
+        stamp = []
+        for path in watched:
+            stat = path.stat()
+            stamp.append((str(path), stat.st_ino, stat.st_mtime_ns))
+        return tuple(stamp)
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _worktree_branches_for_stamp(repo_root: str, _stamp: typing.Optional[tuple]) -> dict[str, Path]:
+    proc = _run_git(["worktree", "list", "--porcelain", "-z"], cwd=Path(repo_root), check=False)
+    if proc.returncode == 0:
+        return _parse_worktree_list(proc.stdout, nul_delimited=True)
+    # git < 2.36 has no -z for worktree list
+    proc = _run_git(["worktree", "list", "--porcelain"], cwd=Path(repo_root), check=True)
+    return _parse_worktree_list(proc.stdout, nul_delimited=False)
+
+
 def _find_worktree_for_branch(repo_root: Path, branch: str) -> typing.Optional[Path]:
     """Find worktree path where branch is currently checked out."""
-    proc = _run_git(["worktree", "list", "--porcelain"], cwd=repo_root, check=True)
-    blocks = proc.stdout.split("\n\n")
-    branch_ref = f"refs/heads/{branch}"
-    for block in blocks:
-        worktree_path: typing.Optional[Path] = None
-        branch_line = ""
-        for line in block.splitlines():
-            if line.startswith("worktree "):
-                worktree_path = Path(line.removeprefix("worktree ").strip())
-            elif line.startswith("branch "):
-                branch_line = line.removeprefix("branch ").strip()
-        if worktree_path is not None and branch_line == branch_ref:
-            return worktree_path
-    return None
+    stamp = _worktree_list_stamp(repo_root)
+    if stamp is None:
+        _worktree_branches_for_stamp.cache_clear()
+    return _worktree_branches_for_stamp(str(repo_root), stamp).get(f"refs/heads/{branch}")
 
 
 def finish_run(
@@ -598,7 +817,10 @@ def finish_run(
     run_dir.mkdir(parents=True, exist_ok=True)
 
     meta = _load_worktree_metadata(run_dir)
-    branch = str(meta.get("branch") or _git_current_branch(repo_root))
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        status_future = pool.submit(_git_status_porcelain, repo_root)
+        branch = str(meta.get("branch") or _git_current_branch(repo_root))
+        status_entries = status_future.result()
     base_branch = str(meta.get("base_branch") or "main")
     remote = str(meta.get("remote") or "origin")
 
@@ -608,67 +830,64 @@ def finish_run(
         dirty_policy=dirty_policy,
         stash_message=f"dopetask:finish:{run_dir.name}",
         location="worktree",
+        status_entries=status_entries,
     )
 
     _run_git(["fetch", remote, base_branch], cwd=repo_root, check=True)
 
-    pre_rebase_head = _git_output(["rev-parse", "HEAD"], cwd=repo_root)
-    rebase = _run_git(["rebase", f"{remote}/{base_branch}"], cwd=repo_root, check=False)
-    if rebase.returncode != 0:
-        _run_git(["rebase", "--abort"], cwd=repo_root, check=False)
-        raise RuntimeError(
-            "ERROR: rebase onto origin/main failed.\n"
-            "Resolve conflicts manually and re-run dopetask finish."
-        )
-    post_rebase_head = _git_output(["rev-parse", "HEAD"], cwd=repo_root)
-
+    with _GitBatchResolver(repo_root) as resolver:
+        pre_rebase_head = resolver.resolve("HEAD")
+        rebase = _run_git(["rebase", f"{remote}/{base_branch}"], cwd=repo_root, check=False)
+        if rebase.returncode != 0:
+            _run_git(["rebase", "--abort"], cwd=repo_root, check=False)
+            raise RuntimeError(
+                "ERROR: rebase onto origin/main failed.\n"
+                "Resolve conflicts manually and re-run dopetask finish."
+            )
+        post_rebase_head = resolver.resolve("HEAD")
+        remote_base = resolver.resolve(f"{remote}/{base_branch}")
+        local_main = resolver.resolve(f"refs/heads/{base_branch}")
+
+    # The rebased HEAD descends from the fetched remote tip, so local main
+    # fast-forwards to it exactly when main is an ancestor of that tip.
+    ff_check = _run_git(
+        ["merge-base", "--is-ancestor", local_main, remote_base],
+        cwd=repo_root,
+        check=False,
+    )
+    not_fast_forwardable = "ERROR: main is not fast-forwardable.\nRepository state diverged."
+    if ff_check.returncode != 0:
+        raise RuntimeError(not_fast_forwardable)
     merge_worktree = _find_worktree_for_branch(repo_root, base_branch)
-    temp_worktree_created = False
-    temp_worktree_path = run_dir / ".dopetask_finish_main"
-    if merge_worktree is None:
-        temp_worktree_path.mkdir(parents=True, exist_ok=True)
-        _run_git(
-            ["worktree", "add", str(temp_worktree_path), base_branch],
+    if merge_worktree is not None:
+        # Checked out somewhere: let merge keep that worktree's files in step.
+        merge_result = _run_git(["merge", "--ff-only", post_rebase_head], cwd=merge_worktree, check=False)
+    else:
+        merge_result = _run_git(
+            ["update-ref", f"refs/heads/{base_branch}", post_rebase_head, local_main],
             cwd=repo_root,
-            check=True,
-        )
-        merge_worktree = temp_worktree_path
-        temp_worktree_created = True
-
-    sync_main = _run_git(["merge", "--ff-only", f"{remote}/{base_branch}"], cwd=merge_worktree, check=False)
-    if sync_main.returncode != 0:
-        if temp_worktree_created:
-            _run_git(["worktree", "remove", "--force", str(temp_worktree_path)], cwd=repo_root, check=False)
-        raise RuntimeError(
-            "ERROR: main is not fast-forwardable.\n"
-            "Repository state diverged."
+            check=False,
         )
-
-    main_before_merge = _git_output(["rev-parse", base_branch], cwd=merge_worktree)
-    merge_result = _run_git(["merge", "--ff-only", branch], cwd=merge_worktree, check=False)
     if merge_result.returncode != 0:
-        if temp_worktree_created:
-            _run_git(["worktree", "remove", "--force", str(temp_worktree_path)], cwd=repo_root, check=False)
-        raise RuntimeError(
-            "ERROR: main is not fast-forwardable.\n"
-            "Repository state diverged."
-        )
-    main_after_merge = _git_output(["rev-parse", base_branch], cwd=merge_worktree)
-
-    push_result = _run_git(["push", remote, base_branch], cwd=merge_worktree, check=False)
-    if push_result.returncode != 0:
-        if temp_worktree_created:
-            _run_git(["worktree", "remove", "--force", str(temp_worktree_path)], cwd=repo_root, check=False)
-        raise RuntimeError(
-            "ERROR: push to origin/main failed.\n"
-            "Local and remote are not synchronized."
-        )
-
-    _run_git(["fetch", remote, base_branch], cwd=merge_worktree, check=True)
-    remote_after_push = _git_output(["rev-parse", f"{remote}/{base_branch}"], cwd=merge_worktree)
-    if main_after_merge != remote_after_push:
-        if temp_worktree_created:
-            _run_git(["worktree", "remove", "--force", str(temp_worktree_path)], cwd=repo_root, check=False)
+        raise RuntimeError(not_fast_forwardable)
+    main_after_merge = post_rebase_head
+
+    # Push the exact rebased commit; the lease makes the remote refuse if it
+    # moved since our fetch, and --porcelain reports the outcome per ref.
+    base_ref = f"refs/heads/{base_branch}"
+    push_result = _run_git(
+        [
+            "push",
+            "--porcelain",
+            f"--force-with-lease={base_ref}:{remote_base}",
+            remote,
+            f"{post_rebase_head}:{base_ref}",
+        ],
+        cwd=repo_root,
+        check=False,
+    )
+    remote_after_push = _pushed_ref_tip(push_result.stdout, base_ref, post_rebase_head)
+    if push_result.returncode != 0 or main_after_merge != remote_after_push:
         raise RuntimeError(
             "ERROR: push to origin/main failed.\n"
             "Local and remote are not synchronized."
@@ -676,25 +895,27 @@ def finish_run(
 
     cleanup_warnings: list[str] = []
     if cleanup:
+        # The task worktree is about to disappear; run from main's worktree or
+        # the shared git dir instead.
+        admin_cwd = merge_worktree
+        if admin_cwd is None:
+            admin_cwd = (repo_root / _git_output(["rev-parse", "--git-common-dir"], cwd=repo_root)).resolve()
         worktree_path = meta.get("worktree_path")
         if isinstance(worktree_path, str) and worktree_path.strip():
             remove_result = _run_git(
                 ["worktree", "remove", "--force", worktree_path],
-                cwd=merge_worktree,
+                cwd=admin_cwd,
                 check=False,
             )
             if remove_result.returncode != 0:
                 warning = (remove_result.stderr or remove_result.stdout).strip()
                 cleanup_warnings.append(f"worktree remove failed: {warning}")
         if branch != base_branch:
-            delete_result = _run_git(["branch", "-D", branch], cwd=merge_worktree, check=False)
+            delete_result = _run_git(["branch", "-D", branch], cwd=admin_cwd, check=False)
             if delete_result.returncode != 0:
                 warning = (delete_result.stderr or delete_result.stdout).strip()
                 cleanup_warnings.append(f"branch delete failed: {warning}")
 
-    if temp_worktree_created:
-        _run_git(["worktree", "remove", "--force", str(temp_worktree_path)], cwd=repo_root, check=False)
-
     report: dict[str, Any] = {
         "schema_version": "1.0",
         "mode": mode,
@@ -703,7 +924,8 @@ def finish_run(
         "remote": remote,
         "pre_rebase_head": pre_rebase_head,
         "post_rebase_head": post_rebase_head,
-        "main_before_merge": main_before_merge,
+        # Main after syncing to the fetched remote tip, before the task merge.
+        "main_before_merge": remote_base,
         "main_after_merge": main_after_merge,
         "remote_after_push": remote_after_push,
         "cleanup": cleanup,
@@ -713,8 +935,5 @@ def finish_run(
     if cleanup_warnings:
         report["cleanup_warnings"] = cleanup_warnings
 
-    (run_dir / "FINISH.json").write_text(
-        json.dumps(report, indent=2, sort_keys=True) + "\n",
-        encoding="utf-8",
-    )
+    _atomic_write_json(run_dir / "FINISH.json", report)
     return report
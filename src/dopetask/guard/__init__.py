@@ -1,22 +1,29 @@
 """Guard helpers for dopeTask CLI safety rails."""
 
-from dopetask.guard.banner import (
-    BannerContext,
-    get_banner_context,
-    print_identity_banner,
-)
-from dopetask.guard.identity import (
-    RepoIdentity,
-    RunIdentity,
-    assert_repo_branch_identity,
-    assert_repo_packet_identity,
-    assert_repo_run_identity,
-    ensure_run_identity,
-    extract_origin_url,
-    load_repo_identity,
-    load_run_identity,
-    run_identity_origin_warning,
-)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from dopetask.utils.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from dopetask.guard.banner import (
+        BannerContext,
+        get_banner_context,
+        print_identity_banner,
+    )
+    from dopetask.guard.identity import (
+        RepoIdentity,
+        RunIdentity,
+        assert_repo_branch_identity,
+        assert_repo_packet_identity,
+        assert_repo_run_identity,
+        ensure_run_identity,
+        extract_origin_url,
+        load_repo_identity,
+        load_run_identity,
+        run_identity_origin_warning,
+    )
 
 __all__ = [
     "RepoIdentity",
@@ -33,3 +40,22 @@ __all__ = [
     "print_identity_banner",
     "run_identity_origin_warning",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "dopetask.guard.banner": ("BannerContext", "get_banner_context", "print_identity_banner"),
+        "dopetask.guard.identity": (
+            "RepoIdentity",
+            "RunIdentity",
+            "assert_repo_branch_identity",
+            "assert_repo_packet_identity",
+            "assert_repo_run_identity",
+            "ensure_run_identity",
+            "extract_origin_url",
+            "load_repo_identity",
+            "load_run_identity",
+            "run_identity_origin_warning",
+        ),
+    },
+)
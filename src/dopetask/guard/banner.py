@@ -2,17 +2,22 @@
 
 from __future__ import annotations
 
+import configparser
+import contextlib
 import os
+import re
 import subprocess
 import sys
 import typing
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from pathlib import Path
 
 from dopetask.guard.identity import origin_hint_warning
 
-if TYPE_CHECKING:
-    from pathlib import Path
+_HEAD_BRANCH_PREFIX = "ref: refs/heads/"
+_DETACHED_HEAD = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+# Environment that redirects git away from the on-disk layout read below
+_GIT_LOCATION_ENV = ("GIT_DIR", "GIT_WORK_TREE", "GIT_COMMON_DIR", "GIT_CONFIG")
 
 
 @dataclass(frozen=True)
@@ -50,6 +55,81 @@ def _git(repo_root: Path, *args: str) -> typing.Optional[str]:
     return out.decode("utf-8", errors="replace").strip() or None
 
 
+def _find_git_dir(start: Path) -> typing.Optional[Path]:
+    """Return the git directory for ``start`` (following linked-worktree ``.git`` files)."""
+    if any(name in os.environ for name in _GIT_LOCATION_ENV):
+        return None
+    for candidate in (start, *start.parents):
+        dot_git = candidate / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            try:
+                content = dot_git.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if not content.startswith("gitdir:"):
+                return None
+            git_dir = Path(content[len("gitdir:"):].strip())
+            return git_dir if git_dir.is_absolute() else candidate / git_dir
+    return None
+
+
+def _read_head_branch(git_dir: Path) -> typing.Optional[str]:
+    """Read the branch name from HEAD; ``"HEAD"`` when detached, None if unreadable."""
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if head.startswith(_HEAD_BRANCH_PREFIX):
+        return head[len(_HEAD_BRANCH_PREFIX):] or None
+    if _DETACHED_HEAD.fullmatch(head):
+        return "HEAD"
+    return None
+
+
+def _rewrites_urls(config_text: str) -> bool:
+    lowered = config_text.lower()
+    return "insteadof" in lowered or "[include" in lowered
+
+
+def _read_origin_url(git_dir: Path) -> typing.Optional[str]:
+    """Read ``remote.origin.url`` from the repository config.
+
+    Returns None whenever git itself should answer: includes, URL rewrites
+    (local or global) and anything configparser cannot read.
+    """
+    common_dir = git_dir
+    with contextlib.suppress(OSError):
+        common_dir = git_dir / (git_dir / "commondir").read_text(encoding="utf-8").strip()
+
+    try:
+        config_text = (common_dir / "config").read_text(encoding="utf-8")
+    except OSError:
+        return None
+    if _rewrites_urls(config_text):
+        return None
+    for global_config in (
+        Path.home() / ".gitconfig",
+        Path(os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config") / "git" / "config",
+    ):
+        try:
+            if _rewrites_urls(global_config.read_text(encoding="utf-8")):
+                return None
+        except OSError:
+            continue
+
+    parser = configparser.ConfigParser(strict=False, interpolation=None)
+    try:
+        parser.read_string(config_text)
+        url = parser.get('remote "origin"', "url", fallback=None)
+    except configparser.Error:
+        return None
+    if url is None or url.startswith('"'):
+        return None
+    return url.strip() or None
+
+
 def get_banner_context(
     repo_root: Path,
     project_id: str,
@@ -58,8 +138,14 @@ def get_banner_context(
     run_dir: typing.Optional[Path],
 ) -> BannerContext:
     """Gather context for command identity banner."""
-    branch = _git(repo_root, "rev-parse", "--abbrev-ref", "HEAD")
-    origin_url = _git(repo_root, "remote", "get-url", "origin")
+    # Read HEAD and config straight from .git; fall back to git when that fails
+    git_dir = _find_git_dir(repo_root)
+    branch = _read_head_branch(git_dir) if git_dir is not None else None
+    if branch is None:
+        branch = _git(repo_root, "rev-parse", "--abbrev-ref", "HEAD")
+    origin_url = _read_origin_url(git_dir) if git_dir is not None else None
+    if origin_url is None:
+        origin_url = _git(repo_root, "remote", "get-url", "origin")
     run_id = run_dir.name if run_dir is not None else None
     return BannerContext(
         project_id=project_id,
@@ -53,13 +53,22 @@ class RunIdentity:
 
 
 
+class RepoIdentityNotFoundError(RuntimeError):
+    """Raised when `.dopetask/project.json` does not exist."""
+
+    def __init__(self, identity_path: Path):
+        super().__init__(f"Repo identity file not found: {identity_path}")
+        self.identity_path = identity_path
+
+
+
 def load_repo_identity(repo_root: Path) -> RepoIdentity:
     """Load canonical repo identity from `.dopetask/project.json`."""
     identity_path = (repo_root / PROJECT_IDENTITY_PATH).resolve()
     try:
         payload = json.loads(identity_path.read_text(encoding="utf-8"))
     except FileNotFoundError as exc:
-        raise RuntimeError(f"Repo identity file not found: {identity_path}") from exc
+        raise RepoIdentityNotFoundError(identity_path) from exc
     except json.JSONDecodeError as exc:
         raise RuntimeError(f"Invalid repo identity JSON: {identity_path}: {exc}") from exc
 
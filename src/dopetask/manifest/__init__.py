@@ -1,19 +1,26 @@
 """Task packet manifest module."""
 
-from dopetask.manifest.manifest import (
-    COMMAND_LOG_DIR,
-    MANIFEST_FILENAME,
-    Manifest,
-    append_command_record,
-    check_manifest,
-    finalize_manifest,
-    get_timestamp,
-    init_manifest,
-    load_manifest,
-    manifest_exists,
-    manifest_path,
-    save_manifest,
-)
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from dopetask.utils.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from dopetask.manifest.manifest import (
+        COMMAND_LOG_DIR,
+        MANIFEST_FILENAME,
+        Manifest,
+        append_command_record,
+        check_manifest,
+        finalize_manifest,
+        get_timestamp,
+        init_manifest,
+        load_manifest,
+        manifest_exists,
+        manifest_path,
+        save_manifest,
+    )
 
 __all__ = [
     "COMMAND_LOG_DIR",
@@ -29,3 +36,23 @@ __all__ = [
     "manifest_path",
     "save_manifest",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "dopetask.manifest.manifest": (
+            "COMMAND_LOG_DIR",
+            "MANIFEST_FILENAME",
+            "Manifest",
+            "append_command_record",
+            "check_manifest",
+            "finalize_manifest",
+            "get_timestamp",
+            "init_manifest",
+            "load_manifest",
+            "manifest_exists",
+            "manifest_path",
+            "save_manifest",
+        ),
+    },
+)
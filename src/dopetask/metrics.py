@@ -2,12 +2,20 @@
 
 from __future__ import annotations
 
+import contextlib
+import functools
+import itertools
 import json
-import tempfile
+import os
 import typing
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+try:
+    import orjson
+except ImportError:  # optional speed-up, see the "fast" extra
+    orjson = None  # type: ignore[assignment]
+
 if TYPE_CHECKING:
     from collections.abc import Mapping, Sequence
 
@@ -15,6 +23,8 @@ METRICS_ENV_VAR = "DOPETASK_METRICS"
 XDG_STATE_HOME_ENV_VAR = "XDG_STATE_HOME"
 _STATE_FALLBACK = Path(".local") / "state"
 _METRICS_RELATIVE_PATH = Path("dopetask") / "metrics.json"
+_HELP_FLAGS = frozenset({"--help", "-h"})
+_TRUTHY_VALUES = frozenset({"1", "true", "yes", "on"})
 
 
 def _default_payload() -> dict[str, Any]:
@@ -25,10 +35,39 @@ def _default_payload() -> dict[str, Any]:
     }
 
 
+def _loads(data: bytes) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            # orjson rejects the \u-escaped lone surrogates _dumps falls back to
+            pass
+    return json.loads(data)
+
+
+def _dumps(payload: dict[str, Any]) -> bytes:
+    """Indented, key-sorted JSON with a trailing newline; identical with or without orjson."""
+    try:
+        if orjson is not None:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_APPEND_NEWLINE)
+        return (json.dumps(payload, indent=2, sort_keys=True, ensure_ascii=False) + "\n").encode("utf-8")
+    except (TypeError, UnicodeEncodeError):
+        # Undecodable argv bytes arrive as lone surrogates; keep them \u-escaped.
+        return (json.dumps(payload, indent=2, sort_keys=True) + "\n").encode("ascii")
+
+
 def _truthy(value: typing.Optional[str]) -> bool:
-    if value is None:
+    if not value:
         return False
-    return value.strip().lower() in {"1", "true", "yes", "on"}
+    if value == "1":
+        return True
+    return value.strip().lower() in _TRUTHY_VALUES
+
+
+@functools.lru_cache(maxsize=8)
+def _resolve_metrics_path_cached(xdg_state_home: typing.Optional[str], home: Path) -> Path:
+    base = Path(xdg_state_home).expanduser() if xdg_state_home else home / _STATE_FALLBACK
+    return (base / _METRICS_RELATIVE_PATH).resolve()
 
 
 def resolve_metrics_path(
@@ -38,25 +77,14 @@ def resolve_metrics_path(
 ) -> Path:
     """Return the canonical metrics file path."""
     effective_env = env if env is not None else {}
-    xdg_state_home = effective_env.get(XDG_STATE_HOME_ENV_VAR)
-    if xdg_state_home:
-        base = Path(xdg_state_home).expanduser()
-    else:
-        base = (home if home is not None else Path.home()) / _STATE_FALLBACK
-    return (base / _METRICS_RELATIVE_PATH).resolve()
+    return _resolve_metrics_path_cached(
+        effective_env.get(XDG_STATE_HOME_ENV_VAR),
+        home if home is not None else Path.home(),
+    )
 
 
-def load_metrics(path: Path) -> dict[str, Any]:
-    """Load metrics payload from disk, returning defaults on missing/invalid content."""
+def _normalize_payload(raw: Any) -> dict[str, Any]:
     payload = _default_payload()
-    if not path.exists():
-        return payload
-
-    try:
-        raw = json.loads(path.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
-        return payload
-
     if not isinstance(raw, dict):
         return payload
 
@@ -76,23 +104,79 @@ def load_metrics(path: Path) -> dict[str, Any]:
     return payload
 
 
-def save_metrics(path: Path, payload: dict[str, Any]) -> None:
-    """Persist metrics payload atomically."""
-    path.parent.mkdir(parents=True, exist_ok=True)
-    serialized = json.dumps(payload, indent=2, sort_keys=True) + "\n"
+def load_metrics(path: Path) -> dict[str, Any]:
+    """Load metrics payload from disk, returning defaults on missing/invalid content."""
+    try:
+        raw = _loads(path.read_bytes())
+    except (ValueError, OSError):
+        return _default_payload()
+    return _normalize_payload(raw)
 
-    with tempfile.NamedTemporaryFile(
-        mode="w",
-        encoding="utf-8",
-        dir=path.parent,
-        delete=False,
-        prefix=f".{path.name}.",
-        suffix=".tmp",
-    ) as tmp_file:
-        tmp_file.write(serialized)
-        tmp_path = Path(tmp_file.name)
 
-    tmp_path.replace(path)
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _write_direct(path: Path, data: bytes) -> None:
+    """Overwrite an existing file in place (no temp file, no rename)."""
+    fd = os.open(path, os.O_WRONLY | os.O_TRUNC, 0o644)
+    try:
+        _write_all(fd, data)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist a rename in ``directory``; a no-op where directories cannot be opened."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def save_metrics(path: Path, payload: dict[str, Any], *, durable: bool = False) -> None:
+    """Persist metrics payload.
+
+    Counters are local and non-critical, so an existing file is rewritten in
+    place; the atomic temp-file + rename path is kept for the first write and
+    whenever the direct write fails. A torn file reads back as defaults.
+
+    ``durable=True`` always takes the temp-file path and syncs the data and the
+    parent directory before returning.
+    """
+    serialized = _dumps(payload)
+
+    if not durable:
+        try:
+            _write_direct(path, serialized)
+        except OSError:
+            pass
+        else:
+            return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # The pid keeps concurrent CLI processes off each other's temp file
+    tmp_path = path.parent / f".{path.name}.{os.getpid()}.tmp"
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            _write_all(fd, serialized)
+            if durable:
+                getattr(os, "fdatasync", os.fsync)(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            tmp_path.unlink()
+        raise
+    if durable:
+        _fsync_directory(path.parent)
 
 
 def metrics_env_enabled(env: typing.Optional[Mapping[str, str]] = None) -> bool:
@@ -111,8 +195,11 @@ def metrics_effective_enabled(path: Path, env: typing.Optional[Mapping[str, str]
 def set_metrics_enabled(path: Path, enabled: bool) -> dict[str, Any]:
     """Set persistent opt-in status."""
     payload = load_metrics(path)
+    if payload["enabled"] == enabled and path.exists():
+        return payload
     payload["enabled"] = enabled
-    save_metrics(path, payload)
+    # The opt-in is an explicit user decision; make sure it survives a crash
+    save_metrics(path, payload, durable=True)
     return payload
 
 
@@ -129,23 +216,25 @@ def infer_command_name(argv: Sequence[str]) -> str:
     if len(argv) <= 1:
         return "dopetask"
 
-    tokens = list(argv[1:])
-
-    if any(token in {"--help", "-h"} for token in tokens):
-        return "--help"
-
-    if "--version" in tokens or tokens[0] == "version":
-        return "--version"
-
+    # One pass over argv without copying it: help anywhere wins, then
+    # version, then the first one or two positional names.
     names: list[str] = []
-    for token in tokens:
-        if token.startswith("-"):
-            if names:
-                break
-            continue
-        names.append(token)
-        if len(names) >= 2:
-            break
+    collecting = True
+    saw_version = argv[1] == "version"
+    for token in itertools.islice(argv, 1, None):
+        if token in _HELP_FLAGS:
+            return "--help"
+        if token == "--version":
+            saw_version = True
+        elif collecting:
+            if token.startswith("-"):
+                collecting = not names
+            else:
+                names.append(token)
+                collecting = len(names) < 2
+
+    if saw_version:
+        return "--version"
 
     if not names:
         return "dopetask"
@@ -159,19 +248,13 @@ def record_cli_invocation(
     env: typing.Optional[Mapping[str, str]] = None,
 ) -> bool:
     """Record a CLI invocation when metrics are enabled."""
-    if not metrics_effective_enabled(path, env):
-        return False
-
     payload = load_metrics(path)
-    commands = payload.get("commands", {})
-    if not isinstance(commands, dict):
-        commands = {}
+    if not (metrics_env_enabled(env) or payload["enabled"]):
+        return False
 
+    # load_metrics already normalized commands to dict[str, int]
+    commands = payload["commands"]
     command_name = infer_command_name(argv)
-    current_value = commands.get(command_name, 0)
-    if not isinstance(current_value, int):
-        current_value = 0
-    commands[command_name] = current_value + 1
-    payload["commands"] = commands
+    commands[command_name] = commands.get(command_name, 0) + 1
     save_metrics(path, payload)
     return True
@@ -27,6 +27,8 @@ WORKTREE_FILENAME = "WORKTREE.json"
 COMMIT_SEQUENCE_RUN_FILENAME = "COMMIT_SEQUENCE_RUN.json"
 FINISH_FILENAME = "FINISH.json"
 DIRTY_STATE_FILENAME = "DIRTY_STATE.json"
+# Append-only stash log written by the wt/commit-sequence/finish CLI commands
+DIRTY_STATE_LOG_FILENAME = "DIRTY_STATE.jsonl"
 DOCTOR_REPORT_FILENAME = "DOCTOR_REPORT.json"
 
 
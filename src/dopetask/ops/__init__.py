@@ -4,11 +4,18 @@ Public API for programmatic access to operator prompt compilation,
 block injection, diagnostics, and instruction-file discovery.
 """
 
-from dopetask.ops.blocks import find_block, inject_block, update_file
-from dopetask.ops.conflicts import check_conflicts
-from dopetask.ops.discover import discover_instruction_file, get_sidecar_path
-from dopetask.ops.doctor import extract_operator_blocks, get_canonical_target, run_doctor
-from dopetask.ops.export import calculate_hash, export_prompt, load_profile, write_if_changed
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from dopetask.utils.lazy_exports import lazy_exports
+
+if TYPE_CHECKING:
+    from dopetask.ops.blocks import find_block, inject_block, update_file
+    from dopetask.ops.conflicts import check_conflicts
+    from dopetask.ops.discover import discover_instruction_file, get_sidecar_path
+    from dopetask.ops.doctor import extract_operator_blocks, get_canonical_target, run_doctor
+    from dopetask.ops.export import calculate_hash, export_prompt, load_profile, write_if_changed
 
 __all__ = [
     # blocks
@@ -30,3 +37,14 @@ __all__ = [
     "load_profile",
     "write_if_changed",
 ]
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "dopetask.ops.blocks": ("find_block", "inject_block", "update_file"),
+        "dopetask.ops.conflicts": ("check_conflicts",),
+        "dopetask.ops.discover": ("discover_instruction_file", "get_sidecar_path"),
+        "dopetask.ops.doctor": ("extract_operator_blocks", "get_canonical_target", "run_doctor"),
+        "dopetask.ops.export": ("calculate_hash", "export_prompt", "load_profile", "write_if_changed"),
+    },
+)
@@ -1,6 +1,7 @@
+import bisect
 import re
 from pathlib import Path
-from typing import NamedTuple
+from typing import NamedTuple, Optional
 
 
 class Conflict(NamedTuple):
@@ -16,18 +17,63 @@ CONFLICT_PATTERNS = [
     (r"Ignore task packets", "Task packets are the source of truth for dopeTask operations."),
 ]
 
+# The line boundaries str.splitlines() recognises
+_LINE_BREAK = re.compile(r"\r\n|[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
 
-def check_conflicts(path: Path) -> list[Conflict]:
-    if not path.exists():
-        return []
+# All phrases in one alternation; the named group that fired identifies the
+# pattern. Matches are non-overlapping, which is safe while no phrase can
+# overlap another (none ends with a prefix of another or contains one).
+_COMBINED_RE = re.compile(
+    "|".join(f"(?P<p{index}>{pattern})" for index, (pattern, _) in enumerate(CONFLICT_PATTERNS)),
+    re.IGNORECASE,
+)
+_RECOMMENDATIONS = [recommendation for _, recommendation in CONFLICT_PATTERNS]
+
+
+# Files are scanned in chunks of whole lines of roughly this many characters
+_CHUNK_CHARS = 1 << 20
+
+
+def _scan_chunk(path: Path, chunk: str, first_line: int, conflicts: list[Conflict]) -> int:
+    """Append conflicts found in ``chunk`` and return how many lines it held."""
+    breaks = list(_LINE_BREAK.finditer(chunk))
+    line_starts = [0] + [match.end() for match in breaks]
+
+    # One pass over the chunk for all patterns; a line is reported once per
+    # matching pattern, in (line, pattern) order.
+    hits: set[tuple[int, int]] = set()
+    for match in _COMBINED_RE.finditer(chunk):
+        assert match.lastgroup is not None
+        hits.add((bisect.bisect_right(line_starts, match.start()), int(match.lastgroup[1:])))
 
+    for line_no, index in sorted(hits):
+        start = line_starts[line_no - 1]
+        end = breaks[line_no - 1].start() if line_no <= len(breaks) else len(chunk)
+        conflicts.append(
+            Conflict(path, chunk[start:end].strip(), first_line + line_no - 1, _RECOMMENDATIONS[index])
+        )
+
+    ends_with_break = bool(breaks) and breaks[-1].end() == len(chunk)
+    return len(breaks) if ends_with_break else len(breaks) + 1
+
+
+def check_conflicts(path: Path, text: Optional[str] = None) -> list[Conflict]:
     conflicts: list[Conflict] = []
-    text = path.read_text()
-    lines = text.splitlines()
+    if text is not None:
+        _scan_chunk(path, text, 1, conflicts)
+        return conflicts
+
+    if not path.exists():
+        return []
 
-    for i, line in enumerate(lines, 1):
-        for pattern, recommendation in CONFLICT_PATTERNS:
-            if re.search(pattern, line, re.IGNORECASE):
-                conflicts.append(Conflict(path, line.strip(), i, recommendation))
+    # Stream whole-line chunks (patterns never span lines) so large files are
+    # not held in memory at once.
+    next_line = 1
+    with path.open() as handle:
+        while True:
+            lines = handle.readlines(_CHUNK_CHARS)
+            if not lines:
+                break
+            next_line += _scan_chunk(path, "".join(lines), next_line, conflicts)
 
     return conflicts
@@ -1,48 +1,65 @@
+import os
+import re
 from pathlib import Path
+from typing import Callable, Optional
 
 from dopetask.ops.conflicts import check_conflicts
 from dopetask.ops.export import calculate_hash, load_profile
 from dopetask.ops.export import export_prompt as compile_prompt
 
+# Line boundaries recognised by str.splitlines()
+_LINE_BREAK_CHARS = r"\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029"
+_LINE_BREAK = re.compile(rf"\r\n|[{_LINE_BREAK_CHARS}]")
+_BLOCK_BEGIN = re.compile(re.escape("<!-- TASKX:BEGIN operator_system"))
+_BLOCK_END_LINE = re.compile(
+    rf"(?<=[{_LINE_BREAK_CHARS}])[^\S{_LINE_BREAK_CHARS}]*"
+    + re.escape("<!-- TASKX:END operator_system -->")
+    + rf"[^\S{_LINE_BREAK_CHARS}]*(?=[{_LINE_BREAK_CHARS}]|\Z)"
+)
+
 
 def extract_operator_blocks(text: str) -> list[str]:
     """
     Extract operator system blocks using a deterministic line-based scanner.
 
-    Algorithm:
-    1. Convert newlines: lines = text.splitlines()
-    2. Iterate i=0..len(lines)-1
-    3. When BEGIN line found:
-        - set start = i+1
-        - search forward for END line where lines[j].strip() == "<!-- TASKX:END operator_system -->"
+    Algorithm (regex searches over the text, with splitlines() line semantics):
+    1. Find the next line containing the BEGIN marker
+    2. The block starts on the following line; find the first later line
+       whose stripped content is "<!-- TASKX:END operator_system -->"
         - if END not found: treat as zero blocks
-        - else capture inner = "\n".join(lines[start:j])
-        - append inner to blocks list
-        - set i = j
-    4. Return blocks list
+        - else capture the lines in between, joined with "\\n"
+    3. Continue after the END line; return blocks list
     """
-    lines = text.splitlines()
     blocks = []
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        if "<!-- TASKX:BEGIN operator_system" in line:
-            start = i + 1
-            found_end = False
-            for j in range(start, len(lines)):
-                if lines[j].strip() == "<!-- TASKX:END operator_system -->":
-                    inner = "\n".join(lines[start:j])
-                    blocks.append(inner)
-                    i = j
-                    found_end = True
-                    break
-            if not found_end:
-                # If END not found for one BEGIN, packet says treat as zero blocks.
-                # However, practically it means we stop here and return what we found?
-                # "if END not found: treat as zero blocks (do not crash)"
-                return []
-        i += 1
-    return blocks
+    pos = 0
+    while True:
+        begin = _BLOCK_BEGIN.search(text, pos)
+        if begin is None:
+            return blocks
+        begin_line_break = _LINE_BREAK.search(text, begin.end())
+        end = _BLOCK_END_LINE.search(text, begin_line_break.end()) if begin_line_break else None
+        if end is None:
+            # "if END not found: treat as zero blocks (do not crash)"
+            return []
+        inner = text[begin_line_break.end():end.start()]
+        # inner ends with the line break before END; normalize breaks like splitlines + join
+        blocks.append(_LINE_BREAK.sub("\n", inner)[:-1])
+        pos = end.end()
+
+_CANONICAL_CANDIDATES = [
+    ".claude/CLAUDE.md",
+    "CLAUDE.md",
+    "claude.md",
+    "AGENTS.md"
+]
+_CANONICAL_FALLBACK = "docs/llm/DOPETASK_OPERATOR_SYSTEM.md"
+
+
+def _first_existing(rel_paths: list[str], exists: Callable[[str], bool]) -> Optional[str]:
+    for rel in rel_paths:
+        if exists(rel):
+            return rel
+    return None
 
 def get_canonical_target(repo_root: Path) -> Path:
     """
@@ -53,22 +70,31 @@ def get_canonical_target(repo_root: Path) -> Path:
     4. AGENTS.md
     5. fallback: docs/llm/DOPETASK_OPERATOR_SYSTEM.md
     """
-    candidates = [
-        ".claude/CLAUDE.md",
-        "CLAUDE.md",
-        "claude.md",
-        "AGENTS.md"
-    ]
-    for rel in candidates:
-        p = repo_root / rel
-        if p.exists():
-            return p
-    return repo_root / "docs/llm/DOPETASK_OPERATOR_SYSTEM.md"
+    rel = _first_existing(_CANONICAL_CANDIDATES, lambda rel: (repo_root / rel).exists())
+    return repo_root / (rel or _CANONICAL_FALLBACK)
+
+def _existing_files(repo_root: Path, rel_paths: list[str]) -> set[str]:
+    """Return the subset of rel_paths that are files, listing each parent directory once."""
+    names_by_parent: dict[str, set[str]] = {}
+    for rel_path in rel_paths:
+        parent, _, name = rel_path.rpartition("/")
+        names_by_parent.setdefault(parent, set()).add(name)
+
+    existing: set[str] = set()
+    for parent, names in names_by_parent.items():
+        try:
+            with os.scandir(repo_root / parent) as entries:
+                for entry in entries:
+                    if entry.name in names and entry.is_file():
+                        existing.add(f"{parent}/{entry.name}" if parent else entry.name)
+        except OSError:
+            continue
+    return existing
 
 def run_doctor(repo_root: Path) -> dict:
     report: dict = {
         "compiled_hash": "UNKNOWN",
-        "canonical_target": str(get_canonical_target(repo_root).relative_to(repo_root)),
+        "canonical_target": "",
         "config_locations": {},
         "files": [],
         "conflicts": [],
@@ -100,15 +126,16 @@ def run_doctor(repo_root: Path) -> dict:
             pass
 
     candidates = [
-        ".claude/CLAUDE.md",
-        "CLAUDE.md",
-        "claude.md",
-        "AGENTS.md",
+        *_CANONICAL_CANDIDATES,
         "AI.md",
         "README_AI.md",
-        "docs/llm/DOPETASK_OPERATOR_SYSTEM.md"
+        _CANONICAL_FALLBACK,
     ]
 
+    existing = _existing_files(repo_root, candidates)
+    # Same precedence as get_canonical_target, answered from the listing above
+    report["canonical_target"] = _first_existing(_CANONICAL_CANDIDATES, existing.__contains__) or _CANONICAL_FALLBACK
+
     for rel_path in candidates:
         path = repo_root / rel_path
         file_info = {
@@ -117,10 +144,13 @@ def run_doctor(repo_root: Path) -> dict:
             "file_hash": None
         }
 
-        if not path.exists():
+        if rel_path not in existing:
             report["files"].append(file_info)
             continue
 
+        # Decoded once: the conflict scan needs the whole text, and block hashes
+        # are defined over newline-normalized text, so hashing raw bytes would
+        # change results for CRLF files.
         text = path.read_text()
         blocks = extract_operator_blocks(text)
 
@@ -140,13 +170,18 @@ def run_doctor(repo_root: Path) -> dict:
 
         report["files"].append(file_info)
 
-        conflicts = check_conflicts(path)
-        for c in conflicts:
-            report["conflicts"].append({
-                "file": str(c.path.relative_to(repo_root)),
-                "phrase": c.phrase,
-                "line": c.line,
-                "recommendation": c.recommendation
-            })
+        conflicts = check_conflicts(path, text=text)
+        if conflicts:
+            # Every conflict in this file carries the same path
+            rel_file = str(path.relative_to(repo_root))
+            report["conflicts"].extend([
+                {
+                    "file": rel_file,
+                    "phrase": c.phrase,
+                    "line": c.line,
+                    "recommendation": c.recommendation
+                }
+                for c in conflicts
+            ])
 
     return report
@@ -11,12 +11,19 @@ from dopetask.ops.tp_git.exec import run_command, run_git
 from dopetask.ops.tp_git.guards import resolve_repo_root
 from dopetask.ops.tp_git.naming import build_worktree_path
 
+# Repo roots for which `gh auth status` already succeeded in this process
+_gh_auth_verified: set[str] = set()
+
 
 def _ensure_gh_auth(repo_root: Path) -> None:
+    key = str(repo_root)
+    if key in _gh_auth_verified:
+        return
     auth = run_command(["gh", "auth", "status"], cwd=repo_root, check=False)
     if auth.returncode != 0:
         detail = (auth.stderr or auth.stdout).strip()
         raise RuntimeError(f"gh auth failed: {detail}")
+    _gh_auth_verified.add(key)
 
 
 def _worktree_for_tp(repo_root: Path, tp_id: str) -> Path:
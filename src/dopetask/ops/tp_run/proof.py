@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import os
+import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
@@ -10,6 +12,9 @@ from typing import Any
 from dopetask.artifacts.canonical_json import write_json
 from dopetask.ops.tp_git.exec import run_git
 
+_FULL_SHA = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+_SHORT_SHA_LEN = 7
+
 
 @dataclass(frozen=True)
 class ProofPaths:
@@ -21,10 +26,49 @@ class ProofPaths:
     run_dir: Path
 
 
+def _read_head_sha(repo_root: Path) -> str:
+    """Resolve HEAD to a full SHA from the files under .git; "" when git must be asked."""
+    if "GIT_DIR" in os.environ or "GIT_COMMON_DIR" in os.environ:
+        return ""
+    try:
+        git_dir = repo_root / ".git"
+        if git_dir.is_file():
+            # Linked worktree: ".git" holds "gitdir: <path>", refs live in the common dir
+            pointer = git_dir.read_text(encoding="utf-8").strip().removeprefix("gitdir:").strip()
+            git_dir = repo_root / pointer
+        common_dir = git_dir
+        commondir_file = git_dir / "commondir"
+        if commondir_file.is_file():
+            common_dir = git_dir / commondir_file.read_text(encoding="utf-8").strip()
+
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+        if not head.startswith("ref: "):
+            return head if _FULL_SHA.fullmatch(head) else ""
+        ref = head.removeprefix("ref: ")
+        for ref_root in (git_dir, common_dir):
+            ref_path = ref_root / ref
+            if ref_path.is_file():
+                sha = ref_path.read_text(encoding="utf-8").strip()
+                return sha if _FULL_SHA.fullmatch(sha) else ""
+        packed_refs = common_dir / "packed-refs"
+        if packed_refs.is_file():
+            for line in packed_refs.read_text(encoding="utf-8").splitlines():
+                sha, _, name = line.partition(" ")
+                if name == ref and _FULL_SHA.fullmatch(sha):
+                    return sha
+    except OSError:
+        pass
+    return ""
+
+
 def build_run_id(*, tp_id: str, repo_root: Path) -> str:
     """Build deterministic run id with UTC timestamp and current short sha."""
     stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-    short_sha = run_git(["rev-parse", "--short", "HEAD"], repo_root=repo_root).stdout.strip() or "unknown"
+    head_sha = _read_head_sha(repo_root)
+    if head_sha:
+        short_sha = head_sha[:_SHORT_SHA_LEN]
+    else:
+        short_sha = run_git(["rev-parse", "--short", "HEAD"], repo_root=repo_root).stdout.strip() or "unknown"
     return f"{tp_id}_{stamp}_{short_sha}"
 
 
@@ -40,18 +84,27 @@ class ProofWriter:
     def __init__(self, paths: ProofPaths):
         self.paths = paths
         self.paths.run_dir.mkdir(parents=True, exist_ok=True)
+        # Directories already created by this writer; most artifacts sit
+        # directly in run_dir and need no further mkdir.
+        self._created_dirs: set[Path] = {self.paths.run_dir}
+
+    def _ensure_parent(self, target: Path) -> None:
+        parent = target.parent
+        if parent not in self._created_dirs:
+            parent.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(parent)
 
     def write_text(self, name: str, content: str) -> Path:
         """Write a text artifact."""
         target = self.paths.run_dir / name
-        target.parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_parent(target)
         target.write_text(content, encoding="utf-8")
         return target
 
     def append_log(self, name: str, content: str) -> Path:
         """Append textual content to an artifact file."""
         target = self.paths.run_dir / name
-        target.parent.mkdir(parents=True, exist_ok=True)
+        self._ensure_parent(target)
         with target.open("a", encoding="utf-8") as handle:
             handle.write(content)
         return target
@@ -5,6 +5,20 @@ from __future__ import annotations
 import re
 from typing import Any
 
+_STEP_TOKEN_SEPARATORS = re.compile(r"[^A-Za-z0-9]+")
+_INSTRUCTIONS_TEMPLATE = (
+    "Runner: {runner_id}\n"
+    "Model: {model_id}\n"
+    "Input: {packet_path}\n"
+    "Output dir: {run_dir}\n"
+    "After completion: create {sentinel_path}"
+)
+_RUNNER_ID_MAP = {
+    "codex_desktop": "codex-cli",
+    "claude_code": "claude-code",
+    "copilot_cli": "copilot-cli",
+}
+
 
 def build_handoff_chunks(packet: dict[str, Any], route_plan: dict[str, Any]) -> list[dict[str, Any]]:
     """Build deterministic per-step manual handoff chunks."""
@@ -27,14 +41,12 @@ def build_handoff_chunks(packet: dict[str, Any], route_plan: dict[str, Any]) ->
         sentinel_name = f"STEP_{_normalize_step_token(step_name)}.DONE"
         sentinel_path = f"{run_dir}/{sentinel_name}" if run_dir else sentinel_name
 
-        instructions_block = "\n".join(
-            [
-                f"Runner: {runner_id}",
-                f"Model: {model_id}",
-                f"Input: {packet_path}",
-                f"Output dir: {run_dir}",
-                f"After completion: create {sentinel_path}",
-            ]
+        instructions_block = _INSTRUCTIONS_TEMPLATE.format(
+            runner_id=runner_id,
+            model_id=model_id,
+            packet_path=packet_path,
+            run_dir=run_dir,
+            sentinel_path=sentinel_path,
         )
 
         chunks.append(
@@ -67,14 +79,9 @@ def render_handoff_chunks(handoff_chunks: list[dict[str, Any]]) -> str:
 
 
 def _normalize_step_token(step: str) -> str:
-    normalized = re.sub(r"[^A-Za-z0-9]+", "_", step.strip().upper())
+    normalized = _STEP_TOKEN_SEPARATORS.sub("_", step.strip().upper())
     return normalized.strip("_") or "STEP"
 
 
 def _map_runner_id(runner_id: str) -> str:
-    mapping = {
-        "codex_desktop": "codex-cli",
-        "claude_code": "claude-code",
-        "copilot_cli": "copilot-cli",
-    }
-    return mapping.get(runner_id, runner_id)
+    return _RUNNER_ID_MAP.get(runner_id, runner_id)
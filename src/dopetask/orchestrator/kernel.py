@@ -9,7 +9,11 @@ from pathlib import Path
 from typing import Any
 
 from dopetask.artifacts import canonical_dumps, sha256_text, write_run_artifacts
-from dopetask.orchestrator.handoff import build_handoff_chunks, render_handoff_chunks
+from dopetask.orchestrator.handoff import (
+    _normalize_step_token,
+    build_handoff_chunks,
+    render_handoff_chunks,
+)
 from dopetask.router import build_route_plan, route_plan_to_dict
 from dopetask.router.availability import availability_path_for_repo, default_route_policy
 from dopetask.runners import RUNNER_ADAPTERS
@@ -396,11 +400,6 @@ def _first_incomplete_step(route_plan: dict[str, Any], run_dir: Path) -> typing.
     return None
 
 
-def _normalize_step_token(step: str) -> str:
-    normalized = re.sub(r"[^A-Za-z0-9]+", "_", step.strip().upper())
-    return normalized.strip("_") or "STEP"
-
-
 def _optional_text(value: Any) -> typing.Optional[str]:
     if value is None:
         return None
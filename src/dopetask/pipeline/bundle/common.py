@@ -0,0 +1,88 @@
+"""Shared helpers for bundle export and ingest.
+
+Both sides walk, hash and classify bundle files the same way; the manifest
+hash depends on the walk order, so it must not drift between them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+HASH_WORKERS = os.cpu_count() or 1
+
+# Path classification: exact paths first, then at most one prefix can match
+_EXACT_CATEGORIES = {
+    "dopetask/task_queue.json": "dopetask_task_queue",
+    "repo/REPO_SNAPSHOT.json": "repo_snapshot",
+    "repo/LOG_INDEX.json": "repo_log",
+}
+_PREFIX_CATEGORIES = {
+    "dopetask/packets/": "dopetask_packet",
+    "dopetask/runs/": "dopetask_run_artifact",
+    "repo/logs/": "repo_log",
+    "reports/": "report",
+}
+_CATEGORY_PREFIX = re.compile("|".join(re.escape(prefix) for prefix in _PREFIX_CATEGORIES))
+
+
+def sha256_file(path: typing.Union[str, Path]) -> str:
+    """Compute SHA256 for a file."""
+    with open(path, "rb") as handle:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(handle, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        buffer = memoryview(bytearray(1024 * 1024))
+        while size := handle.readinto(buffer):
+            digest.update(buffer[:size])
+    return digest.hexdigest()
+
+
+def sha256_files(paths: typing.Sequence[typing.Union[str, Path]]) -> list[str]:
+    """Hash files concurrently (hashlib releases the GIL); results follow ``paths`` order."""
+    if len(paths) < 2:
+        return [sha256_file(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=min(HASH_WORKERS, len(paths))) as pool:
+        return list(pool.map(sha256_file, paths))
+
+
+def walk_files(root: Path) -> list[tuple[str, str, int]]:
+    """Return ``(rel_posix, path, size)`` for each file under ``root``, with one stat per file.
+
+    Works on plain strings from ``os.scandir``. Matches ``rglob("*")`` +
+    ``is_file()``: symlinked directories are not descended into, and results
+    are in ``Path`` order (compared component by component).
+    """
+    found: list[tuple[str, str, int]] = []
+    root_str = os.fspath(root)
+    prefix_len = len(os.path.join(root_str, ""))
+    pending = [root_str]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file():
+                    rel = entry.path[prefix_len:].replace(os.sep, "/")
+                    found.append((rel, entry.path, entry.stat().st_size))
+    found.sort(key=lambda item: item[0].split("/"))
+    return found
+
+
+def classify_path(rel_path: str) -> str:
+    """Classify a bundled file deterministically by path."""
+    normalized = rel_path.replace("\\", "/")
+    category = _EXACT_CATEGORIES.get(normalized)
+    if category is not None:
+        return category
+    match = _CATEGORY_PREFIX.match(normalized)
+    if match is None:
+        return "unknown"
+    category = _PREFIX_CATEGORIES[match.group()]
+    if category == "dopetask_run_artifact" and normalized.endswith("/TASK_PACKET.md"):
+        return "dopetask_packet"
+    return category
@@ -1,6 +1,9 @@
+import fnmatch
+import functools
 import hashlib
 import json
 import os
+import re
 import shutil
 import typing
 import zipfile
@@ -11,8 +14,98 @@ from typing import Any
 import yaml  # type: ignore[import-untyped]
 from rich.console import Console
 
+from dopetask.pipeline.bundle.common import classify_path, sha256_files, walk_files
+
 console = Console()
 
+# Already-compressed payloads are stored as-is; deflating them again costs CPU
+# and gains nothing
+_STORED_SUFFIXES = frozenset({
+    ".7z", ".br", ".bz2", ".gif", ".gz", ".jpeg", ".jpg", ".png", ".tgz", ".webp", ".whl", ".xz", ".zip", ".zst",
+})
+# Bundles are mostly logs and JSON: level 1 keeps most of the size reduction
+# of the default level 6 at a fraction of the CPU
+_DEFLATE_LEVEL = 1
+
+
+def _glob_segment_regex(segment: str) -> str:
+    """Regex for one glob path component; wildcards never match "/"."""
+    out: list[str] = []
+    i, n = 0, len(segment)
+    while i < n:
+        char = segment[i]
+        i += 1
+        if char == "*":
+            out.append("[^/]*")
+        elif char == "?":
+            out.append("[^/]")
+        elif char == "[":
+            # Same bracket rules as fnmatch: "]" right after "[" or "[!" is literal
+            j = i + 1 if i < n and segment[i] == "!" else i
+            j = segment.find("]", j + 1 if j < n and segment[j] == "]" else j)
+            if j == -1:
+                out.append("\\[")
+                continue
+            body = re.sub(r"([&~|])", r"\\\1", segment[i:j].replace("\\", "\\\\"))
+            i = j + 1
+            if body.startswith("!"):
+                out.append(f"[^{body[1:]}/]")
+            else:
+                if body.startswith(("^", "[")):
+                    body = "\\" + body
+                out.append(f"(?!/)[{body}]")
+        else:
+            out.append(re.escape(char))
+    return "".join(out)
+
+
+@functools.lru_cache(maxsize=8)
+def _include_regex(globs: tuple[str, ...]) -> typing.Optional[re.Pattern[str]]:
+    """Union of the include globs with pathlib semantics ("**" spans directories).
+
+    Like Path.glob before 3.13, a trailing "**" matches directories only, so
+    such patterns never select a file.
+    """
+    alternatives = []
+    for pattern in globs:
+        parts = pattern.strip("/").split("/")
+        if parts[-1] == "**":
+            continue
+        body = "".join("(?:[^/]+/)*" if part == "**" else _glob_segment_regex(part) + "/" for part in parts)
+        alternatives.append(f"(?:{body[:-1]})")
+    return re.compile("|".join(alternatives)) if alternatives else None
+
+
+@functools.lru_cache(maxsize=8)
+def _exclude_regexes(
+    excludes: tuple[str, ...],
+) -> tuple[typing.Optional[re.Pattern[str]], typing.Optional[re.Pattern[str]]]:
+    """Return (file, directory) exclude regexes, used with ``search``.
+
+    A pattern excludes a path when it is a substring of it (slashes
+    stripped) or fnmatch-matches it, with a leading "**/" also matching at
+    the repo root. Directories are tested with a trailing "/" and only count
+    as excluded when everything beneath them is, i.e. for substring hits or
+    patterns ending in "*".
+    """
+    file_alternatives: list[str] = []
+    dir_alternatives: list[str] = []
+    for ex in excludes:
+        substring = re.escape(ex.strip("/"))
+        globbed = [f"\\A{fnmatch.translate(ex)}"]
+        if ex.startswith("**/"):
+            globbed.append(f"\\A{fnmatch.translate(ex[3:])}")
+        file_alternatives += [substring, *globbed]
+        dir_alternatives.append(substring)
+        if ex.endswith("*"):
+            dir_alternatives += globbed
+
+    def _union(alternatives: list[str]) -> typing.Optional[re.Pattern[str]]:
+        return re.compile("|".join(f"(?:{a})" for a in alternatives)) if alternatives else None
+
+    return _union(file_alternatives), _union(dir_alternatives)
+
+
 class BundleExporter:
     """Handles deterministic export of case bundles."""
 
@@ -43,6 +136,48 @@ class BundleExporter:
 
         return defaults
 
+    def _copy_and_hash(self, source: Path, dest: typing.BinaryIO) -> tuple[str, int]:
+        """Copy source into an open binary stream in one read pass; returns (sha256, size)."""
+        digest = hashlib.sha256()
+        size = 0
+        buffer = memoryview(bytearray(1024 * 1024))
+        with open(source, "rb") as src:
+            while chunk_size := src.readinto(buffer):
+                chunk = buffer[:chunk_size]
+                digest.update(chunk)
+                dest.write(chunk)
+                size += chunk_size
+        return digest.hexdigest(), size
+
+    def _stage_file(self, source: Path, temp_dir: Path, bundle_path: str) -> None:
+        """Copy a source into the staging tree at its bundle path."""
+        dest = temp_dir / bundle_path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(source, dest)
+
+    def _recent_runs(self, last_n: int) -> list[Path]:
+        """Run directories among the last N entries of out/runs, newest first."""
+        runs_dir = self.repo_root / "out" / "runs"
+        if not runs_dir.exists():
+            return []
+        all_runs = sorted(runs_dir.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+        return [run for run in all_runs[:last_n] if run.is_dir()]
+
+    def _plan_dopetask_artifacts(self, last_n: int) -> list[tuple[Path, str]]:
+        """(source, bundle path) pairs for what collect_dopetask_artifacts copies."""
+        sources: list[tuple[Path, str]] = []
+        queue_path = self.repo_root / "out" / "tasks" / "task_queue.json"
+        if queue_path.exists():
+            sources.append((queue_path, "dopetask/task_queue.json"))
+
+        for run in self._recent_runs(last_n):
+            # copytree copies through symlinks, so follow them here too
+            for root, _, files in os.walk(run, followlinks=True):
+                rel_root = Path(root).relative_to(run).as_posix()
+                prefix = f"dopetask/runs/{run.name}/" if rel_root == "." else f"dopetask/runs/{run.name}/{rel_root}/"
+                sources.extend((Path(root, file), prefix + file) for file in files)
+        return sources
+
     def collect_dopetask_artifacts(self, last_n: int, temp_dir: Path) -> list[str]:
         """Collect last N runs and task packets."""
         dopetask_dir = temp_dir / "dopetask"
@@ -50,36 +185,15 @@ class BundleExporter:
 
         manifest_entries = []
 
-        # 1. Task Queue
-        queue_path = self.repo_root / "out" / "tasks" / "task_queue.json"
-        if queue_path.exists():
-            dest = dopetask_dir / "task_queue.json"
-            shutil.copy2(queue_path, dest)
-            manifest_entries.append("dopetask/task_queue.json")
-
-        # 2. Packets (simplified: verify existence, but complex logic omitted for brevity)
-        # 3. Runs (simplified: copy last N folders)
-        runs_dir = self.repo_root / "out" / "runs"
-        if runs_dir.exists():
-            all_runs = sorted(runs_dir.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
-            for run in all_runs[:last_n]:
-                if not run.is_dir():
-                    continue
-                dest_run = dopetask_dir / "runs" / run.name
-                shutil.copytree(run, dest_run)
-                # Walk and add to manifest
-                for root, _, files in os.walk(dest_run):
-                    for file in files:
-                        rel_path = Path(root).relative_to(temp_dir) / file
-                        manifest_entries.append(str(rel_path))
+        # Task queue and the last N run folders (packets: complex logic omitted for brevity)
+        for source, bundle_path in self._plan_dopetask_artifacts(last_n):
+            self._stage_file(source, temp_dir, bundle_path)
+            manifest_entries.append(bundle_path)
 
         return manifest_entries
 
-    def collect_repo_snapshot(self, temp_dir: Path) -> str:
-        """Generate REPO_SNAPSHOT.json."""
-        repo_dir = temp_dir / "repo"
-        repo_dir.mkdir(parents=True, exist_ok=True)
-
+    def _repo_snapshot(self) -> dict[str, Any]:
+        """Build the REPO_SNAPSHOT.json payload."""
         snapshot = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "git_available": False,
@@ -99,50 +213,59 @@ class BundleExporter:
             except Exception:
                 pass
 
+        return snapshot
+
+    def collect_repo_snapshot(self, temp_dir: Path) -> str:
+        """Generate REPO_SNAPSHOT.json."""
+        repo_dir = temp_dir / "repo"
+        repo_dir.mkdir(parents=True, exist_ok=True)
+
         snapshot_path = repo_dir / "REPO_SNAPSHOT.json"
         with open(snapshot_path, "w") as f:
-            json.dump(snapshot, f, indent=2)
+            json.dump(self._repo_snapshot(), f, indent=2)
 
         return "repo/REPO_SNAPSHOT.json"
 
-    def collect_repo_logs(self, temp_dir: Path) -> list[str]:
-        """Collect logs based on config capabilities."""
-        logs_out_dir = temp_dir / "repo" / "logs"
-        logs_out_dir.mkdir(parents=True, exist_ok=True)
-
+    def _plan_repo_logs(self) -> tuple[list[tuple[Path, str]], dict[str, list[dict[str, Any]]]]:
+        """Select logs within the configured caps; returns (source, bundle path) pairs and LOG_INDEX."""
         log_index: dict[str, list[dict[str, Any]]] = {
             "included": [],
             "skipped": []
         }
 
-        manifest_entries = []
-
+        sources: list[tuple[Path, str]] = []
         # Simple glob implementation
         globs = self.config["logs"].get("globs", [])
         excludes = self.config["logs"].get("excludes", [])
 
-        # Gather candidates
-        candidates = set()
-        for g in globs:
-            for path in self.repo_root.glob(g):
+        # One walk over the repo: excluded directories are pruned before
+        # descending, and each file name is tested against every glob.
+        include_re = _include_regex(tuple(globs))
+        exclude_file_re, exclude_dir_re = _exclude_regexes(tuple(excludes))
+        root = os.fspath(self.repo_root)
+        prefix_len = len(os.path.join(root, ""))
+        candidates: list[tuple[str, Path]] = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            if include_re is None:
+                break
+            rel_dir = dirpath[prefix_len:].replace(os.sep, "/") + "/" if dirpath != root else ""
+            if exclude_dir_re is not None:
+                dirnames[:] = [d for d in dirnames if not exclude_dir_re.search(f"{rel_dir}{d}/")]
+            for name in filenames:
+                rel = rel_dir + name
+                if not include_re.fullmatch(rel):
+                    continue
+                if exclude_file_re is not None and exclude_file_re.search(rel):
+                    continue
+                path = Path(dirpath, name)
                 if path.is_file():
-                    candidates.add(path)
-
-        # Filter excludes
-        final_list = []
-        for path in candidates:
-            rel = path.relative_to(self.repo_root)
-            # Check excludes (naive)
-            is_excluded = False
-            for ex in excludes:
-                # Basic match check
-                if ex.strip("/") in str(rel): # Simplification
-                    is_excluded = True
-                    break
-            if not is_excluded:
-                final_list.append(path)
-
-        # Copy with caps logic
+                    candidates.append((rel, path))
+
+        # Sorted so the caps below are applied in a deterministic order
+        candidates.sort(key=lambda item: item[0].split("/"))
+        final_list = [path for _, path in candidates]
+
+        # Caps logic
         total_size = 0
         max_total = self.config["logs"]["caps"]["total_logs_max_mb"] * 1024 * 1024
 
@@ -158,14 +281,24 @@ class BundleExporter:
                  log_index["skipped"].append({"path": str(rel_path), "reason": "total_cap_hit"})
                  continue
 
-            # Copy
-            dest = logs_out_dir / rel_path
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(path, dest)
-
             total_size += size
             log_index["included"].append({"path": str(rel_path), "size": size})
-            manifest_entries.append(f"repo/logs/{rel_path}")
+            sources.append((path, f"repo/logs/{rel_path.as_posix()}"))
+
+        return sources, log_index
+
+    def collect_repo_logs(self, temp_dir: Path) -> list[str]:
+        """Collect logs based on config capabilities."""
+        logs_out_dir = temp_dir / "repo" / "logs"
+        logs_out_dir.mkdir(parents=True, exist_ok=True)
+
+        sources, log_index = self._plan_repo_logs()
+        manifest_entries = []
+
+        # Copy
+        for path, bundle_path in sources:
+            self._stage_file(path, temp_dir, bundle_path)
+            manifest_entries.append(bundle_path)
 
         # Write index
         index_path = temp_dir / "repo" / "LOG_INDEX.json"
@@ -175,61 +308,30 @@ class BundleExporter:
 
         return manifest_entries
 
-    def _sha256_file(self, path: Path) -> str:
-        """Compute SHA256 for a file."""
-        digest = hashlib.sha256()
-        with path.open("rb") as handle:
-            for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-                digest.update(chunk)
-        return digest.hexdigest()
-
-    def _classify_path(self, rel_path: str) -> str:
-        """Classify a bundled file deterministically by path."""
-        normalized = rel_path.replace("\\", "/")
-        if normalized == "dopetask/task_queue.json":
-            return "dopetask_task_queue"
-        if normalized.startswith("dopetask/packets/") or (
-            normalized.startswith("dopetask/runs/") and normalized.endswith("/TASK_PACKET.md")
-        ):
-            return "dopetask_packet"
-        if normalized.startswith("dopetask/runs/"):
-            return "dopetask_run_artifact"
-        if normalized == "repo/REPO_SNAPSHOT.json":
-            return "repo_snapshot"
-        if normalized.startswith("repo/logs/") or normalized == "repo/LOG_INDEX.json":
-            return "repo_log"
-        if normalized.startswith("reports/"):
-            return "report"
-        return "unknown"
-
     def _collect_file_entries(self, temp_dir: Path) -> list[dict[str, Any]]:
         """Collect deterministic file metadata for CASE_MANIFEST.files."""
         entries: list[dict[str, Any]] = []
-        for path in sorted(p for p in temp_dir.rglob("*") if p.is_file()):
-            rel = path.relative_to(temp_dir).as_posix()
-            if rel == "case/CASE_MANIFEST.json":
-                continue
+        walked = [item for item in walk_files(temp_dir) if item[0] != "case/CASE_MANIFEST.json"]
+        hashes = sha256_files([path for _, path, _ in walked])
+        for (rel, _, size), sha256 in zip(walked, hashes):
             entries.append(
                 {
                     "path": rel,
-                    "sha256": self._sha256_file(path),
-                    "size_bytes": path.stat().st_size,
-                    "category": self._classify_path(rel),
+                    "sha256": sha256,
+                    "size_bytes": size,
+                    "category": classify_path(rel),
                 }
             )
         return entries
 
-    def build_case_manifest(self, temp_dir: Path, case_id: str) -> None:
-        """Generate manifest for the entire bundle."""
-        case_dir = temp_dir / "case"
-        case_dir.mkdir(parents=True, exist_ok=True)
-        files = self._collect_file_entries(temp_dir)
+    def _case_manifest(self, files: list[dict[str, Any]], case_id: str) -> dict[str, Any]:
+        """Build the CASE_MANIFEST.json payload for the given file entries."""
         manifest_hash_input = "\n".join(
             f"{entry['path']}|{entry['sha256']}|{entry['size_bytes']}" for entry in files
         )
         manifest_hash = hashlib.sha256(manifest_hash_input.encode("utf-8")).hexdigest()
 
-        manifest = {
+        return {
             "schema_version": "1.0",
             "case_id": case_id,
             "generated_at": datetime.now(timezone.utc).isoformat(),
@@ -246,44 +348,78 @@ class BundleExporter:
             "files": files,
         }
 
+    def build_case_manifest(self, temp_dir: Path, case_id: str) -> None:
+        """Generate manifest for the entire bundle."""
+        case_dir = temp_dir / "case"
+        case_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._case_manifest(self._collect_file_entries(temp_dir), case_id)
+
         with open(case_dir / "CASE_MANIFEST.json", "w") as f:
             json.dump(manifest, f, indent=2)
 
+    def _zip_source(self, zf: zipfile.ZipFile, source: Path, bundle_path: str) -> dict[str, Any]:
+        """Stream a file into the bundle, hashing it in the same read; returns its manifest entry."""
+        info = zipfile.ZipInfo.from_file(source, bundle_path)
+        if os.path.splitext(bundle_path)[1].lower() in _STORED_SUFFIXES:
+            info.compress_type = zipfile.ZIP_STORED
+        else:
+            info.compress_type = zipfile.ZIP_DEFLATED
+            # Entries built with from_file do not inherit the archive's level.
+            # The attribute is public from Python 3.13; earlier versions read
+            # the private field.
+            if hasattr(info, "compress_level"):
+                info.compress_level = _DEFLATE_LEVEL
+            else:
+                info._compresslevel = _DEFLATE_LEVEL
+        with zf.open(info, "w") as dest:
+            sha256, size = self._copy_and_hash(source, dest)
+        return {
+            "path": bundle_path,
+            "sha256": sha256,
+            "size_bytes": size,
+            "category": classify_path(bundle_path),
+        }
+
+    def _zip_json(self, zf: zipfile.ZipFile, bundle_path: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """Write a generated JSON artifact into the bundle; returns its manifest entry."""
+        data = json.dumps(payload, indent=2).encode("utf-8")
+        zf.writestr(bundle_path, data)
+        return {
+            "path": bundle_path,
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "size_bytes": len(data),
+            "category": classify_path(bundle_path),
+        }
+
     def export(self, last_n: int, out_dir: Path, case_id: typing.Optional[str] = None) -> Path:
-        """Main export flow."""
-        import tempfile
+        """Main export flow.
 
+        Source files are streamed straight into the zip and hashed in the same
+        pass; generated JSON is written from memory and the manifest goes last.
+        """
         if not case_id:
             ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
             case_id = f"CASE_{ts}"
 
         console.print(f"[cyan]Exporting Case Bundle: {case_id}[/cyan]")
 
-        with tempfile.TemporaryDirectory() as td:
-            temp_path = Path(td)
-
-            # 1. Artifacts
-            self.collect_dopetask_artifacts(last_n, temp_path)
-
-            # 2. Snapshot
-            self.collect_repo_snapshot(temp_path)
-
-            # 3. Logs
-            self.collect_repo_logs(temp_path)
-
-            # 4. Manifest
-            self.build_case_manifest(temp_path, case_id)
-
-            # 5. Zip
-            out_dir.mkdir(parents=True, exist_ok=True)
-            zip_path = out_dir / f"{case_id}.zip"
-
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
-                for root, _, files in os.walk(temp_path):
-                    for file in files:
-                        abs_path = Path(root) / file
-                        rel_path = abs_path.relative_to(temp_path)
-                        zf.write(abs_path, rel_path)
-
-            console.print(f"[green]Bundle exported to: {zip_path}[/green]")
-            return zip_path
+        # 1. Artifacts, 2. Snapshot, 3. Logs
+        artifacts = self._plan_dopetask_artifacts(last_n)
+        snapshot = self._repo_snapshot()
+        log_sources, log_index = self._plan_repo_logs()
+
+        # 4. Zip, 5. Manifest
+        out_dir.mkdir(parents=True, exist_ok=True)
+        zip_path = out_dir / f"{case_id}.zip"
+
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=_DEFLATE_LEVEL) as zf:
+            files = [self._zip_source(zf, source, bundle_path) for source, bundle_path in artifacts]
+            files.append(self._zip_json(zf, "repo/REPO_SNAPSHOT.json", snapshot))
+            files.extend(self._zip_source(zf, source, bundle_path) for source, bundle_path in log_sources)
+            files.append(self._zip_json(zf, "repo/LOG_INDEX.json", log_index))
+            # Same order as walking an extracted bundle
+            files.sort(key=lambda entry: entry["path"].split("/"))
+            self._zip_json(zf, "case/CASE_MANIFEST.json", self._case_manifest(files, case_id))
+
+        console.print(f"[green]Bundle exported to: {zip_path}[/green]")
+        return zip_path
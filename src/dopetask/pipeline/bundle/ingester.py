@@ -2,22 +2,22 @@
 
 from __future__ import annotations
 
-import hashlib
 import json
+import os
 import shutil
+import stat
 import typing
 import zipfile
 from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Any
+from pathlib import Path
+from typing import Any
 
 from jsonschema import validate
 from rich.console import Console
 
+from dopetask.pipeline.bundle.common import classify_path, sha256_files, walk_files
 from dopetask.utils.schema_registry import get_schema_json
 
-if TYPE_CHECKING:
-    from pathlib import Path
-
 DETERMINISTIC_TIMESTAMP = "1970-01-01T00:00:00Z"
 
 console = Console()
@@ -31,31 +31,13 @@ def _timestamp(timestamp_mode: str) -> str:
     raise ValueError(f"Invalid timestamp_mode: {timestamp_mode}")
 
 
-def _sha256_file(path: Path) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
-
-
-def _classify_path(rel_path: str) -> str:
-    normalized = rel_path.replace("\\", "/")
-    if normalized == "dopetask/task_queue.json":
-        return "dopetask_task_queue"
-    if normalized.startswith("dopetask/packets/") or (
-        normalized.startswith("dopetask/runs/") and normalized.endswith("/TASK_PACKET.md")
-    ):
-        return "dopetask_packet"
-    if normalized.startswith("dopetask/runs/"):
-        return "dopetask_run_artifact"
-    if normalized == "repo/REPO_SNAPSHOT.json":
-        return "repo_snapshot"
-    if normalized.startswith("repo/logs/") or normalized == "repo/LOG_INDEX.json":
-        return "repo_log"
-    if normalized.startswith("reports/"):
-        return "report"
-    return "unknown"
+def _regular_file_stat(path: Path) -> typing.Optional[os.stat_result]:
+    """Stat ``path`` once; None when it is missing or not a regular file."""
+    try:
+        file_stat = path.stat()
+    except (OSError, ValueError):
+        return None
+    return file_stat if stat.S_ISREG(file_stat.st_mode) else None
 
 
 def _build_case_index(
@@ -67,14 +49,15 @@ def _build_case_index(
 ) -> dict[str, Any]:
     """Build deterministic CASE_INDEX payload for an extracted bundle."""
     files: list[dict[str, Any]] = []
-    for path in sorted(p for p in case_root.rglob("*") if p.is_file()):
-        rel = path.relative_to(case_root).as_posix()
+    walked = walk_files(case_root)
+    hashes = sha256_files([path for _, path, _ in walked])
+    for (rel, _, size), sha256 in zip(walked, hashes):
         files.append(
             {
                 "path": rel,
-                "sha256": _sha256_file(path),
-                "size_bytes": path.stat().st_size,
-                "category": _classify_path(rel),
+                "sha256": sha256,
+                "size_bytes": size,
+                "category": classify_path(rel),
             }
         )
 
@@ -129,7 +112,22 @@ def _validate_manifest_integrity(case_root: Path, manifest_data: dict[str, Any])
             ],
         }
 
-    for entry in entries:
+    # Stat each listed file once and hash every file that will be compared up
+    # front, in parallel; the loop below still reports in manifest order.
+    file_stats: dict[int, os.stat_result] = {}
+    for index, entry in enumerate(entries):
+        if isinstance(entry, dict) and isinstance(entry.get("path"), str) and entry["path"]:
+            file_stat = _regular_file_stat(case_root / entry["path"])
+            if file_stat is not None:
+                file_stats[index] = file_stat
+    hash_targets = {
+        index: case_root / entries[index]["path"]
+        for index in file_stats
+        if isinstance(entries[index].get("sha256"), str)
+    }
+    hashes = dict(zip(hash_targets, sha256_files(list(hash_targets.values()))))
+
+    for index, entry in enumerate(entries):
         if not isinstance(entry, dict):
             mismatches.append(
                 {
@@ -151,8 +149,8 @@ def _validate_manifest_integrity(case_root: Path, manifest_data: dict[str, Any])
             )
             continue
 
-        target = case_root / rel_path
-        if not target.exists() or not target.is_file():
+        file_stat = file_stats.get(index)
+        if file_stat is None:
             mismatches.append(
                 {
                     "code": "missing_file",
@@ -164,7 +162,7 @@ def _validate_manifest_integrity(case_root: Path, manifest_data: dict[str, Any])
 
         expected_sha = entry.get("sha256")
         if isinstance(expected_sha, str):
-            actual_sha = _sha256_file(target)
+            actual_sha = hashes[index]
             if actual_sha != expected_sha:
                 mismatches.append(
                     {
@@ -176,7 +174,7 @@ def _validate_manifest_integrity(case_root: Path, manifest_data: dict[str, Any])
 
         expected_size = entry.get("size_bytes")
         if isinstance(expected_size, int):
-            actual_size = target.stat().st_size
+            actual_size = file_stat.st_size
             if actual_size != expected_size:
                 mismatches.append(
                     {
@@ -0,0 +1,36 @@
+"""PEP 562 lazy re-exports for package ``__init__`` modules."""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+
+def lazy_exports(
+    package: str,
+    exports: Mapping[str, Iterable[str]],
+) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Build ``__getattr__`` and ``__dir__`` for a package's re-exports.
+
+    ``exports`` maps each submodule to the names it provides. A name's
+    submodule is imported on first attribute access and the value is cached
+    in the package namespace, so importing the package alone loads nothing.
+    """
+    owners = {name: module for module, names in exports.items() for name in names}
+
+    def __getattr__(name: str) -> Any:
+        module_name = owners.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[package])) | set(owners))
+
+    return __getattr__, __dir__
@@ -34,6 +34,7 @@ def test_canonical_target_selection_order(tmp_path):
 
     # 1. Fallback
     assert get_canonical_target(repo_root) == repo_root / "docs/llm/DOPETASK_OPERATOR_SYSTEM.md"
+    assert run_doctor(repo_root)["canonical_target"] == "docs/llm/DOPETASK_OPERATOR_SYSTEM.md"
 
     # 2. AGENTS.md
     (repo_root / "AGENTS.md").write_text("Agents")
@@ -42,11 +43,13 @@ def test_canonical_target_selection_order(tmp_path):
     # 3. CLAUDE.md
     (repo_root / "CLAUDE.md").write_text("CLAUDE")
     assert get_canonical_target(repo_root) == repo_root / "CLAUDE.md"
+    assert run_doctor(repo_root)["canonical_target"] == "CLAUDE.md"
 
     # 4. .claude/CLAUDE.md
     (repo_root / ".claude").mkdir()
     (repo_root / ".claude/CLAUDE.md").write_text(".claude/CLAUDE")
     assert get_canonical_target(repo_root) == repo_root / ".claude/CLAUDE.md"
+    assert run_doctor(repo_root)["canonical_target"] == ".claude/CLAUDE.md"
 
 def test_apply_strategy_create_new_sidecar_fallback(tmp_path):
     repo_root = tmp_path
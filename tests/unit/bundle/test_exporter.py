@@ -1,11 +1,13 @@
 
+import hashlib
 import json
 import zipfile
+import zlib
 from unittest.mock import patch
 
 import pytest
 
-from dopetask.pipeline.bundle.exporter import BundleExporter
+from dopetask.pipeline.bundle.exporter import BundleExporter, _exclude_regexes, _include_regex
 
 
 class TestBundleExporter:
@@ -86,3 +88,88 @@ class TestBundleExporter:
             names = zf.namelist()
             assert "repo/REPO_SNAPSHOT.json" in names
             assert "case/CASE_MANIFEST.json" in names
+
+    def test_collect_repo_logs_prunes_excluded_dirs(self, repo_root):
+        """Excluded directories are skipped at any depth, and logs are collected in path order."""
+        for rel in ("node_modules/pkg/a.log", "web/node_modules/b.log", "web/.venv/c.log", "sub/z.log", "sub/a.log"):
+            path = repo_root / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("log")
+
+        exporter = BundleExporter(repo_root)
+        temp_dir = repo_root / "temp_logs"
+        temp_dir.mkdir()
+
+        exporter.collect_repo_logs(temp_dir)
+
+        data = json.loads((temp_dir / "repo" / "LOG_INDEX.json").read_text())
+        assert [entry["path"] for entry in data["included"]] == ["app.log", "sub/a.log", "sub/z.log"]
+
+
+    def test_export_manifest_matches_streamed_zip_entries(self, repo_root):
+        """Manifest hashes and sizes are computed while streaming and match the zip contents."""
+        run_dir = repo_root / "out" / "runs" / "RUN_1"
+        run_dir.mkdir()
+        (run_dir / "TASK_PACKET.md").write_text("packet")
+
+        zip_path = BundleExporter(repo_root).export(last_n=1, out_dir=repo_root / "dest", case_id="CASE_STREAM")
+
+        with zipfile.ZipFile(zip_path) as zf:
+            manifest = json.loads(zf.read("case/CASE_MANIFEST.json"))
+            paths = [entry["path"] for entry in manifest["files"]]
+            assert sorted(paths) == sorted(name for name in zf.namelist() if name != "case/CASE_MANIFEST.json")
+            for entry in manifest["files"]:
+                data = zf.read(entry["path"])
+                assert entry["sha256"] == hashlib.sha256(data).hexdigest()
+                assert entry["size_bytes"] == len(data)
+        assert "dopetask/runs/RUN_1/TASK_PACKET.md" in paths
+        assert "repo/logs/app.log" in paths
+
+    def test_export_stores_already_compressed_files(self, repo_root):
+        """Compressed payloads are stored rather than deflated a second time."""
+        run_dir = repo_root / "out" / "runs" / "RUN_1"
+        run_dir.mkdir()
+        (run_dir / "trace.json.gz").write_bytes(b"\x1f\x8b" + b"\x00" * 64)
+        (run_dir / "notes.txt").write_text("notes " * 64)
+
+        zip_path = BundleExporter(repo_root).export(last_n=1, out_dir=repo_root / "dest", case_id="CASE_STORED")
+
+        with zipfile.ZipFile(zip_path) as zf:
+            assert zf.getinfo("dopetask/runs/RUN_1/trace.json.gz").compress_type == zipfile.ZIP_STORED
+            assert zf.getinfo("dopetask/runs/RUN_1/notes.txt").compress_type == zipfile.ZIP_DEFLATED
+            assert zf.read("dopetask/runs/RUN_1/trace.json.gz") == b"\x1f\x8b" + b"\x00" * 64
+
+    def test_export_deflates_at_level_one(self, repo_root):
+        """Streamed sources and generated JSON are both deflated at level 1."""
+        run_dir = repo_root / "out" / "runs" / "RUN_1"
+        run_dir.mkdir()
+        (run_dir / "run.log").write_text("".join(f"line {i} status=ok value={i * 7919 % 1000}\n" for i in range(4000)))
+
+        zip_path = BundleExporter(repo_root).export(last_n=1, out_dir=repo_root / "dest", case_id="CASE_LEVEL")
+
+        with zipfile.ZipFile(zip_path) as zf:
+            for name in ("dopetask/runs/RUN_1/run.log", "case/CASE_MANIFEST.json"):
+                info = zf.getinfo(name)
+                compressor = zlib.compressobj(1, zlib.DEFLATED, -15)
+                expected = compressor.compress(zf.read(name)) + compressor.flush()
+                assert info.compress_type == zipfile.ZIP_DEFLATED
+                assert info.compress_size == len(expected)
+
+def test_include_regex_follows_pathlib_glob_semantics():
+    include = _include_regex(("**/*.log", "logs/**", "[!.]*/*.out"))
+
+    assert include.fullmatch("app.log")
+    assert include.fullmatch("a/b/app.log")
+    assert not include.fullmatch("logs/app.txt")
+    assert include.fullmatch("src/run.out")
+    assert not include.fullmatch(".cache/run.out")
+    assert not include.fullmatch("src/nested/run.out")
+
+
+def test_exclude_regexes_prune_only_fully_excluded_dirs():
+    file_re, dir_re = _exclude_regexes(("**/node_modules/**", "*.tmp.log"))
+
+    assert file_re.search("node_modules/pkg/a.log")
+    assert file_re.search("build.tmp.log")
+    assert dir_re.search("web/node_modules/")
+    assert not dir_re.search("web/")
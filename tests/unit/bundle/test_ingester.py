@@ -3,7 +3,12 @@ import json
 import zipfile
 from pathlib import Path
 
-from dopetask.pipeline.bundle.ingester import _build_case_index, ingest_bundle
+from dopetask.pipeline.bundle.common import walk_files
+from dopetask.pipeline.bundle.ingester import (
+    _build_case_index,
+    _validate_manifest_integrity,
+    ingest_bundle,
+)
 
 
 def _write_json(path: Path, payload: dict) -> None:
@@ -96,3 +101,44 @@ def test_ingest_bundle_detects_integrity_mismatch(tmp_path: Path) -> None:
 
     mismatch_codes = {item["code"] for item in case_index["integrity"]["mismatches"]}
     assert "sha256_mismatch" in mismatch_codes
+
+
+def test_validate_manifest_integrity_reports_in_manifest_order(tmp_path: Path) -> None:
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text(name, encoding="utf-8")
+
+    integrity = _validate_manifest_integrity(
+        tmp_path,
+        {
+            "files": [
+                {"path": "a.txt", "sha256": _sha("other"), "size_bytes": 1},
+                {"path": "missing.txt", "sha256": _sha("missing")},
+                "not-an-object",
+                {"path": "b.txt", "sha256": _sha("b.txt"), "size_bytes": 5},
+                {"path": "c.txt", "sha256": _sha("nope")},
+            ]
+        },
+    )
+
+    assert [(item["code"], item["path"]) for item in integrity["mismatches"]] == [
+        ("sha256_mismatch", "a.txt"),
+        ("size_mismatch", "a.txt"),
+        ("missing_file", "missing.txt"),
+        ("manifest_entry_invalid", "case/CASE_MANIFEST.json"),
+        ("sha256_mismatch", "c.txt"),
+    ]
+
+
+def test_walk_files_matches_rglob_order_and_symlink_handling(tmp_path: Path) -> None:
+    for rel in ("a/b", "a-b", "a.b/c", "A/x", ".hidden/y", "z", "a/b2/c/d"):
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(rel, encoding="utf-8")
+    (tmp_path / "link_dir").symlink_to(tmp_path / "a")
+    (tmp_path / "link_file").symlink_to(tmp_path / "z")
+
+    expected = [
+        (p.relative_to(tmp_path).as_posix(), str(p), p.stat().st_size)
+        for p in sorted(p for p in tmp_path.rglob("*") if p.is_file())
+    ]
+    assert walk_files(tmp_path) == expected
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from dopetask.guard.banner import BannerContext, print_identity_banner
+import subprocess
+
+from dopetask.guard.banner import BannerContext, get_banner_context, print_identity_banner
 
 
 def test_banner_prints_single_line_when_origin_matches_hint(capsys, monkeypatch) -> None:
@@ -71,3 +73,30 @@ def test_banner_prints_warning_when_origin_unavailable(capsys, monkeypatch) -> N
         "[dopetask] project=dopetask repo=dopeTask branch=main run=none",
         "[dopetask][WARNING] origin URL not available",
     ]
+
+
+def test_banner_context_reads_git_metadata_from_disk(tmp_path, monkeypatch) -> None:
+    """Branch and origin read from .git should match git for main and linked worktrees."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("XDG_CONFIG_HOME", raising=False)
+    repo = tmp_path / "repo"
+    worktree = tmp_path / "wt"
+
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", "-C", str(repo), *args], check=True, capture_output=True, text=True
+        ).stdout.strip()
+
+    repo.mkdir()
+    git("init", "-q", "-b", "main")
+    git("remote", "add", "origin", "git@github.com:example/dopeTask.git")
+    git("-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-q", "--allow-empty", "-m", "init")
+    git("worktree", "add", "-q", str(worktree), "-b", "feature")
+
+    main_ctx = get_banner_context(repo, "dopetask", None, None, None)
+    linked_ctx = get_banner_context(worktree, "dopetask", None, None, None)
+    assert (main_ctx.branch, main_ctx.origin_url) == ("main", "git@github.com:example/dopeTask.git")
+    assert (linked_ctx.branch, linked_ctx.origin_url) == ("feature", "git@github.com:example/dopeTask.git")
+
+    git("checkout", "-q", "--detach")
+    assert get_banner_context(repo, "dopetask", None, None, None).branch == "HEAD"
@@ -0,0 +1,153 @@
+"""Tests for marker-scoped LLM refresh helpers."""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+
+from dopetask.docs.llm_refresh import (
+    AUTOGEN_END,
+    AUTOGEN_START,
+    _load_repo_identity_cached,
+    apply_autogen_block,
+    ensure_autogen_markers,
+    refresh_llm_docs,
+    replace_autogen_block,
+    run_tool_cmd,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_replace_autogen_block_preserves_prefix_and_suffix(tmp_path: Path) -> None:
+    path = tmp_path / "CLAUDE.md"
+    path.write_text(f"prefix\n{AUTOGEN_START}\nold\n{AUTOGEN_END}\nsuffix\n", encoding="utf-8")
+
+    replace_autogen_block(path, "\nnew\n")
+
+    assert path.read_text(encoding="utf-8") == (
+        f"prefix\n{AUTOGEN_START}\nnew\n{AUTOGEN_END}\nsuffix\n"
+    )
+
+
+def test_replace_autogen_block_uses_supplied_text(tmp_path: Path) -> None:
+    path = tmp_path / "AGENTS.md"
+    path.write_text("stale on disk\n", encoding="utf-8")
+
+    replace_autogen_block(path, "new", text=f"{AUTOGEN_START}\n{AUTOGEN_END}\n")
+
+    assert path.read_text(encoding="utf-8") == f"{AUTOGEN_START}\nnew\n{AUTOGEN_END}\n"
+
+
+def test_replace_autogen_block_requires_end_after_start(tmp_path: Path) -> None:
+    path = tmp_path / "AGENTS.md"
+    path.write_text(f"{AUTOGEN_END}\n{AUTOGEN_START}\n", encoding="utf-8")
+
+    with pytest.raises(RuntimeError, match="Missing end marker"):
+        replace_autogen_block(path, "new")
+
+
+@pytest.mark.parametrize(
+    "initial",
+    [None, "", "# Title\nbody", f"# Title\n{AUTOGEN_START}\nold\n{AUTOGEN_END}\ntail\n"],
+)
+def test_apply_autogen_block_matches_ensure_then_replace(tmp_path: Path, initial) -> None:
+    fused = tmp_path / "fused.md"
+    staged = tmp_path / "staged.md"
+    if initial is not None:
+        fused.write_text(initial, encoding="utf-8")
+        staged.write_text(initial, encoding="utf-8")
+
+    apply_autogen_block(fused, "generated")
+    ensure_autogen_markers(staged)
+    replace_autogen_block(staged, "generated")
+
+    assert fused.read_text(encoding="utf-8") == staged.read_text(encoding="utf-8")
+
+
+def test_apply_autogen_block_replaces_file_atomically(tmp_path: Path) -> None:
+    path = tmp_path / "CLAUDE.md"
+    path.write_text("# Title\n", encoding="utf-8")
+    path.chmod(0o640)
+
+    apply_autogen_block(path, "generated")
+
+    assert "generated" in path.read_text(encoding="utf-8")
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert [entry.name for entry in tmp_path.iterdir()] == ["CLAUDE.md"]
+
+
+def test_apply_autogen_block_writes_through_symlink(tmp_path: Path) -> None:
+    target = tmp_path / "CLAUDE.md"
+    target.write_text("# Title\n", encoding="utf-8")
+    link = tmp_path / "AGENTS.md"
+    link.symlink_to("CLAUDE.md")
+
+    apply_autogen_block(link, "generated")
+
+    assert link.is_symlink()
+    assert "generated" in target.read_text(encoding="utf-8")
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ["AGENTS.md", "CLAUDE.md"]
+
+
+def test_run_tool_cmd_returns_stdout_for_prompt() -> None:
+    cmd = [sys.executable, "-c", "import sys; sys.stdout.write(sys.stdin.read().upper())"]
+
+    assert run_tool_cmd(cmd, "prompt\n") == "PROMPT\n"
+
+
+def test_run_tool_cmd_reports_stderr_on_failure() -> None:
+    cmd = [sys.executable, "-c", "import sys; sys.stderr.write('boom'); sys.exit(3)"]
+
+    with pytest.raises(RuntimeError, match=r"failed \(3\): boom"):
+        run_tool_cmd(cmd, "")
+
+
+def test_run_tool_cmd_caps_output() -> None:
+    cmd = [sys.executable, "-c", "print('x' * 100)\nwhile True: print('y' * 100)"]
+
+    with pytest.raises(RuntimeError, match="exceeded 1000 characters"):
+        run_tool_cmd(cmd, "", max_output_chars=1000)
+
+
+def test_repo_identity_cache_tracks_file_changes(tmp_path: Path) -> None:
+    assert _load_repo_identity_cached(tmp_path) is None
+
+    identity_path = tmp_path / ".dopetask" / "project.json"
+    identity_path.parent.mkdir()
+    identity_path.write_text(json.dumps({"project_id": "first"}), encoding="utf-8")
+    assert _load_repo_identity_cached(tmp_path).project_id == "first"
+
+    identity_path.write_text(json.dumps({"project_id": "second"}), encoding="utf-8")
+    stat = identity_path.stat()
+    os.utime(identity_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert _load_repo_identity_cached(tmp_path).project_id == "second"
+
+
+def test_refresh_llm_docs_updates_both_targets(tmp_path: Path) -> None:
+    cmd = [sys.executable, "-c", "print('generated body')"]
+
+    result = refresh_llm_docs(tmp_path, cmd, "default")
+
+    assert result["files"] == [str(tmp_path / "CLAUDE.md"), str(tmp_path / "AGENTS.md")]
+    for name in ("CLAUDE.md", "AGENTS.md"):
+        text = (tmp_path / name).read_text(encoding="utf-8")
+        assert f"{AUTOGEN_START}\ngenerated body\n{AUTOGEN_END}" in text
+
+
+def test_refresh_llm_docs_applies_symlinked_targets_once(tmp_path: Path) -> None:
+    (tmp_path / "CLAUDE.md").write_text("# Title\n", encoding="utf-8")
+    (tmp_path / "AGENTS.md").symlink_to("CLAUDE.md")
+    cmd = [sys.executable, "-c", "print('generated body')"]
+
+    refresh_llm_docs(tmp_path, cmd, "default")
+
+    assert (tmp_path / "AGENTS.md").is_symlink()
+    text = (tmp_path / "CLAUDE.md").read_text(encoding="utf-8")
+    assert text.count(AUTOGEN_START) == 1
+    assert f"{AUTOGEN_START}\ngenerated body\n{AUTOGEN_END}" in text
@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import json
+import subprocess
+import sys
 from pathlib import Path
 
 from jsonschema import validate
@@ -135,3 +137,10 @@ def test_manifest_check_detects_missing_artifacts(tmp_path: Path) -> None:
     replay = check_manifest(run_dir)
     assert replay["missing"] == ["PROMOTION.json"]
     assert replay["extras"] == ["UNEXPECTED.md"]
+
+
+def test_cli_import_does_not_load_manifest_submodule() -> None:
+    code = "import sys, dopetask.cli; print('dopetask.manifest.manifest' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+
+    assert result.stdout.split() == ["False"]
@@ -8,10 +8,11 @@ import subprocess
 import sys
 from pathlib import Path
 
+import pytest
 from typer.testing import CliRunner
 
 from dopetask.cli import cli
-from dopetask.metrics import load_metrics, resolve_metrics_path
+from dopetask.metrics import infer_command_name, load_metrics, resolve_metrics_path, save_metrics
 
 RUNNER = CliRunner()
 REPO_ROOT = Path(__file__).resolve().parents[3]
@@ -132,3 +133,71 @@ def test_metrics_env_opt_in_counts_help_and_version(tmp_path: Path) -> None:
     assert commands.get("--help", 0) >= 1
     assert commands.get("--version", 0) >= 1
     assert payload["enabled"] is False
+
+
+def test_save_metrics_rewrites_existing_file_in_place(tmp_path: Path) -> None:
+    path = tmp_path / "dopetask" / "metrics.json"
+    save_metrics(path, {"schema_version": "1.0", "enabled": True, "commands": {}})
+    inode = path.stat().st_ino
+
+    save_metrics(path, {"schema_version": "1.0", "enabled": True, "commands": {"wt start": 1}})
+
+    assert path.stat().st_ino == inode
+    assert load_metrics(path)["commands"] == {"wt start": 1}
+    assert [entry.name for entry in path.parent.iterdir()] == ["metrics.json"]
+
+
+def test_load_metrics_returns_copies_and_sees_external_writes(tmp_path: Path) -> None:
+    path = tmp_path / "metrics.json"
+    save_metrics(path, {"schema_version": "1.0", "enabled": True, "commands": {"wt": 1}})
+
+    first = load_metrics(path)
+    first["commands"]["wt"] = 99
+    assert load_metrics(path)["commands"] == {"wt": 1}
+
+    path.write_text(json.dumps({"enabled": False, "commands": {"wt": 2, "finish": 1}}), encoding="utf-8")
+    assert load_metrics(path) == {"schema_version": "1.0", "enabled": False, "commands": {"wt": 2, "finish": 1}}
+
+
+def test_save_metrics_durable_replaces_file(tmp_path: Path) -> None:
+    path = tmp_path / "dopetask" / "metrics.json"
+    save_metrics(path, {"schema_version": "1.0", "enabled": False, "commands": {}})
+    inode = path.stat().st_ino
+
+    save_metrics(path, {"schema_version": "1.0", "enabled": True, "commands": {}}, durable=True)
+
+    assert path.stat().st_ino != inode
+    assert load_metrics(path)["enabled"] is True
+    assert [entry.name for entry in path.parent.iterdir()] == ["metrics.json"]
+
+
+def test_save_metrics_round_trips_unicode_and_surrogate_commands(tmp_path: Path) -> None:
+    path = tmp_path / "metrics.json"
+    save_metrics(path, {"schema_version": "1.0", "enabled": True, "commands": {"wt café": 1}})
+    assert "café" in path.read_text(encoding="utf-8")
+
+    save_metrics(path, {"schema_version": "1.0", "enabled": True, "commands": {"wt \udcff": 1}})
+    assert load_metrics(path)["commands"] == {"wt \udcff": 1}
+
+
+@pytest.mark.parametrize(
+    ("argv", "expected"),
+    [
+        (["dopetask"], "dopetask"),
+        (["dopetask", "wt", "start", "--help"], "--help"),
+        (["dopetask", "-h", "--version"], "--help"),
+        (["dopetask", "wt", "--version"], "--version"),
+        (["dopetask", "version"], "--version"),
+        (["dopetask", "--json", "wt", "start", "extra"], "wt start"),
+        (["dopetask", "wt", "--force", "start"], "wt"),
+    ],
+)
+def test_infer_command_name(argv: list[str], expected: str) -> None:
+    assert infer_command_name(argv) == expected
+
+
+def test_load_metrics_reads_escaped_surrogates(tmp_path: Path) -> None:
+    path = tmp_path / "metrics.json"
+    path.write_text('{"enabled": true, "commands": {"wt \\udcff": 3}}\n', encoding="ascii")
+
+    assert load_metrics(path)["commands"] == {"wt \udcff": 3}
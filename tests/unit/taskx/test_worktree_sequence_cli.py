@@ -6,9 +6,20 @@ import json
 import subprocess
 from typing import TYPE_CHECKING
 
+import pytest
 from typer.testing import CliRunner
 
 from dopetask.cli import cli
+from dopetask.git import worktree_ops
+from dopetask.git.worktree_ops import (
+    _atomic_write_json,
+    _direct_argv,
+    _find_worktree_for_branch,
+    _git_repo_root,
+    _git_status_porcelain,
+    _GitBatchResolver,
+    _status_paths,
+)
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -217,3 +228,228 @@ def test_commit_sequence_accepts_unstaged_allowlisted_changes(tmp_path: Path, mo
     assert result.exit_code == 0
     assert "✓ Commit sequence complete" in result.stdout
     assert (run_dir / "COMMIT_SEQUENCE_RUN.json").exists()
+
+
+def test_commit_sequence_reuses_status_across_steps(tmp_path: Path, monkeypatch) -> None:
+    """Cached status should still commit every step's allowlisted files."""
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    subprocess.run(["git", "checkout", "-b", "tp/dopetask.core/test"], cwd=repo, check=True, capture_output=True)
+    (repo / "a.txt").write_text("a\n", encoding="utf-8")
+    (repo / "b.txt").write_text("b\n", encoding="utf-8")
+
+    run_dir = tmp_path / "RUN_0124"
+    run_dir.mkdir()
+    plan = {
+        "commit_plan": [
+            {"step_id": "C1", "message": "add a", "allowlist": ["a.txt"], "verify": []},
+            {"step_id": "C2", "message": "add b", "allowlist": ["b.txt"], "verify": []},
+        ]
+    }
+    (run_dir / "TASK_PACKET.md").write_text(
+        f"# TASK_PACKET TP_0002 — Two steps\n\n## COMMIT PLAN\n```json\n{json.dumps(plan)}\n```\n",
+        encoding="utf-8",
+    )
+
+    monkeypatch.chdir(repo)
+    result = CliRunner().invoke(cli, ["commit-sequence", "--run", str(run_dir), "--allow-unpromoted"])
+
+    assert result.exit_code == 0
+    report = json.loads((run_dir / "COMMIT_SEQUENCE_RUN.json").read_text(encoding="utf-8"))
+    assert [step["staged_files"] for step in report["steps"]] == [["a.txt"], ["b.txt"]]
+    assert report["status_reconcile_missed"] == []
+
+
+def test_commit_sequence_records_changes_left_after_cached_steps(tmp_path: Path, monkeypatch) -> None:
+    """Changes a finished step never saw should be reported, not fatal."""
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    subprocess.run(["git", "checkout", "-b", "tp/dopetask.core/test"], cwd=repo, check=True, capture_output=True)
+    (repo / "a.txt").write_text("a\n", encoding="utf-8")
+    (repo / "b.txt").write_text("b\n", encoding="utf-8")
+
+    run_dir = tmp_path / "RUN_0125"
+    run_dir.mkdir()
+    plan = {
+        "commit_plan": [
+            {"step_id": "C1", "message": "add a", "allowlist": ["a.txt", "late.txt"], "verify": []},
+            {
+                "step_id": "C2",
+                "message": "add b",
+                "allowlist": ["b.txt"],
+                "verify": ["git config --local user.name tester > late.txt"],
+            },
+        ]
+    }
+    (run_dir / "TASK_PACKET.md").write_text(
+        f"# TASK_PACKET TP_0003 — Late file\n\n## COMMIT PLAN\n```json\n{json.dumps(plan)}\n```\n",
+        encoding="utf-8",
+    )
+
+    monkeypatch.chdir(repo)
+    result = CliRunner().invoke(cli, ["commit-sequence", "--run", str(run_dir), "--allow-unpromoted"])
+
+    assert result.exit_code == 0
+    report = json.loads((run_dir / "COMMIT_SEQUENCE_RUN.json").read_text(encoding="utf-8"))
+    assert [step["staged_files"] for step in report["steps"]] == [["a.txt"], ["b.txt"]]
+    # late.txt appeared after C1 committed, so C1 could not have staged it.
+    assert report["status_reconcile_missed"] == []
+
+
+def test_commit_sequence_rechecks_status_before_refusing_cached_step(tmp_path: Path, monkeypatch) -> None:
+    """A file created by a commit hook should be committed by the step that allowlists it."""
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    subprocess.run(["git", "checkout", "-b", "tp/dopetask.core/test"], cwd=repo, check=True, capture_output=True)
+    hook = repo / ".git" / "hooks" / "post-commit"
+    hook.write_text("#!/bin/sh\n[ -e hooked.txt ] || echo hooked > hooked.txt\n", encoding="utf-8")
+    hook.chmod(0o755)
+    (repo / "a.txt").write_text("a\n", encoding="utf-8")
+
+    run_dir = tmp_path / "RUN_0127"
+    run_dir.mkdir()
+    plan = {
+        "commit_plan": [
+            {"step_id": "C1", "message": "add a", "allowlist": ["a.txt"], "verify": []},
+            {"step_id": "C2", "message": "add hooked", "allowlist": ["hooked.txt"], "verify": []},
+        ]
+    }
+    (run_dir / "TASK_PACKET.md").write_text(
+        f"# TASK_PACKET TP_0005 — Hook output\n\n## COMMIT PLAN\n```json\n{json.dumps(plan)}\n```\n",
+        encoding="utf-8",
+    )
+
+    report = worktree_ops.commit_sequence(run_dir=run_dir, allow_unpromoted=True, dirty_policy="refuse", cwd=repo)
+
+    assert [step["staged_files"] for step in report["steps"]] == [["a.txt"], ["hooked.txt"]]
+    assert report["status_reconcile_missed"] == []
+
+
+def test_commit_sequence_reports_changes_hidden_by_status_cache(tmp_path: Path, monkeypatch) -> None:
+    """A change that appears before a cached step runs is recorded in the report."""
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    subprocess.run(["git", "checkout", "-b", "tp/dopetask.core/test"], cwd=repo, check=True, capture_output=True)
+    (repo / "a.txt").write_text("a\n", encoding="utf-8")
+    (repo / "b.txt").write_text("b\n", encoding="utf-8")
+
+    run_dir = tmp_path / "RUN_0126"
+    run_dir.mkdir()
+    plan = {
+        "commit_plan": [
+            {"step_id": "C1", "message": "add a", "allowlist": ["a.txt"], "verify": []},
+            {"step_id": "C2", "message": "add b", "allowlist": ["b.txt", "late.txt"], "verify": []},
+        ]
+    }
+    (run_dir / "TASK_PACKET.md").write_text(
+        f"# TASK_PACKET TP_0004 — Hidden file\n\n## COMMIT PLAN\n```json\n{json.dumps(plan)}\n```\n",
+        encoding="utf-8",
+    )
+
+    real_run_git = worktree_ops._run_git
+
+    def run_git_then_touch(args, **kwargs):
+        result = real_run_git(args, **kwargs)
+        if args[:3] == ["commit", "-m", "add a"]:
+            (repo / "late.txt").write_text("late\n", encoding="utf-8")
+        return result
+
+    monkeypatch.setattr(worktree_ops, "_run_git", run_git_then_touch)
+    report = worktree_ops.commit_sequence(run_dir=run_dir, allow_unpromoted=True, dirty_policy="refuse", cwd=repo)
+
+    assert [step["staged_files"] for step in report["steps"]] == [["a.txt"], ["b.txt"]]
+    assert report["status_reconcile_missed"] == ["late.txt"]
+    written = json.loads((run_dir / "COMMIT_SEQUENCE_RUN.json").read_text(encoding="utf-8"))
+    assert written["status_reconcile_missed"] == ["late.txt"]
+
+
+def test_git_batch_resolver_tracks_new_commits(tmp_path: Path) -> None:
+    """The persistent resolver should see commits made after it started."""
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+
+    with _GitBatchResolver(repo) as resolver:
+        first = resolver.resolve("HEAD")
+        subprocess.run(["git", "commit", "--allow-empty", "-m", "next"], cwd=repo, check=True, capture_output=True)
+        second = resolver.resolve("HEAD")
+        with pytest.raises(RuntimeError, match="git rev-parse refs/heads/missing failed"):
+            resolver.resolve("refs/heads/missing")
+        head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=repo, check=True, capture_output=True, text=True)
+
+    assert first != second
+    assert second == head.stdout.strip()
+
+
+def test_status_paths_handle_renames_and_unquoted_names(tmp_path: Path) -> None:
+    """Porcelain v2 parsing should return real paths, including renames and spaces."""
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    subprocess.run(["git", "mv", "README.md", "GUIDE.md"], cwd=repo, check=True, capture_output=True)
+    (repo / "with space.txt").write_text("x\n", encoding="utf-8")
+
+    entries = _git_status_porcelain(repo)
+
+    assert _status_paths(entries) == {"GUIDE.md", "with space.txt"}
+    assert sorted(entry.porcelain_line() for entry in entries) == [
+        "?? with space.txt",
+        "R  README.md -> GUIDE.md",
+    ]
+
+
+def test_find_worktree_for_branch_tracks_checkouts(tmp_path: Path) -> None:
+    """Cached worktree listing should follow worktree adds and branch switches."""
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    linked = tmp_path / "linked wt"
+
+    assert _find_worktree_for_branch(repo, "main") == repo
+    assert _find_worktree_for_branch(repo, "feature") is None
+
+    subprocess.run(["git", "worktree", "add", "-b", "feature", str(linked)], cwd=repo, check=True, capture_output=True)
+    assert _find_worktree_for_branch(repo, "feature") == linked
+    assert _find_worktree_for_branch(linked, "main") == repo
+
+    subprocess.run(["git", "checkout", "-q", "--detach"], cwd=repo, check=True, capture_output=True)
+    assert _find_worktree_for_branch(repo, "main") is None
+
+
+def test_git_repo_root_is_memoized_per_cwd(tmp_path: Path) -> None:
+    """Repeated lookups for one directory should reuse the first rev-parse."""
+    repo = tmp_path / "repo"
+    _init_repo(repo)
+    (repo / "src").mkdir()
+
+    _git_repo_root.cache_clear()
+    assert _git_repo_root(repo) == _git_repo_root(repo / "src") == _git_repo_root(repo)
+    assert _git_repo_root.cache_info().hits == 1
+    with pytest.raises(RuntimeError):
+        _git_repo_root(tmp_path)
+
+
+def test_atomic_write_json_output_does_not_depend_on_orjson(tmp_path: Path, monkeypatch) -> None:
+    """Reports must be byte-identical whether or not orjson is installed."""
+    report = {"steps": [{"stdout": "caf\u00e9 \u2603\n", "files": []}], "meta": {}, "exit_code": 0}
+    expected = json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+
+    _atomic_write_json(tmp_path / "default.json", report)
+    monkeypatch.setattr(worktree_ops, "orjson", None)
+    _atomic_write_json(tmp_path / "stdlib.json", report)
+
+    assert (tmp_path / "default.json").read_text(encoding="utf-8") == expected
+    assert (tmp_path / "stdlib.json").read_text(encoding="utf-8") == expected
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ["default.json", "stdlib.json"]
+
+
+@pytest.mark.parametrize(
+    ("command", "expected"),
+    [
+        ("pytest -q --maxfail=1", ["pytest", "-q", "--maxfail=1"]),
+        ("ruff check . && pytest", None),
+        ("echo $HOME", None),
+        ("FOO=1 pytest", None),
+        ("ls *.py", None),
+    ],
+)
+def test_direct_argv_only_splits_plain_commands(command: str, expected) -> None:
+    """Verify commands using shell syntax should keep running through the shell."""
+    assert _direct_argv(command) == expected
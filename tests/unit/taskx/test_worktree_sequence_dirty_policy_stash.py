@@ -11,6 +11,7 @@ from typing import TYPE_CHECKING
 from typer.testing import CliRunner
 
 from dopetask.cli import cli
+from dopetask.obs.run_artifacts import DIRTY_STATE_LOG_FILENAME
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -83,9 +84,8 @@ def _load_worktree_json(run_dir: Path) -> dict:
 
 
 def _load_dirty_state(run_dir: Path) -> list[dict]:
-    payload = json.loads((run_dir / "DIRTY_STATE.json").read_text(encoding="utf-8"))
-    assert isinstance(payload, list)
-    return payload
+    lines = (run_dir / DIRTY_STATE_LOG_FILENAME).read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
 
 
 def _resolve_worktree_dir(repo: Path, *names: str) -> Path:
@@ -339,3 +339,76 @@ def test_finish_refuses_when_main_not_fast_forwardable(tmp_path: Path, monkeypat
     assert finish.exit_code == 1
     assert "ERROR: main is not fast-forwardable." in finish.stdout
     assert "Repository state diverged." in finish.stdout
+
+
+def test_finish_updates_main_that_is_not_checked_out(tmp_path: Path, monkeypatch) -> None:
+    """finish should fast-forward an unchecked-out main and push the same commit."""
+    repo, remote = _init_repo_with_origin(tmp_path)
+    run_dir = tmp_path / "RUN_0106"
+    _write_task_packet(run_dir)
+
+    runner = CliRunner()
+    monkeypatch.chdir(repo)
+    assert runner.invoke(cli, ["wt", "start", "--run", str(run_dir), "--branch", "tp/dopetask.core/0106-feature"]).exit_code == 0
+    _run(["git", "checkout", "--detach"], cwd=repo)
+
+    wt = _resolve_worktree_dir(
+        repo,
+        "tp_dopetask.core_0106_feature",
+        "tp_dopetask_core_0106_feature",
+        "tp_0106_feature",
+    )
+    (wt / "src" / "file.py").write_text("print('shipped')\n", encoding="utf-8")
+    monkeypatch.chdir(wt)
+    assert runner.invoke(cli, ["commit-sequence", "--run", str(run_dir), "--allow-unpromoted"]).exit_code == 0
+    task_head = _run(["git", "rev-parse", "HEAD"], cwd=wt)
+
+    finish = runner.invoke(cli, ["finish", "--run", str(run_dir)])
+    assert finish.exit_code == 0, finish.stdout
+
+    report = json.loads((run_dir / "FINISH.json").read_text(encoding="utf-8"))
+    assert report["main_after_merge"] == report["remote_after_push"] == task_head
+    assert _run(["git", "rev-parse", "main"], cwd=repo) == task_head
+    assert _run(["git", "rev-parse", "main"], cwd=remote) == task_head
+    assert not wt.exists()
+    assert _run(["git", "branch", "--list", "tp/dopetask.core/0106-feature"], cwd=repo) == ""
+
+
+def test_finish_reports_remote_tip_as_main_before_merge(tmp_path: Path, monkeypatch) -> None:
+    """main_before_merge should be main after its sync to the fetched origin/main."""
+    repo, remote = _init_repo_with_origin(tmp_path)
+    run_dir = tmp_path / "RUN_0107"
+    _write_task_packet(run_dir)
+
+    runner = CliRunner()
+    monkeypatch.chdir(repo)
+    assert runner.invoke(cli, ["wt", "start", "--run", str(run_dir), "--branch", "tp/dopetask.core/0107-feature"]).exit_code == 0
+
+    wt = _resolve_worktree_dir(
+        repo,
+        "tp_dopetask.core_0107_feature",
+        "tp_dopetask_core_0107_feature",
+        "tp_0107_feature",
+    )
+    (wt / "src" / "file.py").write_text("print('shipped')\n", encoding="utf-8")
+    monkeypatch.chdir(wt)
+    assert runner.invoke(cli, ["commit-sequence", "--run", str(run_dir), "--allow-unpromoted"]).exit_code == 0
+
+    # Advance origin/main so local main is behind the fetched tip.
+    second = tmp_path / "second"
+    subprocess.run(["git", "clone", str(remote), str(second)], check=True, capture_output=True)
+    _run(["git", "checkout", "-B", "main", "origin/main"], cwd=second)
+    _run(["git", "config", "user.email", "test@example.com"], cwd=second)
+    _run(["git", "config", "user.name", "Other User"], cwd=second)
+    (second / "remote_only.txt").write_text("remote move\n", encoding="utf-8")
+    _run(["git", "add", "remote_only.txt"], cwd=second)
+    _run(["git", "commit", "-m", "remote advance"], cwd=second)
+    _run(["git", "push", "-u", "origin", "main"], cwd=second)
+    remote_tip = _run(["git", "rev-parse", "HEAD"], cwd=second)
+
+    finish = runner.invoke(cli, ["finish", "--run", str(run_dir), "--no-cleanup"])
+    assert finish.exit_code == 0, finish.stdout
+
+    report = json.loads((run_dir / "FINISH.json").read_text(encoding="utf-8"))
+    assert report["main_before_merge"] == remote_tip
+    assert report["main_after_merge"] == report["remote_after_push"] == report["post_rebase_head"]
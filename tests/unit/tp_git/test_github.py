@@ -0,0 +1,29 @@
+"""Unit tests for dopetask tp git GitHub helpers."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from dopetask.ops.tp_git import github
+from dopetask.ops.tp_git.exec import ExecResult
+
+
+def test_gh_auth_success_is_checked_once_per_repo(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple[str, ...]] = []
+    returncodes = iter([1, 0])
+
+    def _run_command(argv: list[str], *, cwd: Path, check: bool = True) -> ExecResult:
+        calls.append(tuple(argv))
+        return ExecResult(argv=tuple(argv), cwd=cwd, returncode=next(returncodes), stdout="", stderr="not logged in")
+
+    monkeypatch.setattr(github, "run_command", _run_command)
+    monkeypatch.setattr(github, "_gh_auth_verified", set())
+
+    with pytest.raises(RuntimeError, match="gh auth failed: not logged in"):
+        github._ensure_gh_auth(Path("/repo"))
+    github._ensure_gh_auth(Path("/repo"))
+    github._ensure_gh_auth(Path("/repo"))
+
+    assert calls == [("gh", "auth", "status"), ("gh", "auth", "status")]
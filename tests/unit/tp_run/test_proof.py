@@ -0,0 +1,52 @@
+"""Unit tests for dopetask tp run proof helpers."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from dopetask.ops.tp_run import proof
+from dopetask.ops.tp_run.proof import build_run_id
+
+
+def _git(repo: Path, *args: str) -> str:
+    return subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True, text=True).stdout.strip()
+
+
+def test_build_run_id_reads_head_without_git(tmp_path: Path, monkeypatch) -> None:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@example.com", "commit", "-q", "--allow-empty", "-m", "init")
+    _git(repo, "worktree", "add", "-q", str(tmp_path / "linked"), "-b", "feature")
+    _git(repo, "pack-refs", "--all")
+    head = _git(repo, "rev-parse", "HEAD")
+
+    def _no_git(*args, **kwargs):
+        raise AssertionError("build_run_id should not spawn git")
+
+    monkeypatch.setattr(proof, "run_git", _no_git)
+
+    for root in (repo, tmp_path / "linked"):
+        run_id = build_run_id(tp_id="TP_0001", repo_root=root)
+        assert run_id.startswith("TP_0001_")
+        assert run_id.rsplit("_", 1)[1] == head[:7]
+
+
+def test_proof_writer_creates_each_artifact_directory_once(tmp_path: Path, monkeypatch) -> None:
+    writer = proof.ProofWriter(proof.resolve_paths(repo_root=tmp_path, tp_id="TP-1", run_id="r1"))
+    mkdirs: list[Path] = []
+    real_mkdir = Path.mkdir
+
+    def _counting_mkdir(self: Path, *args, **kwargs) -> None:
+        mkdirs.append(self)
+        real_mkdir(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "mkdir", _counting_mkdir)
+
+    writer.write_text("PRECHECK.txt", "ok\n")
+    writer.append_log("logs/TESTS.log", "one\n")
+    writer.append_log("logs/TESTS.log", "two\n")
+
+    assert mkdirs == [writer.paths.run_dir / "logs"]
+    assert (writer.paths.run_dir / "logs" / "TESTS.log").read_text(encoding="utf-8") == "one\ntwo\n"
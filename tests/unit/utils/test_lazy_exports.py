@@ -0,0 +1,41 @@
+"""Tests for lazily resolved package re-exports."""
+
+from __future__ import annotations
+
+import importlib
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    ("package", "name", "submodule"),
+    [
+        ("dopetask.guard", "get_banner_context", "dopetask.guard.banner"),
+        ("dopetask.manifest", "Manifest", "dopetask.manifest.manifest"),
+        ("dopetask.ops", "run_doctor", "dopetask.ops.doctor"),
+    ],
+)
+def test_package_loads_submodule_on_first_access(package: str, name: str, submodule: str) -> None:
+    code = (
+        f"import sys, importlib; pkg = importlib.import_module({package!r}); "
+        f"before = {submodule!r} in sys.modules; "
+        f"getattr(pkg, {name!r}); "
+        f"print(before, {submodule!r} in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+
+    assert result.stdout.split() == ["False", "True"]
+
+
+@pytest.mark.parametrize("package", ["dopetask.guard", "dopetask.manifest", "dopetask.ops"])
+def test_package_exports_resolve_and_list(package: str) -> None:
+    module = importlib.import_module(package)
+
+    for name in module.__all__:
+        assert getattr(module, name) is not None
+        assert name in vars(module)
+    assert set(module.__all__) <= set(dir(module))
+    with pytest.raises(AttributeError, match="has no attribute 'missing'"):
+        module.missing  # noqa: B018